@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+from config import get_settings
+from redis_store import (
+    claim_analysis_flight,
+    get_analysis_flight_leader,
+    get_resume_text,
+    get_task_status,
+    release_analysis_flight,
+    renew_analysis_flight,
+    set_resume_text,
+)
+from resume_pipeline import update_task
+
+
+FLIGHT_POLL_SECONDS = 0.5
+
+_log = logging.getLogger('elevate')
+_counters = {'led': 0, 'joined': 0, 'orphaned': 0}
+_held: set[str] = set()
+
+
+def claim_flight(cache_hash: str, task_id: str) -> str | None:
+    """Single-flight claim for an upload's payload hash.
+
+    Returns None when this task should run the analysis (it now holds the lease, or
+    single-flight is off), otherwise the task id of the identical analysis already
+    in flight. With Redis configured the lease is shared across workers.
+    """
+    settings = get_settings()
+    if not settings.analysis_single_flight_enabled:
+        return None
+    leader_task_id = claim_analysis_flight(cache_hash, task_id, settings.analysis_single_flight_lease_seconds)
+    _counters['led' if leader_task_id is None else 'joined'] += 1
+    return leader_task_id
+
+
+def release_flight(cache_hash: str, task_id: str) -> None:
+    if not get_settings().analysis_single_flight_enabled:
+        return
+    try:
+        release_analysis_flight(cache_hash, task_id)
+    except Exception as exc:
+        _log.warning('[FLIGHT] Could not release analysis lease for task %s: %s', task_id, exc)
+
+
+@asynccontextmanager
+async def hold_flight(cache_hash: str, task_id: str) -> AsyncIterator[None]:
+    """Keep renewing the lease while the leading analysis runs; releasing is left to the caller."""
+    settings = get_settings()
+    if not settings.analysis_single_flight_enabled:
+        yield
+        return
+    lease_seconds = settings.analysis_single_flight_lease_seconds
+
+    async def renew() -> None:
+        while True:
+            await asyncio.sleep(lease_seconds / 3)
+            try:
+                renew_analysis_flight(cache_hash, task_id, lease_seconds)
+            except Exception as exc:
+                _log.warning('[FLIGHT] Could not renew analysis lease for task %s: %s', task_id, exc)
+
+    renewal = asyncio.create_task(renew())
+    _held.add(task_id)
+    try:
+        yield
+    finally:
+        _held.discard(task_id)
+        renewal.cancel()
+
+
+def _is_settled(payload: dict[str, Any]) -> bool:
+    if payload.get('status') == 'failed':
+        return True
+    return payload.get('status') == 'completed' and not (payload.get('result') or {}).get('job_market_pending')
+
+
+async def follow_flight(task_id: str, leader_task_id: str, cache_hash: str) -> bool:
+    """Mirror the leading task's progress onto `task_id` until it settles.
+
+    Returns True once the leader completed or failed (its result or error is
+    copied over), or False if the leader gave up its lease without settling, for
+    example because its worker restarted.
+    """
+    last_seen: tuple[Any, ...] | None = None
+    while True:
+        # Read the lease before the status: a leader writes its final status before releasing.
+        leader_alive = get_analysis_flight_leader(cache_hash) == leader_task_id
+        leader = await get_task_status(leader_task_id)
+        if leader:
+            seen = (leader.get('status'), leader.get('progress'), leader.get('current_step'), leader.get('result') is not None)
+            settled = _is_settled(leader)
+            if seen != last_seen or settled:
+                last_seen = seen
+                if settled and leader.get('status') == 'completed':
+                    resume_text = get_resume_text(leader_task_id)
+                    if resume_text:
+                        set_resume_text(task_id, resume_text)
+                update_task(
+                    task_id,
+                    status=str(leader.get('status')),
+                    progress=int(leader.get('progress') or 0),
+                    current_step=str(leader.get('current_step') or ''),
+                    result=leader.get('result'),
+                    cached=True if settled and leader.get('status') == 'completed' else None,
+                    error=leader.get('error'),
+                )
+            if settled:
+                return True
+        if not leader_alive:
+            _counters['orphaned'] += 1
+            return False
+        await asyncio.sleep(FLIGHT_POLL_SECONDS)
+
+
+def get_single_flight_stats() -> dict[str, Any]:
+    settings = get_settings()
+    return {
+        'enabled': settings.analysis_single_flight_enabled,
+        'lease_seconds': settings.analysis_single_flight_lease_seconds,
+        'leading_here': len(_held),
+        **_counters,
+    }
@@ -0,0 +1 @@
+"""Micro-benchmarks for the resume pipeline hot paths; run with `python -m benchmarks` from `server/`."""
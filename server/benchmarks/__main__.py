@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import json
+import sys
+from pathlib import Path
+
+from benchmarks.cases import build_benchmark_cases
+from benchmarks.runner import (
+    DEFAULT_BASELINE_PATH,
+    DEFAULT_REGRESSION_THRESHOLD,
+    DEFAULT_REPEATS,
+    benchmark_environment,
+    compare_to_baseline,
+    format_report,
+    load_baseline,
+    measure_case,
+    merge_fastest,
+    run_benchmarks,
+    write_baseline,
+)
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Run the pipeline micro-benchmarks.')
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE_PATH, help='Baseline JSON file.')
+    parser.add_argument('--update-baseline', action='store_true', help='Write this run as the new baseline.')
+    parser.add_argument('--output', type=Path, help='Also write this run to a JSON file.')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_REGRESSION_THRESHOLD, help='Allowed slowdown, e.g. 0.25 = 25%%.')
+    parser.add_argument('--gate', action='append', help='Glob of benchmarks that fail the run on regression (default: all).')
+    parser.add_argument('--only', action='append', help='Glob of benchmarks to run (default: all).')
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS, help='Timing rounds per benchmark.')
+    parser.add_argument('--retries', type=int, default=2, help='Re-measure suspected regressions this many times.')
+    return parser.parse_args(argv)
+
+
+def _matches(name: str, patterns: list[str] | None) -> bool:
+    return patterns is None or any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    cases = [case for case in build_benchmark_cases() if _matches(case.name, args.only)]
+    if not cases:
+        print('No benchmarks matched --only.', file=sys.stderr)
+        return 2
+
+    environment = benchmark_environment()
+    results = run_benchmarks(cases, repeats=args.repeats)
+    if args.output:
+        args.output.write_text(json.dumps({'environment': environment, 'results': results}, indent=2) + '\n', encoding='utf-8')
+
+    if args.update_baseline:
+        baseline = load_baseline(args.baseline) or {}
+        merged = {**baseline.get('results', {}), **results}
+        write_baseline(args.baseline, merged, environment)
+        print(format_report([], results))
+        print(f'\nBaseline written to {args.baseline}.')
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(format_report([], results))
+        print(f'\nNo baseline at {args.baseline}; run with --update-baseline to create one.', file=sys.stderr)
+        return 2
+    if baseline.get('environment') != environment:
+        print(
+            f'Warning: baseline environment {baseline.get("environment")} differs from this run {environment}.',
+            file=sys.stderr,
+        )
+
+    gated = [case.name for case in cases if _matches(case.name, args.gate)]
+    rows = compare_to_baseline(results, baseline, threshold=args.threshold, gated=gated)
+    cases_by_name = {case.name: case for case in cases}
+    for _ in range(max(0, args.retries)):
+        suspects = [row['name'] for row in rows if row['regressed']]
+        if not suspects:
+            break
+        for name in suspects:
+            results[name] = merge_fastest(results[name], measure_case(cases_by_name[name], repeats=args.repeats))
+        rows = compare_to_baseline(results, baseline, threshold=args.threshold, gated=gated)
+    print(format_report(rows, results))
+    regressions = [row['name'] for row in rows if row['regressed']]
+    if regressions:
+        print(f'\n{len(regressions)} benchmark(s) regressed more than {args.threshold:.0%}: {", ".join(regressions)}', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from uuid import uuid4
+
+from benchmarks.fixtures import (
+    LONG_JOB_DESCRIPTION,
+    RESUME_PAGE_SIZES,
+    SHORT_JOB_DESCRIPTION,
+    build_synthetic_jsearch_jobs,
+    build_synthetic_resume,
+)
+from career_mapper import adapt_jsearch_to_career_path
+from redis_store import LocalRedis
+from resume_document import ResumeDocument
+from resume_pipeline import (
+    _extract_reference_keywords,
+    compute_ats_evaluation,
+    compute_resume_structure_score,
+    detect_weak_bullets,
+    normalize_text,
+)
+
+TARGET_ROLE = 'Backend Engineer'
+JOB_DESCRIPTIONS = {'short_jd': SHORT_JOB_DESCRIPTION, 'long_jd': LONG_JOB_DESCRIPTION}
+LOCAL_REDIS_BACKGROUND_KEYS = 200
+
+
+@dataclass(slots=True, frozen=True)
+class BenchmarkCase:
+    name: str
+    func: Callable[[], object]
+
+
+def _resume_cases(pages: int) -> list[BenchmarkCase]:
+    text = build_synthetic_resume(pages)
+    raw_text = text.replace('\n', '\r\n').replace(' | ', '  \t|  ')
+    document = ResumeDocument.from_text(text)
+    cases = [
+        BenchmarkCase(f'normalize_text[{pages}p]', lambda: normalize_text(raw_text)),
+        BenchmarkCase(f'resume_document.from_text[{pages}p]', lambda: ResumeDocument.from_text(text)),
+        BenchmarkCase(
+            f'compute_resume_structure_score[{pages}p]',
+            lambda: compute_resume_structure_score(document, 'pdfplumber'),
+        ),
+        BenchmarkCase(f'detect_weak_bullets[{pages}p]', lambda: detect_weak_bullets(document)),
+    ]
+    for label, job_description in JOB_DESCRIPTIONS.items():
+        cases.append(
+            BenchmarkCase(
+                f'compute_ats_evaluation[{pages}p,{label}]',
+                lambda job_description=job_description: compute_ats_evaluation(document, job_description, TARGET_ROLE),
+            )
+        )
+    return cases
+
+
+def _local_redis_case() -> BenchmarkCase:
+    # Runs against a store that already holds other keys, since every set sweeps the whole store.
+    client = LocalRedis()
+    prefix = f'benchmark:{uuid4().hex}'
+    for index in range(LOCAL_REDIS_BACKGROUND_KEYS):
+        client.set(f'{prefix}:background:{index}', 'x' * 512, ex=600)
+    key = f'{prefix}:hot'
+    value = 'y' * 2048
+
+    def set_get() -> object:
+        client.set(key, value, ex=600)
+        return client.get(key)
+
+    return BenchmarkCase(f'local_redis.set_get[{LOCAL_REDIS_BACKGROUND_KEYS}keys]', set_get)
+
+
+def build_benchmark_cases() -> list[BenchmarkCase]:
+    cases: list[BenchmarkCase] = []
+    for pages in RESUME_PAGE_SIZES:
+        cases.extend(_resume_cases(pages))
+    for label, job_description in JOB_DESCRIPTIONS.items():
+        cases.append(
+            BenchmarkCase(
+                f'extract_reference_keywords[{label}]',
+                lambda job_description=job_description: _extract_reference_keywords(TARGET_ROLE, job_description),
+            )
+        )
+    jobs = build_synthetic_jsearch_jobs(25)
+    skills = ['Backend', 'Python', 'FastAPI', 'SQL', 'Docker', 'AWS', 'India']
+    cases.append(
+        BenchmarkCase('adapt_jsearch_to_career_path[25jobs]', lambda: adapt_jsearch_to_career_path(jobs, 'full-time', skills))
+    )
+    cases.append(_local_redis_case())
+    return cases
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from itertools import cycle, islice
+
+WORDS_PER_PAGE = 450
+RESUME_PAGE_SIZES = (1, 3, 10)
+
+_SKILL_TERMS = (
+    'Python', 'FastAPI', 'SQL', 'PostgreSQL', 'Docker', 'Kubernetes', 'AWS', 'Redis',
+    'React', 'TypeScript', 'Terraform', 'Kafka', 'Airflow', 'Pandas', 'GraphQL', 'CI/CD',
+)
+_STRONG_BULLETS = (
+    '- Built {skill} services that cut p95 latency by {number}% across {count} regions',
+    '- Led migration of {count} pipelines to {skill}, reducing infra cost by {number}%',
+    '- Designed {skill} ingestion handling {number}k events per second with zero data loss',
+    '- Automated {skill} deployments for {count} teams, shrinking release time by {number}%',
+)
+_WEAK_BULLETS = (
+    '- Responsible for {skill} tasks',
+    '- Worked on various {skill} projects',
+    '- Helped with {skill} support',
+)
+_JD_SENTENCES = (
+    'We are looking for an engineer with strong {skill} experience to build reliable backend systems.',
+    'You will own {skill} services end to end, from design reviews to production on-call.',
+    'Experience with {skill} and {other} in a cloud environment is a strong plus.',
+    'You will mentor engineers, improve observability, and ship {skill} features weekly.',
+)
+
+
+def _skill(index: int) -> str:
+    return _SKILL_TERMS[index % len(_SKILL_TERMS)]
+
+
+def build_synthetic_resume(pages: int) -> str:
+    """Deterministic resume text of roughly `pages` pages with every scored section."""
+    lines = [
+        'Jane Doe',
+        'jane.doe@example.com | +91 98765 43210 | linkedin.com/in/janedoe | github.com/janedoe',
+        'Summary',
+        'Backend engineer focused on Python services, data pipelines and cloud infrastructure.',
+        'Experience',
+    ]
+    word_budget = pages * WORDS_PER_PAGE
+    index = 0
+    while sum(len(line.split()) for line in lines) < word_budget:
+        if index % 6 == 0:
+            lines.append(f'Senior Engineer, Company {index // 6 + 1} | 20{10 + index % 14}-20{11 + index % 14}')
+        templates = _WEAK_BULLETS if index % 5 == 0 else _STRONG_BULLETS
+        lines.append(
+            templates[index % len(templates)].format(
+                skill=_skill(index),
+                number=10 + (index * 7) % 80,
+                count=2 + index % 9,
+            )
+        )
+        index += 1
+    lines.extend([
+        'Projects',
+        '- Open-source FastAPI rate limiter used by 40 services',
+        'Education',
+        'B.Tech in Computer Science, Example Institute of Technology',
+        'Skills',
+        ', '.join(_SKILL_TERMS),
+    ])
+    return '\n'.join(lines)
+
+
+def build_synthetic_job_description(sentences: int) -> str:
+    return ' '.join(
+        template.format(skill=_skill(index), other=_skill(index + 5))
+        for index, template in enumerate(islice(cycle(_JD_SENTENCES), sentences))
+    )
+
+
+SHORT_JOB_DESCRIPTION = build_synthetic_job_description(4)
+LONG_JOB_DESCRIPTION = build_synthetic_job_description(60)
+
+
+def build_synthetic_jsearch_jobs(count: int) -> list[dict[str, object]]:
+    jobs: list[dict[str, object]] = []
+    for index in range(count):
+        intern = index % 4 == 0
+        jobs.append({
+            'job_title': f'{_skill(index)} {"Intern" if intern else "Engineer"}',
+            'employer_name': f'Company {index}',
+            'job_description': build_synthetic_job_description(6 + index % 5),
+            'job_location': 'Bengaluru, Karnataka, India' if index % 3 else 'Remote',
+            'job_city': 'Bengaluru',
+            'job_country': 'India',
+            'job_is_remote': index % 3 == 0,
+            'job_employment_type': 'INTERN' if intern else 'FULLTIME',
+            'job_posted_at_datetime_utc': '2026-04-29T10:00:00+00:00',
+            'job_apply_link': f'https://example.com/jobs/{index}',
+        })
+    return jobs
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import json
+import platform
+import statistics
+import timeit
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from benchmarks.cases import BenchmarkCase
+
+BASELINE_VERSION = 1
+DEFAULT_BASELINE_PATH = Path(__file__).with_name('baselines.json')
+DEFAULT_REGRESSION_THRESHOLD = 0.25
+DEFAULT_REPEATS = 5
+# The fastest round is the least noisy estimate of a pure-CPU call; medians drift with host load.
+COMPARISON_STAT = 'min_us'
+
+
+def benchmark_environment() -> dict[str, Any]:
+    from sentence_model import get_sentence_model, get_sentence_model_status
+
+    get_sentence_model()
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'system': platform.system(),
+        'sentence_model': get_sentence_model_status()['state'],
+    }
+
+
+def measure_case(case: BenchmarkCase, *, repeats: int = DEFAULT_REPEATS) -> dict[str, Any]:
+    """Time one case, returning per-call microseconds over `repeats` auto-ranged rounds."""
+    timer = timeit.Timer(case.func)
+    number, _ = timer.autorange()
+    samples = [(elapsed / number) * 1_000_000 for elapsed in timer.repeat(repeat=max(1, repeats), number=number)]
+    return {
+        'median_us': round(statistics.median(samples), 3),
+        'min_us': round(min(samples), 3),
+        'max_us': round(max(samples), 3),
+        'calls_per_round': number,
+        'rounds': len(samples),
+    }
+
+
+def run_benchmarks(cases: Iterable[BenchmarkCase], *, repeats: int = DEFAULT_REPEATS) -> dict[str, dict[str, Any]]:
+    return {case.name: measure_case(case, repeats=repeats) for case in cases}
+
+
+def merge_fastest(first: dict[str, Any], second: dict[str, Any]) -> dict[str, Any]:
+    """Keep the faster of two measurements of the same case (used to confirm suspected regressions)."""
+    return second if second[COMPARISON_STAT] < first[COMPARISON_STAT] else first
+
+
+def load_baseline(path: Path) -> dict[str, Any] | None:
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding='utf-8'))
+
+
+def write_baseline(path: Path, results: dict[str, dict[str, Any]], environment: dict[str, Any]) -> None:
+    payload = {'version': BASELINE_VERSION, 'environment': environment, 'results': results}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, indent=2, sort_keys=True) + '\n', encoding='utf-8')
+
+
+def compare_to_baseline(
+    results: dict[str, dict[str, Any]],
+    baseline: dict[str, Any],
+    *,
+    threshold: float = DEFAULT_REGRESSION_THRESHOLD,
+    gated: Iterable[str] | None = None,
+) -> list[dict[str, Any]]:
+    """Compare the fastest-round timings with the baseline.
+
+    Every case present in both runs gets a row; `regressed` is set only for gated
+    cases (all of them when `gated` is None) that got slower than the threshold.
+    """
+    baseline_results = baseline.get('results', {})
+    gated_names = set(gated) if gated is not None else None
+    rows: list[dict[str, Any]] = []
+    for name, current in results.items():
+        previous = baseline_results.get(name)
+        if not previous or not previous.get(COMPARISON_STAT):
+            continue
+        change = (current[COMPARISON_STAT] / previous[COMPARISON_STAT]) - 1
+        is_gated = gated_names is None or name in gated_names
+        rows.append({
+            'name': name,
+            'baseline_us': previous[COMPARISON_STAT],
+            'current_us': current[COMPARISON_STAT],
+            'change': round(change, 4),
+            'gated': is_gated,
+            'regressed': is_gated and change > threshold,
+        })
+    return rows
+
+
+def format_report(rows: list[dict[str, Any]], results: dict[str, dict[str, Any]]) -> str:
+    lines = [f'{"benchmark":<52} {"baseline us":>12} {"current us":>12} {"change":>8}']
+    compared = {row['name']: row for row in rows}
+    for name, current in results.items():
+        row = compared.get(name)
+        if row is None:
+            lines.append(f'{name:<52} {"-":>12} {current[COMPARISON_STAT]:>12.2f} {"new":>8}')
+            continue
+        marker = '  REGRESSED' if row['regressed'] else ''
+        lines.append(
+            f'{name:<52} {row["baseline_us"]:>12.2f} {row["current_us"]:>12.2f} {row["change"]:>+8.1%}{marker}'
+        )
+    return '\n'.join(lines)
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from collections.abc import Callable
+from typing import Any
+from weakref import WeakKeyDictionary
+
+from config import get_settings
+
+
+DECREASE_COOLDOWN_SECONDS = 5.0
+MIN_LATENCY_SAMPLES = 5
+FAST_LATENCY_WEIGHT = 0.3
+BASELINE_LATENCY_WEIGHT = 0.02
+
+_log = logging.getLogger('elevate')
+_limiters: WeakKeyDictionary[asyncio.AbstractEventLoop, AdaptiveConcurrencyLimiter] = WeakKeyDictionary()
+
+
+class AdaptiveConcurrencyLimiter:
+    """Async concurrency limit that adapts to upstream backpressure (AIMD).
+
+    Used as `async with limiter:`. While the limit is saturated, every successful
+    release adds 1/limit, so the limit grows by about one slot per limit's worth
+    of completions. Throttling (429 / RESOURCE_EXHAUSTED) and a fast latency
+    average rising above `latency_tolerance` times its slow baseline multiply
+    the limit by `decrease_factor`, at most once per cooldown so a single burst
+    of errors does not collapse it. The limit stays between `min_limit` and
+    `max_limit`; lowering it never cancels work, it only holds back new entries.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        decrease_factor: float,
+        latency_tolerance: float,
+        adaptive: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.adaptive = adaptive
+        self._clock = clock
+        self._limit = float(min(self.max_limit, max(self.min_limit, initial_limit)))
+        self._in_flight = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._fast_latency_ms: float | None = None
+        self._baseline_latency_ms: float | None = None
+        self._latency_samples = 0
+        self._last_decrease_at = -math.inf
+        self.increases = 0
+        self.decreases = {'throttled': 0, 'latency': 0}
+
+    @property
+    def limit(self) -> int:
+        return max(self.min_limit, int(self._limit))
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    async def acquire(self) -> None:
+        if self._in_flight < self.limit and not self.queued:
+            self._in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was granted just as the waiter was cancelled; hand it on.
+                self._in_flight -= 1
+                self._wake_waiters()
+            raise
+
+    def release(self, *, ok: bool = True) -> None:
+        saturated = self._in_flight >= self.limit
+        self._in_flight = max(0, self._in_flight - 1)
+        if ok and saturated and self.adaptive and self._limit < self.max_limit:
+            self._limit = min(float(self.max_limit), self._limit + 1 / self._limit)
+            self.increases += 1
+        self._wake_waiters()
+
+    def _wake_waiters(self) -> None:
+        while self._waiters and self._in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self._in_flight += 1
+            waiter.set_result(None)
+
+    def _decrease(self, reason: str) -> None:
+        now = self._clock()
+        if not self.adaptive or now - self._last_decrease_at < DECREASE_COOLDOWN_SECONDS:
+            return
+        self._last_decrease_at = now
+        previous = self.limit
+        self._limit = max(float(self.min_limit), self._limit * self.decrease_factor)
+        self.decreases[reason] += 1
+        # Latency measured under the old limit should not trigger the next decrease.
+        self._fast_latency_ms = self._baseline_latency_ms
+        _log.warning('[LIMITER] Analysis concurrency %d -> %d (%s).', previous, self.limit, reason)
+
+    def record_throttled(self) -> None:
+        self._decrease('throttled')
+
+    def record_latency(self, latency_ms: float) -> None:
+        if self._fast_latency_ms is None or self._baseline_latency_ms is None:
+            self._fast_latency_ms = self._baseline_latency_ms = latency_ms
+        else:
+            self._fast_latency_ms += FAST_LATENCY_WEIGHT * (latency_ms - self._fast_latency_ms)
+            self._baseline_latency_ms += BASELINE_LATENCY_WEIGHT * (latency_ms - self._baseline_latency_ms)
+        self._latency_samples += 1
+        if (
+            self._latency_samples >= MIN_LATENCY_SAMPLES
+            and self._fast_latency_ms > self._baseline_latency_ms * self.latency_tolerance
+        ):
+            self._decrease('latency')
+
+    async def __aenter__(self) -> AdaptiveConcurrencyLimiter:
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self.release(ok=exc_type is None)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            'adaptive': self.adaptive,
+            'limit': self.limit,
+            'min_limit': self.min_limit,
+            'max_limit': self.max_limit,
+            'in_flight': self._in_flight,
+            'queued': self.queued,
+            'increases': self.increases,
+            'decreases': dict(self.decreases),
+            'latency_fast_ms': round(self._fast_latency_ms, 1) if self._fast_latency_ms is not None else None,
+            'latency_baseline_ms': round(self._baseline_latency_ms, 1) if self._baseline_latency_ms is not None else None,
+        }
+
+
+def get_analysis_limiter() -> AdaptiveConcurrencyLimiter:
+    """The analysis limiter for the running event loop."""
+    loop = asyncio.get_running_loop()
+    limiter = _limiters.get(loop)
+    if limiter is None:
+        settings = get_settings()
+        limiter = AdaptiveConcurrencyLimiter(
+            initial_limit=settings.max_concurrent_analyses,
+            min_limit=settings.analysis_concurrency_min,
+            max_limit=settings.analysis_concurrency_max,
+            decrease_factor=settings.analysis_concurrency_decrease_factor,
+            latency_tolerance=settings.analysis_concurrency_latency_tolerance,
+            adaptive=settings.analysis_concurrency_adaptive,
+        )
+        _limiters[loop] = limiter
+    return limiter
+
+
+def _current_limiter() -> AdaptiveConcurrencyLimiter | None:
+    try:
+        return get_analysis_limiter()
+    except RuntimeError:
+        # No running loop (the synchronous Gemini path); there is no analysis limit to adjust.
+        return None
+
+
+def record_upstream_throttled() -> None:
+    limiter = _current_limiter()
+    if limiter is not None:
+        limiter.record_throttled()
+
+
+def record_upstream_latency(latency_ms: float) -> None:
+    limiter = _current_limiter()
+    if limiter is not None:
+        limiter.record_latency(latency_ms)
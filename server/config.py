@@ -22,6 +22,19 @@ class Settings:
     ]
     gemini_max_retries = int(os.getenv('GEMINI_MAX_RETRIES', '3'))
     gemini_retry_backoff_seconds = float(os.getenv('GEMINI_RETRY_BACKOFF_SECONDS', '1.5'))
+    gemini_retry_max_backoff_seconds = float(os.getenv('GEMINI_RETRY_MAX_BACKOFF_SECONDS', '20'))
+    gemini_deadline_seconds = max(1.0, float(os.getenv('GEMINI_DEADLINE_SECONDS', '90')))
+    gemini_breaker_window_seconds = max(1.0, float(os.getenv('GEMINI_BREAKER_WINDOW_SECONDS', '60')))
+    gemini_breaker_min_requests = max(1, int(os.getenv('GEMINI_BREAKER_MIN_REQUESTS', '5')))
+    gemini_breaker_failure_rate = min(1.0, max(0.01, float(os.getenv('GEMINI_BREAKER_FAILURE_RATE', '0.5'))))
+    gemini_breaker_open_seconds = max(1.0, float(os.getenv('GEMINI_BREAKER_OPEN_SECONDS', '30')))
+    gemini_routing_policy = os.getenv('GEMINI_ROUTING_POLICY', 'static').strip().lower() or 'static'
+    gemini_routing_slo_ms = max(1.0, float(os.getenv('GEMINI_ROUTING_SLO_MS', '30000')))
+    gemini_routing_short_prompt_chars = max(1, int(os.getenv('GEMINI_ROUTING_SHORT_PROMPT_CHARS', '8000')))
+    gemini_hedge_enabled = os.getenv('GEMINI_HEDGE_ENABLED', 'false').lower() in {'1', 'true', 'yes'}
+    gemini_hedge_percentile = min(0.999, max(0.5, float(os.getenv('GEMINI_HEDGE_PERCENTILE', '0.95'))))
+    gemini_hedge_target = 'same' if os.getenv('GEMINI_HEDGE_TARGET', 'fallback').strip().lower() == 'same' else 'fallback'
+    gemini_prompt_token_budget = max(1000, int(os.getenv('GEMINI_PROMPT_TOKEN_BUDGET', '6000')))
     sentry_dsn = os.getenv('SENTRY_DSN', '').strip()
     upstash_redis_url = os.getenv('UPSTASH_REDIS_URL', '').strip()
     upstash_redis_host = os.getenv('UPSTASH_REDIS_HOST', '').strip()
@@ -30,7 +43,6 @@ class Settings:
 
     result_ttl_seconds = int(os.getenv('RESULT_TTL_SECONDS', str(7 * 24 * 60 * 60)))
     cache_ttl_seconds = int(os.getenv('CACHE_TTL_SECONDS', str(7 * 24 * 60 * 60)))
-    upload_blob_ttl_seconds = int(os.getenv('UPLOAD_BLOB_TTL_SECONDS', str(60 * 60)))
     redis_socket_timeout_seconds = float(os.getenv('REDIS_SOCKET_TIMEOUT_SECONDS', '5'))
     redis_connect_timeout_seconds = float(os.getenv('REDIS_CONNECT_TIMEOUT_SECONDS', '5'))
     redis_fallback_to_memory_enabled = os.getenv(
@@ -40,9 +52,37 @@ class Settings:
     rate_limit_enabled = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() in {'1', 'true', 'yes'}
     rate_limit_per_day = int(os.getenv('RATE_LIMIT_PER_DAY', '5'))
     max_upload_size_bytes = int(os.getenv('MAX_UPLOAD_SIZE_BYTES', str(5 * 1024 * 1024)))
+    upload_spool_threshold_bytes = max(64 * 1024, int(os.getenv('UPLOAD_SPOOL_THRESHOLD_BYTES', str(1024 * 1024))))
     max_concurrent_analyses = max(1, int(os.getenv('MAX_CONCURRENT_ANALYSES', '2')))
+    batch_score_max_concurrency = max(1, int(os.getenv('BATCH_SCORE_MAX_CONCURRENCY', '2')))
+    analysis_concurrency_adaptive = os.getenv('ANALYSIS_CONCURRENCY_ADAPTIVE', 'true').lower() in {'1', 'true', 'yes'}
+    analysis_concurrency_min = max(1, int(os.getenv('ANALYSIS_CONCURRENCY_MIN', '1')))
+    analysis_concurrency_max = max(
+        analysis_concurrency_min,
+        max_concurrent_analyses,
+        int(os.getenv('ANALYSIS_CONCURRENCY_MAX', str(max(8, max_concurrent_analyses)))),
+    )
+    analysis_concurrency_decrease_factor = min(0.95, max(0.1, float(os.getenv('ANALYSIS_CONCURRENCY_DECREASE_FACTOR', '0.5'))))
+    analysis_concurrency_latency_tolerance = max(1.1, float(os.getenv('ANALYSIS_CONCURRENCY_LATENCY_TOLERANCE', '2.0')))
+    analysis_single_flight_enabled = os.getenv('ANALYSIS_SINGLE_FLIGHT_ENABLED', 'true').lower() in {'1', 'true', 'yes'}
+    analysis_single_flight_lease_seconds = min(3600, max(10, int(os.getenv('ANALYSIS_SINGLE_FLIGHT_LEASE_SECONDS', '120'))))
+    parse_sandbox_enabled = os.getenv('PARSE_SANDBOX_ENABLED', 'true').lower() in {'1', 'true', 'yes'}
+    parse_workers = max(1, int(os.getenv('PARSE_WORKERS', str(max_concurrent_analyses))))
+    parse_timeout_seconds = float(os.getenv('PARSE_TIMEOUT_SECONDS', '30'))
+    parse_worker_memory_limit_mb = int(os.getenv('PARSE_WORKER_MEMORY_LIMIT_MB', '1024'))
+    parse_worker_max_jobs = max(1, int(os.getenv('PARSE_WORKER_MAX_JOBS', '25')))
+    ocr_pool_workers = int(os.getenv('OCR_POOL_WORKERS', '0'))
+    ocr_page_timeout_seconds = float(os.getenv('OCR_PAGE_TIMEOUT_SECONDS', '20'))
     minimum_resume_words = int(os.getenv('MINIMUM_RESUME_WORDS', '60'))
     sentence_model_name = os.getenv('SENTENCE_MODEL_NAME', 'sentence-transformers/all-MiniLM-L6-v2')
+    sentence_model_preload = os.getenv('SENTENCE_MODEL_PRELOAD', 'true').lower() in {'1', 'true', 'yes'}
+    health_requires_model_ready = os.getenv('HEALTH_REQUIRES_MODEL_READY', 'false').lower() in {'1', 'true', 'yes'}
+    embedding_batch_max_texts = max(1, int(os.getenv('EMBEDDING_BATCH_MAX_TEXTS', '32')))
+    embedding_batch_wait_ms = max(0.0, float(os.getenv('EMBEDDING_BATCH_WAIT_MS', '5')))
+    embedding_cache_max_entries = max(1, int(os.getenv('EMBEDDING_CACHE_MAX_ENTRIES', '512')))
+    embedding_cache_dir = os.getenv('EMBEDDING_CACHE_DIR', '').strip()
+    embedding_cache_max_disk_entries = max(1, int(os.getenv('EMBEDDING_CACHE_MAX_DISK_ENTRIES', '4096')))
+    embedding_chunk_cache_max_entries = max(1, int(os.getenv('EMBEDDING_CHUNK_CACHE_MAX_ENTRIES', '64')))
     auto_market_enrichment_enabled = os.getenv('AUTO_MARKET_ENRICHMENT_ENABLED', 'true').lower() in {'1', 'true', 'yes'}
     job_search_timeout_seconds = float(os.getenv('JOB_SEARCH_TIMEOUT_SECONDS', '8'))
     job_search_max_candidates = int(os.getenv('JOB_SEARCH_MAX_CANDIDATES', '3'))
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+from config import get_settings
+
+
+_log = logging.getLogger('elevate.embeddings')
+_cache: EmbeddingCache | None = None
+_chunk_cache: EmbeddingCache | None = None
+_cache_lock = Lock()
+
+
+def embedding_cache_key(model_name: str, text: str) -> str:
+    return hashlib.sha256(f'{model_name}\0{text}'.encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    """Bounded LRU of text embeddings with an optional, bounded on-disk `.npy` store.
+
+    Entries are keyed by sha256(model name + text). Disk entries are written
+    atomically and read back memory-mapped, so they survive restarts without being
+    copied into the heap until they are promoted into the LRU. The disk store keeps
+    at most `max_disk_entries` files and removes the least recently used ones.
+
+    `get_in_memory` and `remember` never touch the disk; `load_from_disk` and
+    `persist` block on file I/O and are meant to run off the event loop.
+    """
+
+    def __init__(
+        self,
+        *,
+        model_name: str,
+        max_entries: int,
+        directory: Path | None = None,
+        max_disk_entries: int = 4096,
+    ) -> None:
+        self.model_name = model_name
+        self.max_entries = max(1, max_entries)
+        self.directory = directory
+        self.max_disk_entries = max(1, max_disk_entries)
+        if directory is not None:
+            directory.mkdir(parents=True, exist_ok=True)
+        self._entries: OrderedDict[str, Any] = OrderedDict()
+        self._disk_keys: OrderedDict[str, None] | None = None
+        self._lock = Lock()
+        self._disk_lock = Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_errors = 0
+        self.disk_evictions = 0
+
+    def _disk_path(self, key: str) -> Path:
+        assert self.directory is not None
+        return self.directory / f'{key}.npy'
+
+    def _disk_index(self) -> OrderedDict[str, None]:
+        # Caller holds _disk_lock. Built on first use, oldest files first.
+        if self._disk_keys is None:
+            assert self.directory is not None
+            paths = []
+            for path in self.directory.glob('*.npy'):
+                try:
+                    paths.append((path.stat().st_mtime, path.stem))
+                except OSError:
+                    continue
+            self._disk_keys = OrderedDict((key, None) for _, key in sorted(paths))
+        return self._disk_keys
+
+    def _remember(self, key: str, vector: Any) -> None:
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_in_memory(self, text: str) -> Any | None:
+        key = embedding_cache_key(self.model_name, text)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            elif self.directory is None:
+                self.misses += 1
+            return vector
+
+    def load_from_disk(self, text: str) -> Any | None:
+        """Read a persisted vector into the LRU (blocking)."""
+        if self.directory is None:
+            return None
+        key = embedding_cache_key(self.model_name, text)
+        path = self._disk_path(key)
+        vector = None
+        with self._disk_lock:
+            index = self._disk_index()
+            if key in index:
+                try:
+                    import numpy as np
+
+                    vector = np.load(path, mmap_mode='r')
+                    index.move_to_end(key)
+                except Exception as exc:
+                    index.pop(key, None)
+                    with self._lock:
+                        self.disk_errors += 1
+                    _log.warning('[EMBED] Ignoring unreadable cached embedding %s: %s', path.name, exc)
+        with self._lock:
+            if vector is None:
+                self.misses += 1
+            else:
+                self._remember(key, vector)
+                self.disk_hits += 1
+        return vector
+
+    def get(self, text: str) -> Any | None:
+        vector = self.get_in_memory(text)
+        return vector if vector is not None else self.load_from_disk(text)
+
+    def remember(self, text: str, vector: Any) -> None:
+        key = embedding_cache_key(self.model_name, text)
+        with self._lock:
+            self._remember(key, vector)
+
+    def persist(self, text: str, vector: Any) -> None:
+        """Write a vector to the disk store and evict beyond `max_disk_entries` (blocking)."""
+        if self.directory is None:
+            return
+        key = embedding_cache_key(self.model_name, text)
+        path = self._disk_path(key)
+        with self._disk_lock:
+            index = self._disk_index()
+            if key in index:
+                index.move_to_end(key)
+                return
+            try:
+                import numpy as np
+
+                file_descriptor, temp_name = tempfile.mkstemp(dir=self.directory, suffix='.npy.tmp')
+                with os.fdopen(file_descriptor, 'wb') as handle:
+                    np.save(handle, np.asarray(vector, dtype=np.float32))
+                os.replace(temp_name, path)
+            except Exception as exc:
+                with self._lock:
+                    self.disk_errors += 1
+                _log.warning('[EMBED] Could not persist embedding %s: %s', path.name, exc)
+                return
+            index[key] = None
+            while len(index) > self.max_disk_entries:
+                evicted, _ = index.popitem(last=False)
+                self._disk_path(evicted).unlink(missing_ok=True)
+                with self._lock:
+                    self.disk_evictions += 1
+
+    def put(self, text: str, vector: Any) -> None:
+        self.remember(text, vector)
+        self.persist(text, vector)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'disk_enabled': self.directory is not None,
+                'disk_entries': len(self._disk_keys) if self._disk_keys is not None else None,
+                'max_disk_entries': self.max_disk_entries if self.directory is not None else None,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'disk_errors': self.disk_errors,
+                'disk_evictions': self.disk_evictions,
+                'hit_rate': round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            }
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Cache for reference texts (job descriptions, role texts), optionally disk-backed."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            settings = get_settings()
+            directory = Path(settings.embedding_cache_dir) if settings.embedding_cache_dir else None
+            try:
+                _cache = EmbeddingCache(
+                    model_name=settings.sentence_model_name,
+                    max_entries=settings.embedding_cache_max_entries,
+                    directory=directory,
+                    max_disk_entries=settings.embedding_cache_max_disk_entries,
+                )
+            except OSError as exc:
+                _log.warning('[EMBED] Embedding cache directory unavailable, using memory only: %s', exc)
+                _cache = EmbeddingCache(
+                    model_name=settings.sentence_model_name,
+                    max_entries=settings.embedding_cache_max_entries,
+                )
+        return _cache
+
+
+def get_chunk_embedding_cache() -> EmbeddingCache:
+    """Small memory-only cache for resume chunks, kept apart so they cannot evict references."""
+    global _chunk_cache
+    with _cache_lock:
+        if _chunk_cache is None:
+            settings = get_settings()
+            _chunk_cache = EmbeddingCache(
+                model_name=settings.sentence_model_name,
+                max_entries=settings.embedding_chunk_cache_max_entries,
+            )
+        return _chunk_cache
+
+
+def get_embedding_cache_stats() -> dict[str, Any]:
+    return {**get_embedding_cache().stats(), 'resume_chunks': get_chunk_embedding_cache().stats()}
@@ -0,0 +1,378 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import Counter
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any
+from weakref import WeakKeyDictionary
+
+from config import get_settings
+from embedding_cache import EmbeddingCache, get_chunk_embedding_cache, get_embedding_cache
+from resume_document import EMBEDDING_CHUNK_CHARS, ResumeDocument, embedding_chunk_chars
+from sentence_model import get_sentence_model, sentence_model_is_loaded
+
+
+_log = logging.getLogger('elevate.embeddings')
+REFERENCE_EMBEDDING_CHARS = 4000
+MAX_POOL_WEIGHT = 0.6
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = Lock()
+_brokers: WeakKeyDictionary[asyncio.AbstractEventLoop, EmbeddingBroker] = WeakKeyDictionary()
+_stats_lock = Lock()
+_batch_size_histogram: Counter[str] = Counter()
+_batches = 0
+_batched_texts = 0
+_batched_requests = 0
+_failed_batches = 0
+
+
+def _batch_size_bucket(size: int) -> str:
+    for bound in BATCH_SIZE_BUCKETS:
+        if size <= bound:
+            return f'<={bound}'
+    return f'>{BATCH_SIZE_BUCKETS[-1]}'
+
+
+def _record_batch(text_count: int, request_count: int, *, failed: bool = False) -> None:
+    global _batches, _batched_texts, _batched_requests, _failed_batches
+    with _stats_lock:
+        _batches += 1
+        _batched_texts += text_count
+        _batched_requests += request_count
+        _batch_size_histogram[_batch_size_bucket(text_count)] += 1
+        if failed:
+            _failed_batches += 1
+
+
+class EmbeddingBroker:
+    """Coalesce concurrent encode requests on one event loop into batched encodes.
+
+    Requests are held for at most `max_wait_seconds`, or until `max_batch_texts`
+    texts are pending, then encoded together on `executor` and the vectors are
+    handed back to each waiting coroutine in request order.
+    """
+
+    def __init__(
+        self,
+        encode: Callable[[list[str]], Sequence[Any]],
+        *,
+        max_batch_texts: int,
+        max_wait_seconds: float,
+        executor: ThreadPoolExecutor,
+    ) -> None:
+        self.encode = encode
+        self.max_batch_texts = max(1, max_batch_texts)
+        self.max_wait_seconds = max(0.0, max_wait_seconds)
+        self.executor = executor
+        self._loop = asyncio.get_running_loop()
+        self._pending: list[tuple[list[str], asyncio.Future[list[Any]]]] = []
+        self._pending_texts = 0
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._running: set[asyncio.Task[None]] = set()
+
+    @property
+    def pending_texts(self) -> int:
+        return self._pending_texts
+
+    async def embed(self, texts: Sequence[str]) -> list[Any]:
+        if not texts:
+            return []
+        future: asyncio.Future[list[Any]] = self._loop.create_future()
+        self._pending.append((list(texts), future))
+        self._pending_texts += len(texts)
+        if self._pending_texts >= self.max_batch_texts:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = self._loop.call_later(self.max_wait_seconds, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        self._pending_texts = 0
+        batch = [(texts, future) for texts, future in batch if not future.cancelled()]
+        if not batch:
+            return
+        task = self._loop.create_task(self._run_batch(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run_batch(self, batch: list[tuple[list[str], asyncio.Future[list[Any]]]]) -> None:
+        texts = [text for request_texts, _ in batch for text in request_texts]
+        try:
+            vectors = await self._loop.run_in_executor(self.executor, self.encode, texts)
+        except Exception as exc:
+            _record_batch(len(texts), len(batch), failed=True)
+            _log.warning('[EMBED] Batched encode of %s texts failed: %s', len(texts), exc)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        _record_batch(len(texts), len(batch))
+        offset = 0
+        for request_texts, future in batch:
+            if not future.done():
+                future.set_result(list(vectors[offset:offset + len(request_texts)]))
+            offset += len(request_texts)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # One encoder thread: batching replaces parallel forward passes that would
+            # otherwise contend for the same CPU threads.
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='embedding')
+        return _executor
+
+
+def _encode_batch(texts: list[str]) -> Sequence[Any]:
+    return get_sentence_model().encode(texts)
+
+
+def _get_broker() -> EmbeddingBroker:
+    loop = asyncio.get_running_loop()
+    broker = _brokers.get(loop)
+    if broker is None:
+        settings = get_settings()
+        broker = EmbeddingBroker(
+            _encode_batch,
+            max_batch_texts=settings.embedding_batch_max_texts,
+            max_wait_seconds=settings.embedding_batch_wait_ms / 1000,
+            executor=_get_executor(),
+        )
+        _brokers[loop] = broker
+    return broker
+
+
+async def embed_texts(texts: Sequence[str]) -> list[Any] | None:
+    """Embed texts through the micro-batching broker; None when the model is unavailable."""
+    model = get_sentence_model() if sentence_model_is_loaded() else await asyncio.to_thread(get_sentence_model)
+    if not model:
+        return None
+    return await _get_broker().embed(texts)
+
+
+@dataclass(slots=True, frozen=True)
+class SemanticAlignment:
+    """Pooled resume/reference similarity plus the best aligned resume section."""
+
+    similarity: float
+    best_section: str | None
+    section_similarities: dict[str, float]
+
+
+def pool_chunk_similarity_matrix(
+    chunks: Sequence[tuple[str, str]],
+    chunk_vectors: Sequence[Any],
+    reference_vectors: Sequence[Any],
+) -> list[SemanticAlignment]:
+    """Score every chunk against every reference in one matrix product and pool per reference.
+
+    The pooled similarity blends the best chunk (max pooling) with the
+    length-weighted mean, so one strong section counts without ignoring the rest.
+    """
+    import numpy as np
+
+    chunk_matrix = np.asarray(chunk_vectors, dtype=np.float32)
+    reference_matrix = np.asarray(reference_vectors, dtype=np.float32).reshape(len(reference_vectors), -1)
+    chunk_norms = np.linalg.norm(chunk_matrix, axis=1, keepdims=True)
+    reference_norms = np.linalg.norm(reference_matrix, axis=1, keepdims=True)
+    chunk_matrix = chunk_matrix / np.where(chunk_norms == 0, 1.0, chunk_norms)
+    reference_matrix = reference_matrix / np.where(reference_norms == 0, 1.0, reference_norms)
+
+    # Rows are references, columns are resume chunks.
+    similarities = reference_matrix @ chunk_matrix.T
+    weights = np.asarray([len(text) for _, text in chunks], dtype=np.float32)
+    pooled = (MAX_POOL_WEIGHT * similarities.max(axis=1)) + (
+        (1 - MAX_POOL_WEIGHT) * (similarities @ weights) / float(weights.sum() or 1.0)
+    )
+
+    labels = [label for label, _ in chunks]
+    alignments: list[SemanticAlignment] = []
+    for pooled_similarity, row in zip(pooled.tolist(), similarities.tolist()):
+        section_similarities: dict[str, float] = {}
+        for label, similarity in zip(labels, row):
+            section_similarities[label] = round(max(similarity, section_similarities.get(label, -1.0)), 4)
+        alignments.append(
+            SemanticAlignment(
+                similarity=max(-1.0, min(1.0, pooled_similarity)),
+                best_section=max(section_similarities, key=section_similarities.__getitem__),
+                section_similarities=section_similarities,
+            )
+        )
+    return alignments
+
+
+def pool_chunk_similarities(
+    chunks: Sequence[tuple[str, str]],
+    chunk_vectors: Sequence[Any],
+    reference_vector: Any,
+) -> SemanticAlignment:
+    return pool_chunk_similarity_matrix(chunks, chunk_vectors, [reference_vector])[0]
+
+
+def _cached_vectors(texts: Sequence[str], caches: Sequence[EmbeddingCache]) -> tuple[list[Any], list[int]]:
+    vectors = [cache.get_in_memory(text) for text, cache in zip(texts, caches)]
+    return vectors, [index for index, vector in enumerate(vectors) if vector is None]
+
+
+def _load_vectors(
+    texts: Sequence[str],
+    caches: Sequence[EmbeddingCache],
+    vectors: list[Any],
+    missing: list[int],
+) -> list[int]:
+    """Fill memory misses from the disk store (blocking); returns the indices still missing."""
+    still_missing = []
+    for index in missing:
+        vectors[index] = caches[index].load_from_disk(texts[index])
+        if vectors[index] is None:
+            still_missing.append(index)
+    return still_missing
+
+
+def _fill_vectors(
+    texts: Sequence[str],
+    caches: Sequence[EmbeddingCache],
+    vectors: list[Any],
+    missing: list[int],
+    encoded: Sequence[Any],
+) -> list[tuple[EmbeddingCache, str, Any]]:
+    """Remember freshly encoded vectors; returns the ones the disk store should keep."""
+    to_persist = []
+    for index, vector in zip(missing, encoded):
+        vectors[index] = vector
+        caches[index].remember(texts[index], vector)
+        if caches[index].directory is not None:
+            to_persist.append((caches[index], texts[index], vector))
+    return to_persist
+
+
+def _persist_vectors(entries: list[tuple[EmbeddingCache, str, Any]]) -> None:
+    for cache, text, vector in entries:
+        cache.persist(text, vector)
+
+
+def _uses_disk(caches: Sequence[EmbeddingCache], indices: list[int]) -> bool:
+    return any(caches[index].directory is not None for index in indices)
+
+
+def encode_texts_cached(model: Any, texts: Sequence[str], caches: Sequence[EmbeddingCache]) -> list[Any]:
+    """Synchronous cache-aware encode; only cache misses reach the model."""
+    vectors, missing = _cached_vectors(texts, caches)
+    missing = _load_vectors(texts, caches, vectors, missing)
+    if not missing:
+        return vectors
+    encoded = model.encode([texts[index] for index in missing])
+    _persist_vectors(_fill_vectors(texts, caches, vectors, missing, encoded))
+    return vectors
+
+
+async def embed_texts_cached(texts: Sequence[str], caches: Sequence[EmbeddingCache]) -> list[Any] | None:
+    """Cache-aware embed through the broker; None when misses cannot be encoded.
+
+    Memory lookups run inline; disk-store reads and writes run in a worker thread.
+    """
+    vectors, missing = _cached_vectors(texts, caches)
+    if _uses_disk(caches, missing):
+        missing = await asyncio.to_thread(_load_vectors, texts, caches, vectors, missing)
+    if not missing:
+        return vectors
+    encoded = await embed_texts([texts[index] for index in missing])
+    if encoded is None:
+        return None
+    to_persist = _fill_vectors(texts, caches, vectors, missing, encoded)
+    if to_persist:
+        await asyncio.to_thread(_persist_vectors, to_persist)
+    return vectors
+
+
+def _alignment_texts(
+    chunks: list[tuple[str, str]],
+    reference_texts: Sequence[str],
+) -> tuple[list[str], list[EmbeddingCache]]:
+    # Resume chunks get their own small in-memory cache so they never push reference vectors out.
+    texts = [text for _, text in chunks] + list(reference_texts)
+    caches = [get_chunk_embedding_cache()] * len(chunks) + [get_embedding_cache()] * len(reference_texts)
+    return texts, caches
+
+
+def _chunk_chars(model: Any) -> int:
+    """Chunk size that fits the loaded model's input window; the MiniLM default otherwise."""
+    max_seq_length = getattr(model, 'max_seq_length', None) if model else None
+    if isinstance(max_seq_length, int) and max_seq_length > 2:
+        return min(EMBEDDING_CHUNK_CHARS, embedding_chunk_chars(max_seq_length))
+    return EMBEDDING_CHUNK_CHARS
+
+
+def encode_alignment(model: Any, document: ResumeDocument, reference_text: str) -> SemanticAlignment | None:
+    """Direct, unbatched alignment for synchronous callers."""
+    chunks = document.embedding_chunks(chunk_chars=_chunk_chars(model))
+    if not chunks:
+        return None
+    texts, caches = _alignment_texts(chunks, [reference_text[:REFERENCE_EMBEDDING_CHARS]])
+    vectors = encode_texts_cached(model, texts, caches)
+    return pool_chunk_similarities(chunks, vectors[:len(chunks)], vectors[len(chunks)])
+
+
+async def compute_semantic_alignments(
+    document: ResumeDocument,
+    reference_texts: Sequence[str],
+) -> list[SemanticAlignment] | None:
+    """Section-chunked alignment of one resume against many references; None without a model.
+
+    Resume chunks and uncached references go out as one broker request, and all
+    references are scored together as one similarity matrix.
+    """
+    model = get_sentence_model() if sentence_model_is_loaded() else None
+    chunks = document.embedding_chunks(chunk_chars=_chunk_chars(model))
+    if not chunks or not reference_texts:
+        return None
+    texts, caches = _alignment_texts(chunks, [text[:REFERENCE_EMBEDDING_CHARS] for text in reference_texts])
+    vectors = await embed_texts_cached(texts, caches)
+    if vectors is None:
+        return None
+    return pool_chunk_similarity_matrix(chunks, vectors[:len(chunks)], vectors[len(chunks):])
+
+
+async def compute_semantic_alignment(document: ResumeDocument, reference_text: str) -> SemanticAlignment | None:
+    alignments = await compute_semantic_alignments(document, [reference_text])
+    return alignments[0] if alignments else None
+
+
+def get_embedding_stats() -> dict[str, Any]:
+    settings = get_settings()
+    with _stats_lock:
+        return {
+            'max_batch_texts': settings.embedding_batch_max_texts,
+            'max_wait_ms': settings.embedding_batch_wait_ms,
+            'batches': _batches,
+            'texts': _batched_texts,
+            'requests': _batched_requests,
+            'failed_batches': _failed_batches,
+            'mean_batch_texts': round(_batched_texts / _batches, 2) if _batches else 0.0,
+            'batch_size_histogram': {
+                bucket: _batch_size_histogram.get(bucket, 0)
+                for bucket in [*(f'<={bound}' for bound in BATCH_SIZE_BUCKETS), f'>{BATCH_SIZE_BUCKETS[-1]}']
+            },
+            'pending_texts': sum(broker.pending_texts for broker in list(_brokers.values())),
+        }
+
+
+def shutdown_embedding_service() -> None:
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+        _brokers.clear()
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
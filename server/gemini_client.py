@@ -2,14 +2,22 @@ from __future__ import annotations
 
 import asyncio
 import json
+import random
+import re
 import time
-from typing import Any
+from email.utils import parsedate_to_datetime
+from typing import Any, Literal
 
 from dotenv import load_dotenv
 from google import genai
 from google.genai import types
+from pydantic import ValidationError
 
+from concurrency_limiter import record_upstream_latency, record_upstream_throttled
 from config import get_settings
+from model_breaker import ModelCircuitBreaker, get_model_breaker
+from model_routing import hedge_delay_seconds, record_hedge, record_model_call, route_models
+from models import DualAnalysisResponse
 
 load_dotenv()
 
@@ -24,6 +32,12 @@ LEGACY_MODEL_ALIASES = {
     'gemini-2.0-flash-lite': 'gemini-2.5-flash-lite',
     'gemini-2.0-flash-lite-001': 'gemini-2.5-flash-lite',
 }
+RETRY_DELAY_PATTERN = re.compile(r'^\s*(\d+(?:\.\d+)?)s\s*$')
+ANALYSIS_SECTION_KEYS = ('full_time_analysis', 'internship_analysis')
+ANALYSIS_TEXT_FIELDS = ('name', 'summary')
+ANALYSIS_LIST_FIELDS = ('experienceSummary', 'educationSummary', 'generalResumeImprovements', 'generalUpskillingSuggestions')
+
+_parse_counters = {'responses': 0, 'clean': 0, 'repaired': 0, 'failed': 0}
 
 
 def _parse_json(text: str) -> dict[str, Any]:
@@ -34,6 +48,120 @@ def _parse_json(text: str) -> dict[str, Any]:
     return json.loads(text[start:end])
 
 
+def _repair_text(value: Any, path: str, repairs: list[str]) -> str:
+    if isinstance(value, str):
+        return value
+    repairs.append(f'{path}: {"missing" if value is None else "coerced to text"}')
+    return '' if value is None or isinstance(value, (dict, list)) else str(value)
+
+
+def _repair_string_list(value: Any, path: str, repairs: list[str]) -> list[str]:
+    if value is None:
+        repairs.append(f'{path}: missing')
+        return []
+    if isinstance(value, str):
+        repairs.append(f'{path}: wrapped a single string')
+        return [value]
+    if not isinstance(value, list):
+        repairs.append(f'{path}: dropped a non-list value')
+        return []
+    items = [item if isinstance(item, str) else str(item) for item in value if isinstance(item, (str, int, float))]
+    if len(items) != len(value) or any(not isinstance(item, str) for item in value):
+        repairs.append(f'{path}: coerced list items to text')
+    return items
+
+
+def _repair_skills(value: Any, path: str, repairs: list[str]) -> list[dict[str, str]]:
+    if isinstance(value, str):
+        repairs.append(f'{path}: split a comma-separated string')
+        value = value.split(',')
+    if not isinstance(value, list):
+        repairs.append(f'{path}: {"missing" if value is None else "dropped a non-list value"}')
+        return []
+    skills: list[dict[str, str]] = []
+    for item in value:
+        if isinstance(item, dict) and isinstance(item.get('name'), str):
+            skills.append({'name': item['name']})
+        elif isinstance(item, str):
+            skills.append({'name': item})
+    if any(not (isinstance(item, dict) and isinstance(item.get('name'), str)) for item in value):
+        repairs.append(f'{path}: normalised skill entries')
+    return skills
+
+
+def _repair_ats_score(value: Any, path: str, repairs: list[str]) -> dict[str, Any]:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        repairs.append(f'{path}: wrapped a bare score')
+        return {'score': value, 'feedback': ''}
+    data = value if isinstance(value, dict) else {}
+    try:
+        score = float(data.get('score'))
+    except (TypeError, ValueError):
+        repairs.append(f'{path}.score: defaulted to 0')
+        score = 0.0
+    return {'score': score, 'feedback': _repair_text(data.get('feedback'), f'{path}.feedback', repairs)}
+
+
+def _repair_dual_analysis(payload: Any) -> tuple[dict[str, Any], list[str]]:
+    """Fix small shape defects in a dual analysis payload; missing sections are not repairable."""
+    if not isinstance(payload, dict) or not all(isinstance(payload.get(key), dict) for key in ANALYSIS_SECTION_KEYS):
+        raise ValueError('Gemini response is missing an analysis section.')
+    repairs: list[str] = []
+    repaired: dict[str, Any] = {}
+    for key in ANALYSIS_SECTION_KEYS:
+        section = payload[key]
+        fixed: dict[str, Any] = {field: _repair_text(section.get(field), f'{key}.{field}', repairs) for field in ANALYSIS_TEXT_FIELDS}
+        fixed['atsScore'] = _repair_ats_score(section.get('atsScore'), f'{key}.atsScore', repairs)
+        fixed['extractedSkills'] = _repair_skills(section.get('extractedSkills'), f'{key}.extractedSkills', repairs)
+        for field in ANALYSIS_LIST_FIELDS:
+            fixed[field] = _repair_string_list(section.get(field), f'{key}.{field}', repairs)
+        repaired[key] = fixed
+    return repaired, repairs
+
+
+def _parse_dual_analysis(response: Any) -> tuple[DualAnalysisResponse, list[str]]:
+    """Typed dual analysis from a schema-constrained response, plus any local repairs.
+
+    The SDK has usually validated the text against the schema already
+    (`response.parsed`); otherwise the text is validated in one pass, and only
+    if that fails is the JSON object extracted and its shape repaired, so small
+    defects never cost a retry.
+    """
+    _parse_counters['responses'] += 1
+    parsed = getattr(response, 'parsed', None)
+    if isinstance(parsed, DualAnalysisResponse):
+        _parse_counters['clean'] += 1
+        return parsed, []
+    text = response.text or ''
+    try:
+        result = DualAnalysisResponse.model_validate_json(text)
+        _parse_counters['clean'] += 1
+        return result, []
+    except ValidationError:
+        pass
+    try:
+        payload, repairs = _repair_dual_analysis(_parse_json(text))
+        result = DualAnalysisResponse.model_validate(payload)
+    except ValueError as exc:
+        _parse_counters['failed'] += 1
+        raise ValueError(f'Gemini response did not match the analysis schema: {exc}') from exc
+    _parse_counters['repaired'] += 1
+    return result, repairs
+
+
+def get_parse_stats() -> dict[str, Any]:
+    counters = dict(_parse_counters)
+    return {
+        **counters,
+        'failure_rate': round(counters['failed'] / counters['responses'], 4) if counters['responses'] else 0.0,
+    }
+
+
+def reset_parse_stats() -> None:
+    for name in _parse_counters:
+        _parse_counters[name] = 0
+
+
 def _should_retry(exc: Exception) -> bool:
     message = str(exc)
     retry_markers = (
@@ -47,6 +175,11 @@ def _should_retry(exc: Exception) -> bool:
     return any(marker.lower() in message.lower() for marker in retry_markers)
 
 
+def _is_rate_limited(exc: Exception) -> bool:
+    message = str(exc).lower()
+    return '429' in message or 'resource_exhausted' in message
+
+
 def _is_model_missing_error(exc: Exception) -> bool:
     message = str(exc).lower()
     return (
@@ -57,6 +190,11 @@ def _is_model_missing_error(exc: Exception) -> bool:
     )
 
 
+def _is_model_unavailable_error(exc: Exception) -> bool:
+    """Errors that count against a model's circuit breaker."""
+    return _should_retry(exc) or _is_model_missing_error(exc)
+
+
 def _normalize_model_name(model_name: str) -> str:
     normalized = model_name.strip()
     if not normalized:
@@ -74,45 +212,270 @@ def _candidate_models() -> list[str]:
     return deduped
 
 
+def _retry_after_seconds(exc: Exception) -> float | None:
+    """Server-requested delay from a Retry-After header or a google.rpc.RetryInfo detail."""
+    headers = getattr(getattr(exc, 'response', None), 'headers', None)
+    value = headers.get('retry-after') if headers is not None else None
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+
+    details = getattr(exc, 'details', None)
+    error = details.get('error', details) if isinstance(details, dict) else None
+    for item in (error or {}).get('details', []) if isinstance(error, dict) else []:
+        if isinstance(item, dict) and str(item.get('@type', '')).endswith('RetryInfo'):
+            match = RETRY_DELAY_PATTERN.match(str(item.get('retryDelay', '')))
+            if match:
+                return float(match.group(1))
+    return None
+
+
+def _retry_delay_seconds(exc: Exception, attempt: int) -> float:
+    retry_after = _retry_after_seconds(exc)
+    if retry_after is not None:
+        return retry_after
+    backoff = min(settings.gemini_retry_max_backoff_seconds, settings.gemini_retry_backoff_seconds * (2 ** attempt))
+    return (backoff / 2) + random.uniform(0, backoff / 2)
+
+
+def _failure_action(exc: Exception, *, attempt: int, has_fallback_model: bool) -> Literal['missing', 'retry', 'next_model', 'raise']:
+    if _is_model_missing_error(exc):
+        return 'missing'
+    if not _should_retry(exc):
+        return 'next_model' if has_fallback_model else 'raise'
+    if attempt < settings.gemini_max_retries - 1:
+        return 'retry'
+    return 'next_model'
+
+
+def _exhausted_error(
+    models: list[str],
+    missing_models: list[str],
+    skipped_models: list[str],
+    last_error: Exception | None,
+) -> RuntimeError:
+    if last_error is None and skipped_models:
+        return RuntimeError(
+            f'All Gemini models are temporarily unavailable (circuit open): {", ".join(skipped_models)}.'
+        )
+    if missing_models and len(set(missing_models)) == len(models):
+        return RuntimeError(
+            'Current Gemini model configuration is invalid or deprecated. '
+            f'Tried: {", ".join(models)}. '
+            'Update GEMINI_MODEL and GEMINI_FALLBACK_MODELS to supported models.'
+        )
+    return RuntimeError(f'Gemini request failed after retries and fallbacks: {last_error}')
+
+
+def _record_call(breaker: ModelCircuitBreaker, *, prompt_chars: int, started_at: float, error: BaseException | None) -> None:
+    """Feed one request outcome into the model's circuit breaker and latency stats.
+
+    Errors that say nothing about availability (bad request, unparsable output)
+    count as a reachable model for the breaker but add no latency sample.
+    """
+    latency_ms = (time.perf_counter() - started_at) * 1000
+    if error is None:
+        breaker.record_success()
+        record_model_call(breaker.model_name, latency_ms=latency_ms, ok=True, prompt_chars=prompt_chars)
+    elif not isinstance(error, Exception) or _is_model_unavailable_error(error):
+        breaker.record_failure()
+        record_model_call(breaker.model_name, latency_ms=latency_ms, ok=False, prompt_chars=prompt_chars)
+    else:
+        breaker.record_success()
+
+
+def _generation_config(response_schema: type[DualAnalysisResponse] | None = None) -> types.GenerateContentConfig:
+    return types.GenerateContentConfig(response_mime_type='application/json', response_schema=response_schema)
+
+
 def _generate_json(prompt: str) -> dict[str, Any]:
+    """Blocking JSON generation for synchronous callers; the analysis path uses `_generate_dual_analysis_async`."""
     if not client:
         raise RuntimeError('GEMINI_API_KEY is not configured.')
 
     last_error: Exception | None = None
-    models = _candidate_models()
+    models = route_models(_candidate_models(), prompt_chars=len(prompt)).models
     missing_models: list[str] = []
+    skipped_models: list[str] = []
 
     for model_index, model_name in enumerate(models):
+        breaker = get_model_breaker(model_name)
         for attempt in range(settings.gemini_max_retries):
+            if not breaker.allow_request():
+                if attempt == 0:
+                    skipped_models.append(model_name)
+                break
+            started_at = time.perf_counter()
+            response = None
             try:
-                response = client.models.generate_content(
-                    model=model_name,
-                    contents=prompt,
-                    config=types.GenerateContentConfig(response_mime_type='application/json'),
-                )
+                response = client.models.generate_content(model=model_name, contents=prompt, config=_generation_config())
+                _record_call(breaker, prompt_chars=len(prompt), started_at=started_at, error=None)
                 return _parse_json(response.text)
             except Exception as exc:
+                if response is None:
+                    _record_call(breaker, prompt_chars=len(prompt), started_at=started_at, error=exc)
                 last_error = exc
-                is_last_attempt = attempt == settings.gemini_max_retries - 1
-                has_fallback_model = model_index < len(models) - 1
-                if _is_model_missing_error(exc):
-                    missing_models.append(model_name)
-                    break
-                if not _should_retry(exc) and not has_fallback_model:
+                action = _failure_action(exc, attempt=attempt, has_fallback_model=model_index < len(models) - 1)
+                if action == 'raise':
                     raise
-                if not is_last_attempt:
-                    time.sleep(settings.gemini_retry_backoff_seconds * (attempt + 1))
+                if action == 'retry':
+                    time.sleep(_retry_delay_seconds(exc, attempt))
                     continue
+                if action == 'missing':
+                    missing_models.append(model_name)
                 break
 
-    if missing_models and len(set(missing_models)) == len(models):
-        raise RuntimeError(
-            'Current Gemini model configuration is invalid or deprecated. '
-            f'Tried: {", ".join(models)}. '
-            'Update GEMINI_MODEL and GEMINI_FALLBACK_MODELS to supported models.'
+    raise _exhausted_error(models, missing_models, skipped_models, last_error)
+
+
+async def _call_model(model_name: str, prompt: str, config: types.GenerateContentConfig) -> Any:
+    """One generate_content call, recorded against the model's breaker and latency stats.
+
+    Throttling and latency also feed the adaptive analysis concurrency limit.
+    Cancellation is left to the caller, so a cancelled hedge loser does not count
+    against its model.
+    """
+    breaker = get_model_breaker(model_name)
+    started_at = time.perf_counter()
+    try:
+        response = await client.aio.models.generate_content(
+            model=model_name,
+            contents=prompt,
+            config=config,
         )
+    except Exception as exc:
+        _record_call(breaker, prompt_chars=len(prompt), started_at=started_at, error=exc)
+        if _is_rate_limited(exc):
+            record_upstream_throttled()
+        raise
+    _record_call(breaker, prompt_chars=len(prompt), started_at=started_at, error=None)
+    record_upstream_latency((time.perf_counter() - started_at) * 1000)
+    return response
+
+
+def _hedge_model(model_name: str, models: list[str]) -> str:
+    if settings.gemini_hedge_target == 'fallback':
+        later_models = models[models.index(model_name) + 1:]
+        if later_models:
+            return later_models[0]
+    return model_name
+
+
+async def _call_with_hedge(
+    model_name: str,
+    prompt: str,
+    models: list[str],
+    config: types.GenerateContentConfig,
+) -> tuple[Any, str, bool]:
+    """Call `model_name`, hedging with a second request once it outlives its latency percentile.
+
+    Returns (response, serving model, whether a hedge was fired). The first
+    successful response wins and the other request is cancelled; if both fail the
+    primary's error is raised so the normal retry rules apply.
+    """
+    delay = hedge_delay_seconds(model_name, len(prompt))
+    if delay is None:
+        return await _call_model(model_name, prompt, config), model_name, False
+
+    hedge_name = _hedge_model(model_name, models)
+    primary = asyncio.create_task(_call_model(model_name, prompt, config))
+    hedge: asyncio.Task[Any] | None = None
+    try:
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        # Hedges only go to healthy models so they never take a half-open probe slot.
+        if done or get_model_breaker(hedge_name).state != 'closed':
+            return await primary, model_name, False
+
+        hedge = asyncio.create_task(_call_model(hedge_name, prompt, config))
+        racers = {primary: model_name, hedge: hedge_name}
+        pending: set[asyncio.Task[Any]] = set(racers)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    record_hedge('hedge_won' if task is hedge else 'primary_won')
+                    return task.result(), racers[task], True
+        record_hedge('both_failed')
+        raise primary.exception()
+    finally:
+        for task in (primary, hedge):
+            if task is not None and not task.done():
+                task.cancel()
+
+
+async def _generate_dual_analysis_async(prompt: str, *, deadline: float) -> tuple[DualAnalysisResponse, dict[str, Any]]:
+    """Generate the schema-constrained dual analysis; returns (typed result, call metadata).
+
+    Models are tried in the order chosen by the routing policy, and slow calls may
+    be hedged (see `_call_with_hedge`). Backoff sleeps are `asyncio.sleep`, so
+    cancelling the caller (for example via `asyncio.wait_for`) cancels both the
+    sleep and the in-flight HTTP requests. A retry whose delay would overrun
+    `deadline` (event-loop time) is skipped in favour of the next fallback model,
+    and models whose circuit breaker is open are skipped without a request.
+    """
+    if not client:
+        raise RuntimeError('GEMINI_API_KEY is not configured.')
+
+    loop = asyncio.get_running_loop()
+    last_error: Exception | None = None
+    routing = route_models(_candidate_models(), prompt_chars=len(prompt))
+    models = routing.models
+    config = _generation_config(DualAnalysisResponse)
+    missing_models: list[str] = []
+    skipped_models: list[str] = []
+    attempts = 0
+
+    for model_index, model_name in enumerate(models):
+        breaker = get_model_breaker(model_name)
+        for attempt in range(settings.gemini_max_retries):
+            if not breaker.allow_request():
+                if attempt == 0:
+                    skipped_models.append(model_name)
+                break
+            attempts += 1
+            started_at = time.perf_counter()
+            try:
+                response, served_by, hedged = await _call_with_hedge(model_name, prompt, models, config)
+                result, repairs = _parse_dual_analysis(response)
+                return result, {
+                    'model': served_by,
+                    'attempts': attempts,
+                    'hedged': hedged,
+                    'repairs': repairs,
+                    'skipped_models': skipped_models,
+                    'routing': routing.as_metadata(),
+                }
+            except asyncio.CancelledError as exc:
+                # Only a call abandoned at our own deadline counts against the model; a lost
+                # hedge, a client disconnect or shutdown says nothing about its health.
+                if loop.time() >= deadline:
+                    _record_call(breaker, prompt_chars=len(prompt), started_at=started_at, error=exc)
+                raise
+            except Exception as exc:
+                last_error = exc
+                action = _failure_action(exc, attempt=attempt, has_fallback_model=model_index < len(models) - 1)
+                if action == 'raise':
+                    raise
+                if action == 'retry':
+                    delay = _retry_delay_seconds(exc, attempt)
+                    if loop.time() + delay < deadline:
+                        await asyncio.sleep(delay)
+                        continue
+                    # Waiting would overrun the deadline; a fallback model can still be tried right away.
+                    if model_index == len(models) - 1:
+                        raise RuntimeError(
+                            f'Gemini asked to retry after {delay:.1f}s, past the request deadline: {exc}'
+                        ) from exc
+                if action == 'missing':
+                    missing_models.append(model_name)
+                break
 
-    raise RuntimeError(f'Gemini request failed after retries and fallbacks: {last_error}')
+    raise _exhausted_error(models, missing_models, skipped_models, last_error)
 
 
 def generate_resume_extraction(*, resume_text: str, job_description: str, target_role: str, weak_bullets: list[str]) -> dict[str, Any]:
@@ -188,5 +551,15 @@ Weak bullets:
     return normalized
 
 
-async def get_dual_analysis(prompt: str) -> dict[str, Any]:
-    return await asyncio.to_thread(_generate_json, prompt)
+async def get_dual_analysis(
+    prompt: str,
+    *,
+    deadline_seconds: float | None = None,
+) -> tuple[DualAnalysisResponse, dict[str, Any]]:
+    """Run the dual analysis prompt; returns (typed result, model/routing metadata)."""
+    timeout = deadline_seconds if deadline_seconds is not None else settings.gemini_deadline_seconds
+    deadline = asyncio.get_running_loop().time() + timeout
+    try:
+        return await asyncio.wait_for(_generate_dual_analysis_async(prompt, deadline=deadline), timeout=timeout)
+    except TimeoutError as exc:
+        raise RuntimeError(f'Gemini analysis exceeded the {timeout:g}s deadline.') from exc
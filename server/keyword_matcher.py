@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Any
+
+WORD_CHAR_PATTERN = re.compile(r'\w')
+KEYWORD_MATCHER_CACHE_SIZE = 256
+
+
+class KeywordMatcher:
+    """Match a fixed keyword set against text in a single regex scan.
+
+    Every keyword becomes one capture group of a combined alternation wrapped in a
+    zero-width lookahead, so overlapping keywords are still found. A keyword only
+    matches between non-word characters, like `(?<!\\w)keyword(?!\\w)`. When two
+    keywords start at the same offset the regex reports the longest one, and any
+    shorter keyword that is a prefix of it is checked directly.
+    """
+
+    __slots__ = ('keywords', '_pattern', '_prefixes')
+
+    def __init__(self, keywords: tuple[str, ...]) -> None:
+        self.keywords = tuple(dict.fromkeys(keyword.lower() for keyword in keywords if keyword))
+        ordered = sorted(self.keywords, key=len, reverse=True)
+        self._pattern: re.Pattern[str] | None = None
+        if ordered:
+            alternation = '|'.join(f'({re.escape(keyword)})(?!\\w)' for keyword in ordered)
+            self._pattern = re.compile(rf'(?<!\w)(?=(?:{alternation}))', re.IGNORECASE)
+        self._prefixes: dict[int, tuple[str, ...]] = {}
+        for group_index, keyword in enumerate(ordered, start=1):
+            prefixes = tuple(other for other in ordered if other != keyword and keyword.startswith(other))
+            self._prefixes[group_index] = (keyword, *prefixes)
+
+    def _prefix_matches(self, text: str, start: int, keyword: str) -> bool:
+        end = start + len(keyword)
+        if text[start:end].lower() != keyword:
+            return False
+        return end >= len(text) or not WORD_CHAR_PATTERN.match(text, end)
+
+    def find(self, text: str) -> set[str]:
+        found: set[str] = set()
+        if self._pattern is None:
+            return found
+        for match in self._pattern.finditer(text):
+            keyword, *prefixes = self._prefixes[match.lastindex or 0]
+            found.add(keyword)
+            for prefix in prefixes:
+                if prefix not in found and self._prefix_matches(text, match.start(), prefix):
+                    found.add(prefix)
+            if len(found) == len(self.keywords):
+                break
+        return found
+
+    def partition(self, text: str) -> tuple[list[str], list[str]]:
+        """Split the keywords into (matched, missing), keeping their original order."""
+        found = self.find(text)
+        matched = [keyword for keyword in self.keywords if keyword in found]
+        missing = [keyword for keyword in self.keywords if keyword not in found]
+        return matched, missing
+
+
+@lru_cache(maxsize=KEYWORD_MATCHER_CACHE_SIZE)
+def compile_keyword_matcher(keywords: tuple[str, ...]) -> KeywordMatcher:
+    return KeywordMatcher(keywords)
+
+
+def match_keywords(text: str, keywords: list[str] | tuple[str, ...]) -> tuple[list[str], list[str]]:
+    return compile_keyword_matcher(tuple(keywords)).partition(text)
+
+
+def get_keyword_matcher_stats() -> dict[str, Any]:
+    info = compile_keyword_matcher.cache_info()
+    return {'hits': info.hits, 'misses': info.misses, 'size': info.currsize, 'max_size': info.maxsize}
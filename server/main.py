@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import asyncio
-import base64
 import logging
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
@@ -15,32 +14,41 @@ from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, Response
 
+from analysis_flight import claim_flight, follow_flight, get_single_flight_stats, hold_flight, release_flight
+from concurrency_limiter import AdaptiveConcurrencyLimiter, get_analysis_limiter
 from config import get_settings
-from models import AnalysisStatusPayload, JobSearchRequest, RetargetRequest
+from embedding_cache import get_embedding_cache_stats
+from embedding_service import get_embedding_stats, shutdown_embedding_service
+from model_breaker import get_model_breaker_stats
+from model_routing import get_hedge_stats, get_model_latency_stats
+from models import AnalysisStatusPayload, BatchScoreRequest, JobSearchRequest, RetargetRequest
+from ocr_pool import get_ocr_pool_stats, shutdown_ocr_pool
+from parse_sandbox import get_parse_sandbox_stats, shutdown_parse_sandbox
 from redis_store import (
     StorageUnavailableError,
-    delete_upload_blob,
+    get_extracted_text,
     get_resume_text,
     get_sync_redis,
     get_task_status,
-    get_upload_blob,
+    set_extracted_text,
     set_resume_text,
-    set_upload_blob,
     using_local_memory_store,
 )
+from resume_document import ResumeDocument
 from resume_pipeline import (
-    compute_payload_hash,
     enforce_daily_rate_limit,
-    extract_text_with_fallback,
     initialize_task_state,
     maybe_return_cached,
+    parse_resume_upload,
     persist_cached_result,
     prepare_result_for_response,
     update_task,
     validate_resume_text_quality,
 )
+from sentence_model import get_sentence_model_status, sentence_model_is_ready, warm_sentence_model
 from service_clients import get_gateway_health, route_job_search
-from service_logic import build_resume_review_core, enrich_resume_review_market
+from service_logic import build_resume_review_core, enrich_resume_review_market, score_resume_against_job_descriptions
+from upload_stream import ResumeUpload, read_resume_upload
 
 
 settings = get_settings()
@@ -60,7 +68,7 @@ if settings.sentry_dsn:
 
 _log = logging.getLogger('elevate')
 _background_tasks: set[asyncio.Task[None]] = set()
-_analysis_slots: WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = WeakKeyDictionary()
+_batch_score_slots: WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = WeakKeyDictionary()
 
 
 @asynccontextmanager
@@ -88,6 +96,8 @@ async def _lifespan(app: FastAPI):  # noqa: ARG001
         )
     else:
         _log.info('[STARTUP] Redis config detected — connecting to Upstash.')
+    if settings.sentence_model_preload:
+        _schedule_background_task(asyncio.to_thread(warm_sentence_model))
 
     yield  # ── Running ────────────────────────────────────────────────────
 
@@ -95,6 +105,9 @@ async def _lifespan(app: FastAPI):  # noqa: ARG001
     pending = [t for t in _background_tasks if not t.done()]
     if pending:
         await asyncio.gather(*pending, return_exceptions=True)
+    shutdown_ocr_pool()
+    shutdown_parse_sandbox()
+    shutdown_embedding_service()
 
 
 app = FastAPI(title=settings.app_name, version=settings.app_version, lifespan=_lifespan)
@@ -142,12 +155,17 @@ def _schedule_background_task(coroutine: Coroutine[object, object, None]) -> Non
     task.add_done_callback(_background_tasks.discard)
 
 
-def _get_analysis_slots() -> asyncio.Semaphore:
+def _get_analysis_slots() -> AdaptiveConcurrencyLimiter:
+    return get_analysis_limiter()
+
+
+def _get_batch_score_slots() -> asyncio.Semaphore:
+    # Batch scoring is local CPU work; it must not take, or grow, the Gemini-driven analysis limit.
     loop = asyncio.get_running_loop()
-    slots = _analysis_slots.get(loop)
+    slots = _batch_score_slots.get(loop)
     if slots is None:
-        slots = asyncio.Semaphore(settings.max_concurrent_analyses)
-        _analysis_slots[loop] = slots
+        slots = asyncio.Semaphore(settings.batch_score_max_concurrency)
+        _batch_score_slots[loop] = slots
     return slots
 
 
@@ -162,32 +180,54 @@ def _skip_market_enrichment(result: dict[str, object]) -> dict[str, object]:
     return skipped_result
 
 
+def _load_cached_resume_document(extracted: dict[str, object]) -> ResumeDocument:
+    resume_text = str(extracted['resume_text'])
+    document_payload = extracted.get('document')
+    if isinstance(document_payload, dict):
+        return ResumeDocument.from_payload(resume_text, document_payload)
+    return ResumeDocument.from_text(resume_text)
+
+
 async def _run_analysis_task(
     *,
     task_id: str,
-    contents: bytes | None,
+    upload: ResumeUpload,
     filename: str,
     target_role: str,
     experience_level: str,
     job_description: str,
     cache_hash: str,
+    pdf_digest: str,
 ) -> None:
-    owned_contents = contents
+    enrichment_scheduled = False
     try:
-        if owned_contents is None:
-            encoded_blob = get_upload_blob(task_id)
-            if not encoded_blob:
-                raise ValueError('Uploaded resume payload expired before processing started.')
-            owned_contents = base64.b64decode(encoded_blob)
-
-        async with _get_analysis_slots():
-            update_task(task_id, status='processing', progress=14, current_step='Parsing resume')
-            resume_text, parsing_method = await asyncio.to_thread(
-                extract_text_with_fallback,
-                owned_contents,
-                filename,
-            )
-            await asyncio.to_thread(validate_resume_text_quality, resume_text)
+        async with hold_flight(cache_hash, task_id), _get_analysis_slots():
+            extracted = get_extracted_text(pdf_digest)
+            if extracted:
+                update_task(task_id, status='processing', progress=30, current_step='Reusing parsed resume text')
+                resume_document = _load_cached_resume_document(extracted)
+                parsing_method = str(extracted['parsing_method'])
+                page_parsing_methods = list(extracted.get('page_parsing_methods') or [])
+            else:
+                owned_contents = await asyncio.to_thread(upload.read_bytes)
+
+                update_task(task_id, status='processing', progress=14, current_step='Parsing resume')
+                resume_document, parsing_method, page_parsing_methods = await asyncio.to_thread(
+                    parse_resume_upload,
+                    owned_contents,
+                    filename,
+                )
+                set_extracted_text(
+                    pdf_digest,
+                    {
+                        'resume_text': resume_document.text,
+                        'parsing_method': parsing_method,
+                        'page_parsing_methods': page_parsing_methods,
+                        'word_count': resume_document.word_count,
+                        'document': resume_document.to_payload(),
+                    },
+                )
+            resume_text = resume_document.text
             set_resume_text(task_id, resume_text)
 
             update_task(task_id, status='processing', progress=52, current_step='Running Gemini analysis')
@@ -197,6 +237,9 @@ async def _run_analysis_task(
                 experience_level=experience_level,
                 job_description=job_description,
                 parsing_method=parsing_method,
+                page_parsing_methods=page_parsing_methods,
+                resume_document=resume_document,
+                resume_digest=pdf_digest,
             )
             should_auto_enrich_market = settings.auto_market_enrichment_enabled
             result_to_store = result if should_auto_enrich_market else _skip_market_enrichment(result)
@@ -218,14 +261,51 @@ async def _run_analysis_task(
                         cache_hash=cache_hash,
                     )
                 )
+                enrichment_scheduled = True
     except Exception as exc:
         update_task(task_id, status='failed', progress=100, current_step='Analysis failed', error=str(exc))
     finally:
-        if contents is None:
-            try:
-                delete_upload_blob(task_id)
-            except Exception:
-                pass
+        # With market enrichment pending, the enrichment task finishes the flight.
+        if not enrichment_scheduled:
+            release_flight(cache_hash, task_id)
+        upload.close()
+
+
+async def _run_coalesced_analysis_task(
+    *,
+    leader_task_id: str,
+    task_id: str,
+    upload: ResumeUpload,
+    filename: str,
+    target_role: str,
+    experience_level: str,
+    job_description: str,
+    cache_hash: str,
+    pdf_digest: str,
+) -> None:
+    try:
+        next_leader: str | None = leader_task_id
+        while next_leader:
+            if await follow_flight(task_id, next_leader, cache_hash) or maybe_return_cached(cache_hash, task_id):
+                upload.close()
+                return
+            # The leading analysis stopped without settling; take over or follow its replacement.
+            next_leader = claim_flight(cache_hash, task_id)
+    except Exception as exc:
+        update_task(task_id, status='failed', progress=100, current_step='Analysis failed', error=str(exc))
+        upload.close()
+        return
+
+    await _run_analysis_task(
+        task_id=task_id,
+        upload=upload,
+        filename=filename,
+        target_role=target_role,
+        experience_level=experience_level,
+        job_description=job_description,
+        cache_hash=cache_hash,
+        pdf_digest=pdf_digest,
+    )
 
 
 async def _run_retarget_task(
@@ -236,17 +316,26 @@ async def _run_retarget_task(
     experience_level: str,
     job_description: str,
     parsing_method: str,
+    page_parsing_methods: list[str] | None = None,
+    resume_digest: str | None = None,
 ) -> None:
     try:
         async with _get_analysis_slots():
             update_task(task_id, status='processing', progress=24, current_step='Reframing target role')
             set_resume_text(task_id, resume_text)
+            extracted = get_extracted_text(resume_digest) if resume_digest else None
+            resume_document = None
+            if extracted and str(extracted.get('resume_text', '')).strip() == resume_text:
+                resume_document = _load_cached_resume_document(extracted)
             result = await build_resume_review_core(
                 resume_text=resume_text,
                 target_role=target_role,
                 experience_level=experience_level,
                 job_description=job_description,
                 parsing_method=parsing_method,
+                page_parsing_methods=page_parsing_methods,
+                resume_document=resume_document,
+                resume_digest=resume_digest,
             )
             should_auto_enrich_market = settings.auto_market_enrichment_enabled
             result_to_store = result if should_auto_enrich_market else _skip_market_enrichment(result)
@@ -276,7 +365,11 @@ async def _run_market_enrichment_task(
     cache_hash: str | None = None,
 ) -> None:
     try:
-        enriched_result = await enrich_resume_review_market(result)
+        if cache_hash:
+            async with hold_flight(cache_hash, task_id):
+                enriched_result = await enrich_resume_review_market(result)
+        else:
+            enriched_result = await enrich_resume_review_market(result)
     except Exception as exc:
         enriched_result = dict(result)
         enriched_result['job_market_pending'] = False
@@ -286,17 +379,21 @@ async def _run_market_enrichment_task(
         quality_signals['job_feed_mode'] = 'partial'
         enriched_result['quality_signals'] = quality_signals
 
-    if cache_hash:
-        persist_cached_result(cache_hash, enriched_result)
+    try:
+        if cache_hash:
+            persist_cached_result(cache_hash, enriched_result)
 
-    update_task(
-        task_id,
-        status='completed',
-        progress=100,
-        current_step='Dashboard ready',
-        result=prepare_result_for_response(enriched_result),
-        error=None,
-    )
+        update_task(
+            task_id,
+            status='completed',
+            progress=100,
+            current_step='Dashboard ready',
+            result=prepare_result_for_response(enriched_result),
+            error=None,
+        )
+    finally:
+        if cache_hash:
+            release_flight(cache_hash, task_id)
 
 
 @app.exception_handler(RequestValidationError)
@@ -352,47 +449,59 @@ async def create_analysis_task(request: Request):
     if not allowed:
         raise HTTPException(status_code=429, detail='Daily analysis limit reached for this IP address.')
 
-    form = await request.form()
-    file = form.get('file')
-    if file is None or not hasattr(file, 'read') or not hasattr(file, 'filename'):
-        raise HTTPException(status_code=422, detail='A resume PDF file is required.')
+    upload = await read_resume_upload(
+        request,
+        max_bytes=settings.max_upload_size_bytes,
+        spool_threshold=settings.upload_spool_threshold_bytes,
+    )
+    try:
+        job_description = upload.fields.get('job_description', '').strip()
+        target_role = upload.fields.get('target_role', '').strip() or 'Software Engineer'
+        experience_level = upload.fields.get('experience_level', '').strip() or 'Entry Level'
+
+        task_id = str(uuid4())
+        cache_hash = upload.payload_hash(job_description, target_role, experience_level)
+        initialize_task_state(task_id)
+        cached_result = maybe_return_cached(cache_hash, task_id)
+        if cached_result:
+            upload.close()
+            return AnalysisStatusPayload(
+                task_id=task_id,
+                status='completed',
+                progress=100,
+                current_step='Cached analysis found',
+                cached=True,
+                result=cached_result,
+                error=None,
+            )
 
-    job_description = str(form.get('job_description', '') or '')
-    target_role = str(form.get('target_role', 'Software Engineer') or 'Software Engineer')
-    experience_level = str(form.get('experience_level', 'Entry Level') or 'Entry Level')
+        leader_task_id = claim_flight(cache_hash, task_id)
+    except BaseException:
+        upload.close()
+        raise
 
-    try:
-        contents = await file.read()
-    finally:
-        await file.close()
-    if len(contents) > settings.max_upload_size_bytes:
-        raise HTTPException(status_code=413, detail='Resume exceeds the 5MB upload limit.')
-    if not file.filename or not file.filename.lower().endswith('.pdf'):
-        raise HTTPException(status_code=415, detail='Only PDF resumes are currently supported.')
-
-    job_description = job_description.strip()
-    target_role = target_role.strip() or 'Software Engineer'
-    experience_level = experience_level.strip() or 'Entry Level'
-
-    task_id = str(uuid4())
-    cache_hash = compute_payload_hash(contents, job_description, target_role, experience_level)
-    initialize_task_state(task_id)
-    cached_result = maybe_return_cached(cache_hash, task_id)
-    if cached_result:
-        return AnalysisStatusPayload(
-            task_id=task_id,
-            status='completed',
-            progress=100,
-            current_step='Cached analysis found',
-            cached=True,
-            result=cached_result,
+    if leader_task_id:
+        payload = update_task(
+            task_id,
+            status='queued',
+            progress=6,
+            current_step='Joining an identical analysis already in progress',
             error=None,
         )
-
-    task_contents: bytes | None = contents
-    if not using_local_memory_store():
-        set_upload_blob(task_id, base64.b64encode(contents).decode('ascii'))
-        task_contents = None
+        _schedule_background_task(
+            _run_coalesced_analysis_task(
+                leader_task_id=leader_task_id,
+                task_id=task_id,
+                upload=upload,
+                filename=upload.filename,
+                target_role=target_role,
+                experience_level=experience_level,
+                job_description=job_description,
+                cache_hash=cache_hash,
+                pdf_digest=upload.pdf_digest,
+            )
+        )
+        return AnalysisStatusPayload(**payload)
 
     payload = update_task(
         task_id,
@@ -404,12 +513,13 @@ async def create_analysis_task(request: Request):
     _schedule_background_task(
         _run_analysis_task(
             task_id=task_id,
-            contents=task_contents,
-            filename=file.filename,
+            upload=upload,
+            filename=upload.filename,
             target_role=target_role,
             experience_level=experience_level,
             job_description=job_description,
             cache_hash=cache_hash,
+            pdf_digest=upload.pdf_digest,
         )
     )
     return AnalysisStatusPayload(**payload)
@@ -440,6 +550,8 @@ async def retarget_analysis(task_id: str, request: RetargetRequest):
     experience_level = request.experience_level.strip() or str(existing_result.get('experience_level', 'Entry Level'))
     job_description = request.job_description.strip()
     parsing_method = str(existing_result.get('parsing_method', 'pdfplumber'))
+    page_parsing_methods = [str(method) for method in existing_result.get('page_parsing_methods') or []]
+    resume_digest = str(existing_result.get('resume_digest') or '') or None
 
     new_task_id = str(uuid4())
     initialize_task_state(new_task_id)
@@ -458,10 +570,60 @@ async def retarget_analysis(task_id: str, request: RetargetRequest):
             experience_level=experience_level,
             job_description=job_description,
             parsing_method=parsing_method,
+            page_parsing_methods=page_parsing_methods,
+            resume_digest=resume_digest,
         )
     )
     return AnalysisStatusPayload(**payload)
 
+
+async def _resolve_batch_resume(request: BatchScoreRequest) -> tuple[ResumeDocument, str]:
+    if request.task_id:
+        existing_payload = await get_task_status(request.task_id)
+        if not existing_payload or not existing_payload.get('result'):
+            raise HTTPException(status_code=404, detail='Original analysis not found.')
+        existing_result = existing_payload['result']
+        resume_text = str(existing_result.get('resume_text_raw', '')).strip()
+        if not resume_text:
+            resume_text = str(get_resume_text(request.task_id) or '').strip()
+        if not resume_text:
+            raise HTTPException(status_code=409, detail='The original parsed resume text is unavailable for scoring.')
+        parsing_method = str(existing_result.get('parsing_method', 'pdfplumber'))
+        resume_digest = str(existing_result.get('resume_digest') or '')
+        extracted = get_extracted_text(resume_digest) if resume_digest else None
+        if extracted and str(extracted.get('resume_text', '')).strip() == resume_text:
+            return _load_cached_resume_document(extracted), parsing_method
+        return ResumeDocument.from_text(resume_text), parsing_method
+
+    resume_text = (request.resume_text or '').strip()
+    if not resume_text:
+        raise HTTPException(status_code=422, detail='Provide either task_id or resume_text.')
+    return ResumeDocument.from_text(resume_text), 'pdfplumber'
+
+
+@app.post('/api/score/batch')
+async def batch_score_endpoint(request: BatchScoreRequest, http_request: Request):
+    allowed, _ = enforce_daily_rate_limit(_get_client_ip(http_request))
+    if not allowed:
+        raise HTTPException(status_code=429, detail='Daily analysis limit reached for this IP address.')
+
+    resume_document, parsing_method = await _resolve_batch_resume(request)
+    try:
+        validate_resume_text_quality(resume_document)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+
+    async with _get_batch_score_slots():
+        result = await score_resume_against_job_descriptions(
+            resume_document,
+            request.job_descriptions,
+            target_role=request.target_role.strip() or 'Software Engineer',
+            scoring_mode=request.scoring_mode,
+            parsing_method=parsing_method,
+        )
+    return {'success': True, **result}
+
+
 @app.post('/fetch-jobs/')
 @app.post('/api/jobs/search')
 async def fetch_jobs_endpoint(request: JobSearchRequest):
@@ -473,8 +635,23 @@ async def fetch_jobs_endpoint(request: JobSearchRequest):
         raise HTTPException(status_code=500, detail=f'Gateway error during job fetch: {exc}') from exc
 
 
+def _readiness_blocked() -> bool:
+    return (
+        settings.health_requires_model_ready
+        and settings.sentence_model_preload
+        and not sentence_model_is_ready()
+    )
+
+
 @app.api_route('/health', methods=['GET', 'HEAD'])
 async def render_health_endpoint(request: Request):
+    if _readiness_blocked():
+        if request.method == 'HEAD':
+            return Response(status_code=503)
+        payload = _basic_health_payload()
+        payload['status'] = 'warming'
+        payload['sentence_model'] = get_sentence_model_status()
+        return JSONResponse(status_code=503, content=payload)
     if request.method == 'HEAD':
         return Response(status_code=200)
     return _basic_health_payload()
@@ -485,6 +662,8 @@ async def health_endpoint(request: Request):
     if request.method == 'HEAD':
         return Response(status_code=200)
 
+    from gemini_client import get_parse_stats
+
     health = await get_gateway_health()
     try:
         redis_client = get_sync_redis()
@@ -492,6 +671,17 @@ async def health_endpoint(request: Request):
     except Exception as exc:
         health['redis'] = f'unreachable: {exc}'
     health['queue'] = 'direct'
+    health['parse_sandbox'] = get_parse_sandbox_stats()
+    health['ocr_pool'] = get_ocr_pool_stats()
+    health['sentence_model'] = get_sentence_model_status()
+    health['embedding_broker'] = get_embedding_stats()
+    health['embedding_cache'] = get_embedding_cache_stats()
+    health['gemini_models'] = get_model_breaker_stats()
+    health['gemini_latency'] = get_model_latency_stats()
+    health['gemini_hedging'] = get_hedge_stats()
+    health['gemini_parsing'] = get_parse_stats()
+    health['analysis_single_flight'] = get_single_flight_stats()
+    health['analysis_concurrency'] = get_analysis_limiter().snapshot()
     health['broker'] = 'memory-local' if using_local_memory_store() else 'upstash-redis'
     health.update(_basic_health_payload())
     return health
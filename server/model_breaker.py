@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import logging
+import math
+import time
+from collections import deque
+from collections.abc import Callable
+from threading import Lock
+from typing import Any
+
+from config import get_settings
+from redis_store import (
+    claim_model_breaker_probe,
+    clear_model_breaker_state,
+    get_model_breaker_state,
+    set_model_breaker_state,
+    using_local_memory_store,
+)
+
+
+_log = logging.getLogger('elevate.gemini')
+_breakers: dict[str, ModelCircuitBreaker] = {}
+_registry_lock = Lock()
+
+_NO_SHARED_STATE = object()
+
+
+def _read_shared_state(model_name: str) -> Any:
+    """Shared payload (None when absent), or _NO_SHARED_STATE when Redis is off or unreachable."""
+    if using_local_memory_store():
+        return _NO_SHARED_STATE
+    try:
+        return get_model_breaker_state(model_name)
+    except Exception as exc:
+        _log.warning('[GEMINI] Could not read shared breaker state for %s: %s', model_name, exc)
+        return _NO_SHARED_STATE
+
+
+def _run_shared_update(action: Callable[[], Any], model_name: str) -> Any:
+    try:
+        return action()
+    except Exception as exc:
+        _log.warning('[GEMINI] Could not update shared breaker state for %s: %s', model_name, exc)
+        return None
+
+
+class ModelCircuitBreaker:
+    """Closed / open / half-open circuit breaker for one Gemini model.
+
+    Outcomes are kept in a rolling time window. Once the window holds at least
+    `min_requests` outcomes and the failure rate reaches the threshold, the model
+    opens and is skipped for `open_seconds`. After that a single probe request is
+    let through (half-open): success closes the breaker, failure re-opens it.
+    With Redis configured, openings are shared across workers and only one worker
+    probes at a time.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        *,
+        window_seconds: float,
+        min_requests: int,
+        failure_rate_threshold: float,
+        open_seconds: float,
+        probe_timeout_seconds: float,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.model_name = model_name
+        self.window_seconds = window_seconds
+        self.min_requests = max(1, min_requests)
+        self.failure_rate_threshold = failure_rate_threshold
+        self.open_seconds = open_seconds
+        self.probe_timeout_seconds = probe_timeout_seconds
+        self._clock = clock
+        self._outcomes: deque[tuple[float, bool]] = deque()
+        self._state = 'closed'
+        self._opened_at = 0.0
+        self._open_until = 0.0
+        self._probe_started_at: float | None = None
+        self._lock = Lock()
+        self.times_opened = 0
+        self.rejected = 0
+
+    def _prune(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        while self._outcomes and self._outcomes[0][0] < cutoff:
+            self._outcomes.popleft()
+
+    def _probe_in_flight(self, now: float) -> bool:
+        return self._probe_started_at is not None and now - self._probe_started_at < self.probe_timeout_seconds
+
+    def _open(self, now: float) -> dict[str, Any]:
+        self._state = 'open'
+        self._opened_at = now
+        self._open_until = now + self.open_seconds
+        self._probe_started_at = None
+        self._outcomes.clear()
+        self.times_opened += 1
+        return {'state': 'open', 'opened_at': now, 'open_until': self._open_until}
+
+    def _close(self) -> None:
+        self._state = 'closed'
+        self._probe_started_at = None
+        self._outcomes.clear()
+
+    def _apply_shared(self, shared: Any, now: float) -> None:
+        if shared is _NO_SHARED_STATE:
+            return
+        if isinstance(shared, dict) and shared.get('state') == 'open':
+            opened_at = float(shared.get('opened_at', 0))
+            if opened_at > self._opened_at:
+                self._state = 'open'
+                self._opened_at = opened_at
+                self._open_until = float(shared.get('open_until', opened_at + self.open_seconds))
+                self._outcomes.clear()
+            return
+        if shared is None and self._state == 'open' and not self._probe_in_flight(now):
+            # Another worker's probe closed the model (or the shared entry expired).
+            self._close()
+
+    def allow_request(self) -> bool:
+        shared = _read_shared_state(self.model_name)
+        now = self._clock()
+        with self._lock:
+            self._apply_shared(shared, now)
+            if self._state == 'closed':
+                return True
+            if now < self._open_until or self._probe_in_flight(now):
+                self.rejected += 1
+                return False
+            self._probe_started_at = now
+
+        claimed = _run_shared_update(
+            lambda: claim_model_breaker_probe(self.model_name, math.ceil(self.probe_timeout_seconds)),
+            self.model_name,
+        )
+        if claimed:
+            _log.info('[GEMINI] Probing half-open model %s.', self.model_name)
+            return True
+        with self._lock:
+            self._probe_started_at = None
+            self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        now = self._clock()
+        with self._lock:
+            if self._state == 'closed':
+                self._outcomes.append((now, False))
+                self._prune(now)
+                return
+            if self._probe_started_at is None:
+                return
+            self._close()
+        _log.info('[GEMINI] Model %s recovered; circuit closed.', self.model_name)
+        _run_shared_update(lambda: clear_model_breaker_state(self.model_name), self.model_name)
+
+    def record_failure(self) -> None:
+        now = self._clock()
+        with self._lock:
+            if self._state == 'closed':
+                self._outcomes.append((now, True))
+                self._prune(now)
+                failures = sum(1 for _, failed in self._outcomes if failed)
+                if len(self._outcomes) < self.min_requests or failures / len(self._outcomes) < self.failure_rate_threshold:
+                    return
+            elif self._probe_started_at is None:
+                return
+            shared_payload = self._open(now)
+        _log.warning('[GEMINI] Circuit opened for model %s for %.0fs.', self.model_name, self.open_seconds)
+        ttl_seconds = math.ceil(self.open_seconds + self.window_seconds)
+        _run_shared_update(
+            lambda: set_model_breaker_state(self.model_name, shared_payload, ttl_seconds),
+            self.model_name,
+        )
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == 'closed':
+                return 'closed'
+            return 'open' if self._clock() < self._open_until else 'half_open'
+
+    def snapshot(self) -> dict[str, Any]:
+        now = self._clock()
+        state = self.state
+        with self._lock:
+            self._prune(now)
+            failures = sum(1 for _, failed in self._outcomes if failed)
+            requests = len(self._outcomes)
+            return {
+                'state': state,
+                'requests_in_window': requests,
+                'failure_rate': round(failures / requests, 4) if requests else 0.0,
+                'open_for_seconds': round(max(0.0, self._open_until - now), 1) if state == 'open' else 0.0,
+                'times_opened': self.times_opened,
+                'rejected': self.rejected,
+            }
+
+
+def get_model_breaker(model_name: str) -> ModelCircuitBreaker:
+    with _registry_lock:
+        breaker = _breakers.get(model_name)
+        if breaker is None:
+            settings = get_settings()
+            breaker = ModelCircuitBreaker(
+                model_name,
+                window_seconds=settings.gemini_breaker_window_seconds,
+                min_requests=settings.gemini_breaker_min_requests,
+                failure_rate_threshold=settings.gemini_breaker_failure_rate,
+                open_seconds=settings.gemini_breaker_open_seconds,
+                probe_timeout_seconds=settings.gemini_deadline_seconds,
+            )
+            _breakers[model_name] = breaker
+        return breaker
+
+
+def get_model_breaker_stats() -> dict[str, dict[str, Any]]:
+    with _registry_lock:
+        breakers = list(_breakers.values())
+    return {breaker.model_name: breaker.snapshot() for breaker in breakers}
+
+
+def reset_model_breakers() -> None:
+    with _registry_lock:
+        _breakers.clear()
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import math
+import random
+import time
+from collections import deque
+from collections.abc import Sequence
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any
+
+from config import get_settings
+
+
+LATENCY_SAMPLE_LIMIT = 200
+LATENCY_WINDOW_SECONDS = 15 * 60
+MIN_ESTIMATE_SAMPLES = 5
+MIN_ROUTING_SUCCESS_RATE = 0.8
+EXPLORE_RATE = 0.05
+
+_stats: dict[str, ModelLatencyStats] = {}
+_stats_lock = Lock()
+_hedge_counters = {'fired': 0, 'hedge_won': 0, 'primary_won': 0, 'both_failed': 0}
+
+
+def prompt_size_bucket(prompt_chars: int) -> str:
+    return 'short' if prompt_chars <= get_settings().gemini_routing_short_prompt_chars else 'long'
+
+
+def _percentile(sorted_values: list[float], quantile: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, math.ceil(quantile * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _summarize(samples: list[tuple[float, float, bool, str]]) -> dict[str, Any]:
+    latencies = sorted(latency for _, latency, ok, _ in samples if ok)
+    summary: dict[str, Any] = {
+        'samples': len(samples),
+        'success_rate': round(sum(1 for _, _, ok, _ in samples if ok) / len(samples), 4) if samples else None,
+        'p50_ms': None,
+        'p95_ms': None,
+    }
+    if latencies:
+        summary['p50_ms'] = round(_percentile(latencies, 0.5), 1)
+        summary['p95_ms'] = round(_percentile(latencies, 0.95), 1)
+    return summary
+
+
+class ModelLatencyStats:
+    """Rolling latency and success samples for one model, split by prompt-size bucket."""
+
+    __slots__ = ('model_name', '_samples', '_lock')
+
+    def __init__(self, model_name: str) -> None:
+        self.model_name = model_name
+        self._samples: deque[tuple[float, float, bool, str]] = deque(maxlen=LATENCY_SAMPLE_LIMIT)
+        self._lock = Lock()
+
+    def _recent(self) -> list[tuple[float, float, bool, str]]:
+        cutoff = time.time() - LATENCY_WINDOW_SECONDS
+        while self._samples and self._samples[0][0] < cutoff:
+            self._samples.popleft()
+        return list(self._samples)
+
+    def record(self, *, latency_ms: float, ok: bool, prompt_chars: int) -> None:
+        with self._lock:
+            self._samples.append((time.time(), latency_ms, ok, prompt_size_bucket(prompt_chars)))
+
+    def _samples_for(self, prompt_chars: int) -> tuple[list[tuple[float, float, bool, str]], str] | None:
+        # Same-size samples are preferred; other sizes are used only while the bucket is thin.
+        bucket = prompt_size_bucket(prompt_chars)
+        with self._lock:
+            samples = self._recent()
+        same_bucket = [sample for sample in samples if sample[3] == bucket]
+        if len(same_bucket) >= MIN_ESTIMATE_SAMPLES:
+            return same_bucket, bucket
+        if len(samples) >= MIN_ESTIMATE_SAMPLES:
+            return samples, 'all'
+        return None
+
+    def estimate(self, prompt_chars: int) -> dict[str, Any] | None:
+        """Expected latency for a prompt of this size; None until enough samples exist."""
+        selected = self._samples_for(prompt_chars)
+        if selected is None:
+            return None
+        samples, bucket = selected
+        return {**_summarize(samples), 'bucket': bucket}
+
+    def latency_quantile(self, prompt_chars: int, quantile: float) -> float | None:
+        selected = self._samples_for(prompt_chars)
+        latencies = sorted(latency for _, latency, ok, _ in selected[0] if ok) if selected else []
+        return _percentile(latencies, quantile) if latencies else None
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            samples = self._recent()
+        return {
+            **_summarize(samples),
+            'buckets': {
+                bucket: _summarize([sample for sample in samples if sample[3] == bucket])
+                for bucket in ('short', 'long')
+            },
+        }
+
+
+def get_model_latency_tracker(model_name: str) -> ModelLatencyStats:
+    with _stats_lock:
+        stats = _stats.get(model_name)
+        if stats is None:
+            stats = ModelLatencyStats(model_name)
+            _stats[model_name] = stats
+        return stats
+
+
+def record_model_call(model_name: str, *, latency_ms: float, ok: bool, prompt_chars: int) -> None:
+    get_model_latency_tracker(model_name).record(latency_ms=latency_ms, ok=ok, prompt_chars=prompt_chars)
+
+
+def get_model_latency_stats() -> dict[str, dict[str, Any]]:
+    with _stats_lock:
+        trackers = list(_stats.values())
+    return {tracker.model_name: tracker.snapshot() for tracker in trackers}
+
+
+def reset_model_latency_stats() -> None:
+    with _stats_lock:
+        _stats.clear()
+        for name in _hedge_counters:
+            _hedge_counters[name] = 0
+
+
+def hedge_delay_seconds(model_name: str, prompt_chars: int) -> float | None:
+    """How long to wait on a call before hedging it; None when hedging is off or unmeasured."""
+    settings = get_settings()
+    if not settings.gemini_hedge_enabled:
+        return None
+    latency_ms = get_model_latency_tracker(model_name).latency_quantile(prompt_chars, settings.gemini_hedge_percentile)
+    return latency_ms / 1000 if latency_ms is not None else None
+
+
+def record_hedge(outcome: str) -> None:
+    """Count a fired hedge and how it ended: 'hedge_won', 'primary_won' or 'both_failed'."""
+    with _stats_lock:
+        _hedge_counters['fired'] += 1
+        _hedge_counters[outcome] += 1
+
+
+def get_hedge_stats() -> dict[str, Any]:
+    settings = get_settings()
+    with _stats_lock:
+        counters = dict(_hedge_counters)
+    return {
+        'enabled': settings.gemini_hedge_enabled,
+        'percentile': settings.gemini_hedge_percentile,
+        'target': settings.gemini_hedge_target,
+        **counters,
+        'hedge_win_rate': round(counters['hedge_won'] / counters['fired'], 4) if counters['fired'] else 0.0,
+    }
+
+
+@dataclass(slots=True, frozen=True)
+class RoutingDecision:
+    policy: str
+    models: list[str]
+    reason: str
+    prompt_chars: int
+    prompt_bucket: str
+    slo_ms: float
+    estimates: dict[str, dict[str, Any] | None]
+
+    def as_metadata(self) -> dict[str, Any]:
+        return {
+            'policy': self.policy,
+            'model_order': list(self.models),
+            'reason': self.reason,
+            'prompt_chars': self.prompt_chars,
+            'prompt_bucket': self.prompt_bucket,
+            'slo_ms': self.slo_ms,
+            'estimates': {model: estimate for model, estimate in self.estimates.items() if estimate is not None},
+        }
+
+
+def _meets_slo(estimate: dict[str, Any] | None, slo_ms: float) -> bool:
+    if estimate is None:
+        return True
+    if (estimate['success_rate'] or 0) < MIN_ROUTING_SUCCESS_RATE:
+        return False
+    return estimate['p95_ms'] is not None and estimate['p95_ms'] <= slo_ms
+
+
+def route_models(
+    candidates: Sequence[str],
+    *,
+    prompt_chars: int,
+    policy: str | None = None,
+    slo_ms: float | None = None,
+) -> RoutingDecision:
+    """Order candidate models for one request.
+
+    `static` keeps the configured priority order. `latency` keeps that order for
+    long prompts unless a model is expected to miss the p95 SLO (or is failing),
+    and sends short prompts to the fastest model expected to meet the SLO. Models
+    without enough samples keep their configured position, and a small share of
+    short-prompt requests is routed to them so their estimates fill in.
+    """
+    settings = get_settings()
+    policy = policy or settings.gemini_routing_policy
+    slo_ms = slo_ms if slo_ms is not None else settings.gemini_routing_slo_ms
+    models = list(candidates)
+    bucket = prompt_size_bucket(prompt_chars)
+    if policy != 'latency' or len(models) < 2:
+        return RoutingDecision('static', models, 'configured order', prompt_chars, bucket, slo_ms, {})
+
+    estimates = {model: get_model_latency_tracker(model).estimate(prompt_chars) for model in models}
+    position = {model: index for index, model in enumerate(models)}
+    unmeasured = [model for model in models if estimates[model] is None]
+
+    if bucket == 'short' and unmeasured and len(unmeasured) < len(models) and random.random() < EXPLORE_RATE:
+        ordered = [unmeasured[0], *(model for model in models if model != unmeasured[0])]
+        reason = f'exploring {unmeasured[0]} to collect latency samples'
+    elif bucket == 'short':
+        ordered = sorted(
+            models,
+            key=lambda model: (
+                not _meets_slo(estimates[model], slo_ms),
+                estimates[model]['p50_ms'] if estimates[model] and estimates[model]['p50_ms'] is not None else math.inf,
+                position[model],
+            ),
+        )
+        reason = 'fastest expected model within the SLO for a short prompt'
+    else:
+        ordered = sorted(models, key=lambda model: (not _meets_slo(estimates[model], slo_ms), position[model]))
+        reason = 'configured order' if ordered == models else 'configured order, demoting models expected to miss the SLO'
+    return RoutingDecision('latency', ordered, reason, prompt_chars, bucket, slo_ms, estimates)
@@ -4,6 +4,12 @@ from typing import Any, Literal
 
 from pydantic import BaseModel, Field
 
+MAX_BATCH_SCORE_JOBS = 200
+# Keyword extraction and matching run over the full text, so batch inputs are bounded up front.
+MAX_BATCH_JOB_DESCRIPTION_CHARS = 20_000
+MAX_BATCH_RESUME_TEXT_CHARS = 50_000
+MAX_BATCH_LABEL_CHARS = 200
+
 
 class JobSearchRequest(BaseModel):
     query: str
@@ -16,6 +22,46 @@ class RetargetRequest(BaseModel):
     job_description: str = ''
 
 
+class BatchJobDescription(BaseModel):
+    id: str = Field(default='', max_length=MAX_BATCH_LABEL_CHARS)
+    job_description: str = Field(min_length=1, max_length=MAX_BATCH_JOB_DESCRIPTION_CHARS)
+    target_role: str = Field(default='', max_length=MAX_BATCH_LABEL_CHARS)
+
+
+class BatchScoreRequest(BaseModel):
+    task_id: str | None = None
+    resume_text: str | None = Field(default=None, max_length=MAX_BATCH_RESUME_TEXT_CHARS)
+    target_role: str = Field(default='Software Engineer', max_length=MAX_BATCH_LABEL_CHARS)
+    scoring_mode: Literal['full-time', 'internship'] = 'full-time'
+    job_descriptions: list[BatchJobDescription] = Field(min_length=1, max_length=MAX_BATCH_SCORE_JOBS)
+
+
+# Gemini response schema for build_dual_analysis_prompt; docstrings here would be sent as schema descriptions.
+class AnalysisSkill(BaseModel):
+    name: str
+
+
+class AnalysisAtsScore(BaseModel):
+    score: float
+    feedback: str
+
+
+class AnalysisSection(BaseModel):
+    name: str
+    summary: str
+    atsScore: AnalysisAtsScore
+    extractedSkills: list[AnalysisSkill]
+    experienceSummary: list[str]
+    educationSummary: list[str]
+    generalResumeImprovements: list[str]
+    generalUpskillingSuggestions: list[str]
+
+
+class DualAnalysisResponse(BaseModel):
+    full_time_analysis: AnalysisSection
+    internship_analysis: AnalysisSection
+
+
 class AnalysisStatusPayload(BaseModel):
     success: bool = True
     task_id: str
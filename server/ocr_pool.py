@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+import logging
+import math
+import multiprocessing
+import os
+import time
+from collections.abc import Iterable
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from threading import Lock
+from typing import Any
+
+from config import get_settings
+from parse_sandbox import apply_memory_limit
+
+
+_log = logging.getLogger('elevate.ocr')
+
+# ~160 DPI for Letter/A4: enough for resume body text at a third of the old RGB 2x render.
+OCR_MAX_PIXELS_PER_PAGE = 2_400_000
+OCR_MIN_DPI = 96
+OCR_MAX_DPI = 220
+_pool: _PoolGeneration | None = None
+_pool_lock = Lock()
+_stats_lock = Lock()
+_in_flight_pages = 0
+_completed_pages = 0
+_timed_out_pages = 0
+_failed_pages = 0
+_retired_pools = 0
+
+
+def ocr_render_dpi(page_rect: Any) -> int:
+    """Pick a render DPI that keeps the page within the OCR pixel budget."""
+    area_square_inches = max(1.0, (page_rect.width / 72) * (page_rect.height / 72))
+    dpi = math.sqrt(OCR_MAX_PIXELS_PER_PAGE / area_square_inches)
+    return int(max(OCR_MIN_DPI, min(OCR_MAX_DPI, dpi)))
+
+
+def render_page_for_ocr(page: Any) -> tuple[Any, Any, int]:
+    """Render a page to an 8-bit grayscale PIL image backed by the pixmap's sample buffer.
+
+    The pixmap is returned alongside the image because the image borrows its memory.
+    """
+    import fitz
+    from PIL import Image
+
+    dpi = ocr_render_dpi(page.rect)
+    pixmap = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False)
+    image = Image.frombuffer('L', (pixmap.width, pixmap.height), pixmap.samples_mv, 'raw', 'L', pixmap.stride, 1)
+    return image, pixmap, dpi
+
+
+def ocr_page(page_pdf: bytes, timeout_seconds: float) -> str:
+    """Rasterize and OCR a one-page PDF. Runs inside an OCR pool worker process."""
+    import fitz
+    import pytesseract
+
+    document = fitz.open(stream=page_pdf, filetype='pdf')
+    try:
+        image, _pixmap, dpi = render_page_for_ocr(document[0])
+        with image:
+            return pytesseract.image_to_string(image, config=f'--dpi {dpi}', timeout=timeout_seconds)
+    except Exception as exc:
+        # pytesseract errors do not survive pickling and would break the whole pool.
+        raise RuntimeError(f'{type(exc).__name__}: {exc}') from None
+    finally:
+        document.close()
+
+
+def split_pages(file_bytes: bytes, page_indices: list[int]) -> dict[int, bytes]:
+    """One single-page PDF per page, so each OCR job only receives its own page.
+
+    Runs inside an OCR pool worker, so the untrusted upload is only opened under
+    the worker's memory cap.
+    """
+    import fitz
+
+    try:
+        source = fitz.open(stream=file_bytes, filetype='pdf')
+    except Exception as exc:
+        raise RuntimeError(f'{type(exc).__name__}: {exc}') from None
+    try:
+        pages: dict[int, bytes] = {}
+        for page_index in page_indices:
+            single = fitz.open()
+            try:
+                single.insert_pdf(source, from_page=page_index, to_page=page_index)
+                pages[page_index] = single.tobytes(garbage=3, deflate=True)
+            finally:
+                single.close()
+        return pages
+    except Exception as exc:
+        raise RuntimeError(f'{type(exc).__name__}: {exc}') from None
+    finally:
+        source.close()
+
+
+class _PoolGeneration:
+    """A process pool and the jobs submitted to it.
+
+    `Future.cancel()` cannot stop a job that is already running, so a pool with a
+    stuck page is retired: new requests get a fresh pool, and the old one is shut
+    down and its workers killed once every job other than the stuck ones has
+    finished. Pages of other requests on the retired pool still complete.
+    """
+
+    def __init__(self, executor: Executor) -> None:
+        self.executor = executor
+        self._lock = Lock()
+        self._pending: set[Future[Any]] = set()
+        self._stuck: set[Future[Any]] = set()
+        self._retired = False
+        self._stopped = False
+
+    def submit(self, fn: Any, *args: Any) -> Future[Any]:
+        future = self.executor.submit(fn, *args)
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._job_done)
+        return future
+
+    def retire(self, stuck: Iterable[Future[Any]]) -> None:
+        with self._lock:
+            self._retired = True
+            self._stuck.update(future for future in stuck if not future.done())
+        self._stop_when_drained()
+
+    def _job_done(self, future: Future[Any]) -> None:
+        with self._lock:
+            self._pending.discard(future)
+            self._stuck.discard(future)
+        self._stop_when_drained()
+
+    def _stop_when_drained(self) -> None:
+        with self._lock:
+            if self._stopped or not self._retired or not self._pending <= self._stuck:
+                return
+            self._stopped = True
+        processes = list((getattr(self.executor, '_processes', None) or {}).values())
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.kill()
+
+
+def _pool_size() -> int:
+    configured = get_settings().ocr_pool_workers
+    if configured > 0:
+        return configured
+    return max(1, min(4, os.cpu_count() or 1))
+
+
+def _new_executor() -> Executor:
+    return ProcessPoolExecutor(
+        max_workers=_pool_size(),
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=apply_memory_limit,
+        initargs=(get_settings().parse_worker_memory_limit_mb * 1024 * 1024,),
+    )
+
+
+def _get_pool() -> _PoolGeneration:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = _PoolGeneration(_new_executor())
+        return _pool
+
+
+def _retire_pool(pool: _PoolGeneration, stuck: Iterable[Future[Any]]) -> None:
+    """Route new requests to a fresh pool; the old one stops once only `stuck` jobs remain."""
+    global _pool, _retired_pools
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+            with _stats_lock:
+                _retired_pools += 1
+    pool.retire(stuck)
+
+
+def _track_page_done(future: Future[str]) -> None:
+    global _in_flight_pages, _completed_pages, _failed_pages
+    with _stats_lock:
+        _in_flight_pages -= 1
+        if future.cancelled():
+            return
+        if future.exception() is None:
+            _completed_pages += 1
+        else:
+            _failed_pages += 1
+
+
+def ocr_pages(file_bytes: bytes, page_indices: list[int]) -> dict[int, str]:
+    """OCR the given pages concurrently on the shared pool.
+
+    Pages that fail or exceed their deadline come back as empty strings so the caller
+    can still assemble the remaining pages in order.
+    """
+    global _in_flight_pages, _timed_out_pages
+    if not page_indices:
+        return {}
+
+    page_timeout = get_settings().ocr_page_timeout_seconds
+    blank_pages = {page_index: '' for page_index in page_indices}
+    pool = _get_pool()
+    workers = _pool_size()
+
+    try:
+        split = pool.submit(split_pages, file_bytes, page_indices)
+    except BrokenProcessPool:
+        _retire_pool(pool, ())
+        raise
+    try:
+        page_pdfs = split.result(timeout=page_timeout)
+    except FutureTimeoutError:
+        _retire_pool(pool, [split] if not split.cancel() else ())
+        _log.warning('[OCR] Splitting %s pages exceeded the %.1fs OCR deadline.', len(page_indices), page_timeout)
+        return blank_pages
+    except BrokenProcessPool:
+        _retire_pool(pool, ())
+        _log.warning('[OCR] OCR worker crashed while splitting the PDF into pages.')
+        return blank_pages
+    except Exception as exc:
+        _log.warning('[OCR] PDF could not be split into pages for OCR: %s', exc)
+        return blank_pages
+
+    # Page deadlines start once the pages are ready, so a slow split does not eat into them.
+    started_at = time.monotonic()
+    futures: dict[int, Future[str]] = {}
+    try:
+        for page_index in page_indices:
+            future = pool.submit(ocr_page, page_pdfs.pop(page_index), page_timeout)
+            with _stats_lock:
+                _in_flight_pages += 1
+            future.add_done_callback(_track_page_done)
+            futures[page_index] = future
+    except BrokenProcessPool:
+        _retire_pool(pool, ())
+        raise
+
+    ocr_texts: dict[int, str] = {}
+    stuck: list[Future[str]] = []
+    for position, (page_index, future) in enumerate(futures.items()):
+        # Pages queue behind earlier ones, so each wave of `workers` pages gets its own budget.
+        deadline = started_at + page_timeout * (1 + position // workers) + 1
+        try:
+            ocr_texts[page_index] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            if not future.cancel():
+                stuck.append(future)
+            with _stats_lock:
+                _timed_out_pages += 1
+            _log.warning('[OCR] Page %s exceeded the %.1fs OCR deadline.', page_index + 1, page_timeout)
+            ocr_texts[page_index] = ''
+        except BrokenProcessPool:
+            _retire_pool(pool, ())
+            _log.warning('[OCR] OCR worker crashed while processing page %s.', page_index + 1)
+            ocr_texts[page_index] = ''
+        except Exception as exc:
+            _log.warning('[OCR] Page %s could not be OCRed: %s', page_index + 1, exc)
+            ocr_texts[page_index] = ''
+    if stuck:
+        _log.warning('[OCR] Retiring the OCR pool after %s page(s) outlived their deadline.', len(stuck))
+        _retire_pool(pool, stuck)
+    return ocr_texts
+
+
+def get_ocr_pool_stats() -> dict[str, Any]:
+    workers = _pool_size()
+    with _stats_lock:
+        in_flight = _in_flight_pages
+        stats = {
+            'workers': workers,
+            'started': _pool is not None,
+            'in_flight_pages': in_flight,
+            'queued_pages': max(0, in_flight - workers),
+            'saturation': round(in_flight / workers, 2),
+            'completed_pages': _completed_pages,
+            'timed_out_pages': _timed_out_pages,
+            'failed_pages': _failed_pages,
+            'retired_pools': _retired_pools,
+        }
+    return stats
+
+
+def shutdown_ocr_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+from multiprocessing.connection import Connection
+from threading import BoundedSemaphore, Lock
+from typing import Any
+
+from config import get_settings
+
+
+_log = logging.getLogger('elevate.parse')
+# Spawning a worker and importing the parser is not part of a job's deadline.
+WORKER_START_TIMEOUT_SECONDS = 60.0
+_sandbox: ParseSandbox | None = None
+_sandbox_lock = Lock()
+
+
+class ParseTimeoutError(RuntimeError):
+    """Raised when a PDF does not finish parsing within the sandbox deadline."""
+
+
+class ParseWorkerCrashedError(RuntimeError):
+    """Raised when a sandboxed parse worker dies or exhausts its memory cap."""
+
+
+def apply_memory_limit(limit_bytes: int) -> None:
+    """Cap the current process's address space. No-op where RLIMIT_AS is unavailable."""
+    if limit_bytes <= 0:
+        return
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - non-POSIX platforms
+        return
+    _, hard_limit = resource.getrlimit(resource.RLIMIT_AS)
+    if hard_limit != resource.RLIM_INFINITY:
+        limit_bytes = min(limit_bytes, hard_limit)
+    resource.setrlimit(resource.RLIMIT_AS, (limit_bytes, hard_limit))
+
+
+def _worker_main(connection: Connection, memory_limit_bytes: int) -> None:
+    apply_memory_limit(memory_limit_bytes)
+    from resume_pipeline import extract_page_text_layers
+
+    connection.send(('ready', None))
+    while True:
+        try:
+            file_bytes = connection.recv()
+        except EOFError:
+            return
+        if file_bytes is None:
+            return
+        try:
+            connection.send(('ok', extract_page_text_layers(file_bytes)))
+        except MemoryError:
+            connection.send(('memory', 'Resume PDF exceeded the parser memory limit.'))
+            return
+        except Exception as exc:
+            connection.send(('error', f'Unable to read this PDF: {exc}'))
+
+
+class _SandboxWorker:
+    def __init__(self, memory_limit_bytes: int) -> None:
+        context = multiprocessing.get_context('spawn')
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_connection, memory_limit_bytes),
+            daemon=True,
+        )
+        self.process.start()
+        child_connection.close()
+        self.started = False
+        self.jobs_completed = 0
+
+    def is_alive(self) -> bool:
+        return self.process.is_alive()
+
+    def wait_until_started(self, timeout_seconds: float) -> None:
+        """Block until the worker has imported the parser, so job deadlines exclude spawn time."""
+        if self.started:
+            return
+        try:
+            if not self.connection.poll(timeout_seconds):
+                raise ParseWorkerCrashedError('The resume parser did not start in time. Please retry in a moment.')
+            self.connection.recv()
+        except (EOFError, ConnectionResetError) as exc:
+            raise ParseWorkerCrashedError('The resume parser stopped unexpectedly while starting.') from exc
+        self.started = True
+
+    def run(self, file_bytes: bytes, timeout_seconds: float) -> list[tuple[str, str, float]]:
+        try:
+            self.connection.send(file_bytes)
+            if not self.connection.poll(timeout_seconds):
+                raise ParseTimeoutError('Resume parsing exceeded the time limit. Upload a simpler text-based PDF.')
+            status, payload = self.connection.recv()
+        except (EOFError, BrokenPipeError, ConnectionResetError) as exc:
+            raise ParseWorkerCrashedError('The resume parser stopped unexpectedly while reading this PDF.') from exc
+        self.jobs_completed += 1
+        if status == 'ok':
+            return payload
+        if status == 'memory':
+            raise ParseWorkerCrashedError(payload)
+        raise ValueError(payload)
+
+    def stop(self, *, force: bool = False) -> None:
+        if not force and self.process.is_alive():
+            try:
+                self.connection.send(None)
+            except (BrokenPipeError, OSError):
+                force = True
+        if force:
+            self.process.kill()
+        self.process.join(timeout=1)
+        self.connection.close()
+
+
+class ParseSandbox:
+    """Supervised pool of child processes that run PDF text extraction.
+
+    Each worker runs under an RLIMIT_AS cap, is killed when a job overruns its
+    wall-clock deadline, and is recycled after `max_jobs_per_worker` jobs. The
+    deadline starts once the worker is up; spawning and importing a fresh worker
+    is bounded separately by `WORKER_START_TIMEOUT_SECONDS`. Jobs beyond `workers`
+    queue for a free worker instead of failing: the analysis limiter can admit more
+    analyses than there are parse workers, and every running job is bounded by
+    its own deadline, so the wait is too.
+    """
+
+    def __init__(self, *, workers: int, timeout_seconds: float, memory_limit_bytes: int, max_jobs_per_worker: int) -> None:
+        self.workers = max(1, workers)
+        self.timeout_seconds = timeout_seconds
+        self.memory_limit_bytes = memory_limit_bytes
+        self.max_jobs_per_worker = max(1, max_jobs_per_worker)
+        self._slots = BoundedSemaphore(self.workers)
+        self._idle: list[_SandboxWorker] = []
+        self._lock = Lock()
+        self._busy = 0
+        self._waiting = 0
+        self._jobs = 0
+        self._timeouts = 0
+        self._crashes = 0
+        self._recycled = 0
+
+    def _checkout(self) -> _SandboxWorker:
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.is_alive():
+                    return worker
+                worker.stop(force=True)
+        return _SandboxWorker(self.memory_limit_bytes)
+
+    def _checkin(self, worker: _SandboxWorker) -> None:
+        if worker.jobs_completed >= self.max_jobs_per_worker:
+            worker.stop()
+            with self._lock:
+                self._recycled += 1
+            return
+        with self._lock:
+            self._idle.append(worker)
+
+    def extract_page_text_layers(self, file_bytes: bytes) -> list[tuple[str, str, float]]:
+        with self._lock:
+            self._waiting += 1
+        try:
+            self._slots.acquire()
+        finally:
+            with self._lock:
+                self._waiting -= 1
+        try:
+            with self._lock:
+                self._busy += 1
+            worker = self._checkout()
+            try:
+                worker.wait_until_started(WORKER_START_TIMEOUT_SECONDS)
+                pages = worker.run(file_bytes, self.timeout_seconds)
+            except ParseTimeoutError:
+                worker.stop(force=True)
+                with self._lock:
+                    self._timeouts += 1
+                _log.warning('[PARSE] Killed parse worker %s after %.1fs deadline.', worker.process.pid, self.timeout_seconds)
+                raise
+            except ParseWorkerCrashedError:
+                worker.stop(force=True)
+                with self._lock:
+                    self._crashes += 1
+                raise
+            except ValueError:
+                self._checkin(worker)
+                raise
+            self._checkin(worker)
+            return pages
+        finally:
+            with self._lock:
+                self._busy -= 1
+                self._jobs += 1
+            self._slots.release()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                'enabled': True,
+                'workers': self.workers,
+                'idle_workers': len(self._idle),
+                'busy_workers': self._busy,
+                'waiting_jobs': self._waiting,
+                'jobs': self._jobs,
+                'timeouts': self._timeouts,
+                'crashes': self._crashes,
+                'recycled_workers': self._recycled,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.stop()
+
+
+def get_parse_sandbox() -> ParseSandbox:
+    global _sandbox
+    with _sandbox_lock:
+        if _sandbox is None:
+            settings = get_settings()
+            _sandbox = ParseSandbox(
+                workers=settings.parse_workers,
+                timeout_seconds=settings.parse_timeout_seconds,
+                memory_limit_bytes=settings.parse_worker_memory_limit_mb * 1024 * 1024,
+                max_jobs_per_worker=settings.parse_worker_max_jobs,
+            )
+        return _sandbox
+
+
+def run_sandboxed_text_extraction(file_bytes: bytes) -> list[tuple[str, str, float]]:
+    return get_parse_sandbox().extract_page_text_layers(file_bytes)
+
+
+def get_parse_sandbox_stats() -> dict[str, Any]:
+    if not get_settings().parse_sandbox_enabled:
+        return {'enabled': False}
+    if _sandbox is None:
+        return {'enabled': True, 'workers': get_settings().parse_workers, 'started': False}
+    return _sandbox.stats()
+
+
+def shutdown_parse_sandbox() -> None:
+    global _sandbox
+    with _sandbox_lock:
+        sandbox, _sandbox = _sandbox, None
+    if sandbox is not None:
+        sandbox.shutdown()
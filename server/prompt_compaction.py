@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+import math
+import re
+from dataclasses import dataclass
+from typing import Any
+
+from resume_document import ResumeDocument
+from utils import build_dual_analysis_prompt
+
+
+CHARS_PER_TOKEN = 4
+JOB_DESCRIPTION_RESERVED_SHARE = 0.3
+MIN_CONTENT_TOKENS = 500
+MIN_JOB_DESCRIPTION_TOKENS = 150
+MAX_HEADING_CHARS = 48
+PAGE_EDGE_LINES = 3
+
+# Lower priority values are kept first when the budget runs out; None drops the section outright.
+RESUME_SECTIONS: tuple[tuple[str, int | None, re.Pattern[str]], ...] = (
+    ('experience', 1, re.compile(r'(work |professional |relevant )?(experience|employment( history)?|internships?)')),
+    ('skills', 1, re.compile(r'(technical |key |core )?(skills|competencies|tech stack|technologies)|(programming |technical )?languages')),
+    ('projects', 2, re.compile(r'(academic |personal |key )?projects?( experience)?')),
+    ('education', 2, re.compile(r'education|academic background|academics')),
+    ('summary', 3, re.compile(r'(professional )?(summary|profile|objective|about me)')),
+    ('achievements', 4, re.compile(r'achievements|awards?( and honors)?|honors|certifications?|licenses and certifications|publications|(relevant )?coursework|courses')),
+    ('activities', 5, re.compile(r'(leadership|extracurricular|volunteer(ing)?)( activities| experience)?|positions of responsibility')),
+    ('personal', 6, re.compile(r'hobbies|interests|hobbies and interests|personal (details|information)|references|declaration')),
+)
+JOB_SECTIONS: tuple[tuple[str, int | None, re.Pattern[str]], ...] = (
+    ('requirements', 0, re.compile(
+        r"requirements|(minimum |basic |required )?qualifications|required skills|must[- ]haves?"
+        r"|what you('ll)? (need|bring)|who you are|you have|what we('re| are) looking for"
+    )),
+    ('preferred', 2, re.compile(r'preferred( qualifications| skills)?|nice[- ]to[- ]haves?|good to have|bonus( points)?')),
+    ('responsibilities', 1, re.compile(
+        r"(key )?responsibilities|duties|what you('ll)? do|(the|your) role|role overview"
+        r"|about the (role|job|position)|job description"
+    )),
+    ('company', 4, re.compile(r'about (us|the company|the team|[a-z0-9 .&-]+)|who we are|our (mission|story|company)|company overview')),
+    ('benefits', 5, re.compile(r'benefits|perks|what we offer|why join us|compensation( and benefits)?')),
+    ('legal', None, re.compile(r'(equal (employment )?opportunity|eeo)( statement| employer)?|legal|privacy( notice)?|disclaimer')),
+)
+PAGE_MARKER_PATTERN = r'page \d{1,2}( of \d{1,2})?|\d{1,2} of \d{1,2}'
+PAGE_MARKER_LINE = re.compile(PAGE_MARKER_PATTERN, re.IGNORECASE)
+RESUME_BOILERPLATE_LINE = re.compile(
+    PAGE_MARKER_PATTERN + r'|resume|curriculum vitae|references (are )?available (up)?on request',
+    re.IGNORECASE,
+)
+JOB_BOILERPLATE_PATTERN = re.compile(
+    r'equal (employment )?opportunity|without regard to|sexual orientation|gender identity|protected veteran'
+    r'|reasonable accommodation|e-verify|affirmative action|applicants with disabilities|recruitment fraud'
+    r'|unsolicited (resumes|applications)|privacy (notice|policy)',
+    re.IGNORECASE,
+)
+BULLET_GLYPH_PATTERN = re.compile(r'^[•▪●◦■►✓➢*-]\s*')
+INLINE_SPACE_PATTERN = re.compile(r'[ \t ]+')
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough Gemini token count (about four characters per token); no tokenizer round-trip."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+@dataclass(slots=True)
+class _Section:
+    name: str
+    priority: int
+    lines: list[str]
+    has_heading: bool
+
+
+@dataclass(slots=True, frozen=True)
+class CompactedPrompt:
+    prompt: str
+    tokens_before: int
+    tokens_after: int
+    token_budget: int
+    trimmed_sections: tuple[str, ...]
+    job_description_dropped: bool = False
+
+    def as_metadata(self) -> dict[str, Any]:
+        return {
+            'before': self.tokens_before,
+            'after': self.tokens_after,
+            'budget': self.token_budget,
+            'trimmed_sections': list(self.trimmed_sections),
+            'job_description_dropped': self.job_description_dropped,
+        }
+
+
+def _line_key(line: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '', line.lower())
+
+
+def _page_edge_indices(keys: list[str], lines: list[str]) -> set[int]:
+    """Positions that can hold page headers/footers.
+
+    Page breaks are not kept in the extracted text, so an edge is the start or
+    end of the document, the lines around a "Page x of y" marker, or a place
+    where the document's opening lines (name, contact) recur.
+    """
+    count = len(lines)
+    edges = set(range(min(count, PAGE_EDGE_LINES))) | set(range(max(0, count - PAGE_EDGE_LINES), count))
+    for index, line in enumerate(lines):
+        if PAGE_MARKER_LINE.fullmatch(line):
+            edges.update(range(max(0, index - PAGE_EDGE_LINES), min(count, index + PAGE_EDGE_LINES + 1)))
+    opening = keys[:2]
+    if len(opening) == 2:
+        for index in range(2, count - 1):
+            if keys[index:index + 2] == opening:
+                edges.update(range(index, min(count, index + PAGE_EDGE_LINES)))
+    return edges
+
+
+def _clean_lines(lines: list[str] | tuple[str, ...], boilerplate: re.Pattern[str], *, fullmatch: bool) -> list[str]:
+    """Collapse whitespace, normalise bullets, and drop blank and boilerplate lines.
+
+    Repeats are only dropped when they are consecutive or when a line recurs at
+    page edges (running headers and footers); the same title, location or bullet
+    under two different entries is real content and is kept.
+    """
+    normalized = [BULLET_GLYPH_PATTERN.sub('- ', INLINE_SPACE_PATTERN.sub(' ', line).strip()) for line in lines]
+    normalized = [line for line in normalized if line and line != '-']
+    keys = [_line_key(line) for line in normalized]
+    edges = _page_edge_indices(keys, normalized)
+
+    cleaned: list[str] = []
+    seen_at_edge: set[str] = set()
+    previous_key = None
+    for index, (line, key) in enumerate(zip(normalized, keys)):
+        if (boilerplate.fullmatch(line) if fullmatch else boilerplate.search(line)):
+            continue
+        if key and key == previous_key:
+            continue
+        if index in edges:
+            if key in seen_at_edge:
+                continue
+            seen_at_edge.add(key)
+        previous_key = key
+        cleaned.append(line)
+    return cleaned
+
+
+def _heading_name(
+    line: str,
+    table: tuple[tuple[str, int | None, re.Pattern[str]], ...],
+) -> tuple[str, int | None] | None:
+    if len(line) > MAX_HEADING_CHARS:
+        return None
+    normalized = re.sub(r'\s+', ' ', line.replace('&', ' and ').strip(' -:#*').lower())
+    for name, priority, pattern in table:
+        if pattern.fullmatch(normalized):
+            return name, priority
+    return None
+
+
+def _split_sections(
+    lines: list[str],
+    table: tuple[tuple[str, int | None, re.Pattern[str]], ...],
+    *,
+    lead_name: str,
+    lead_priority: int,
+) -> tuple[list[_Section], list[str]]:
+    """Group lines under their headings; returns (sections, names of dropped sections)."""
+    sections = [_Section(lead_name, lead_priority, [], False)]
+    dropped: list[str] = []
+    skipping = False
+    for line in lines:
+        heading = _heading_name(line, table)
+        if heading is not None:
+            name, priority = heading
+            skipping = priority is None
+            if skipping:
+                dropped.append(name)
+            else:
+                sections.append(_Section(name, priority, [line], True))
+            continue
+        if not skipping:
+            sections[-1].lines.append(line)
+    return [section for section in sections if section.lines], dropped
+
+
+def _line_cost(line: str) -> int:
+    return estimate_tokens(line) + 1
+
+
+def _section_tokens(sections: list[_Section]) -> int:
+    return sum(_line_cost(line) for section in sections for line in section.lines)
+
+
+def _text_tokens(text: str) -> int:
+    return sum(_line_cost(line) for line in text.splitlines())
+
+
+def _cut_to_budget(section: _Section, token_budget: int) -> str:
+    """The start of a section cut at a word boundary, for when not even one whole line fits."""
+    text = ' '.join(section.lines)
+    max_chars = max(0, (token_budget - 1) * CHARS_PER_TOKEN)
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars + 1].rsplit(' ', 1)[0].strip()
+
+
+def _fill_budget(sections: list[_Section], token_budget: int) -> tuple[str, list[str]]:
+    """Keep whole sections in priority order until the budget runs out; output keeps document order."""
+    remaining = token_budget
+    kept: dict[int, list[str]] = {}
+    trimmed: list[str] = []
+    for index in sorted(range(len(sections)), key=lambda position: (sections[position].priority, position)):
+        section = sections[index]
+        lines: list[str] = []
+        for line in section.lines:
+            cost = _line_cost(line)
+            if cost > remaining:
+                break
+            lines.append(line)
+            remaining -= cost
+        if section.has_heading and len(lines) == 1 and len(section.lines) > 1:
+            # A heading without any of its content is not worth its tokens.
+            remaining += _line_cost(lines[0])
+            lines = []
+        if len(lines) < len(section.lines):
+            trimmed.append(section.name)
+        if lines:
+            kept[index] = lines
+    return '\n'.join(line for index in sorted(kept) for line in kept[index]), trimmed
+
+
+def build_compacted_dual_analysis_prompt(
+    *,
+    document: ResumeDocument,
+    target_role: str,
+    experience_level: str,
+    job_description: str,
+    market_context: dict[str, str] | None,
+    token_budget: int,
+) -> CompactedPrompt:
+    """Build the dual analysis prompt within an estimated token budget.
+
+    Boilerplate (page markers, running headers and footers, EEO/legal text) and
+    consecutive repeated lines are removed first. Up to
+    `JOB_DESCRIPTION_RESERVED_SHARE` of the budget left after the fixed prompt text
+    (at least `MIN_JOB_DESCRIPTION_TOKENS`) is reserved for the job description; the
+    resume fills the rest, and the job description then gets whatever the resume did
+    not use. Within each, whole sections are kept in priority order (experience and
+    skills before hobbies, requirements before the company blurb) and the first
+    section that no longer fits is cut at a line boundary.
+
+    A supplied job description is never compacted away: if not one whole line fits,
+    the start of its highest-priority section is kept, cut at a word boundary. When
+    nothing but boilerplate was supplied, `job_description_dropped` is set.
+    """
+    prompt_args = {'target_role': target_role, 'experience_level': experience_level, 'market_context': market_context}
+    original = build_dual_analysis_prompt(resume_content=document.text, job_description=job_description, **prompt_args)
+    overhead = estimate_tokens(build_dual_analysis_prompt(resume_content='', job_description='', **prompt_args))
+    content_budget = max(MIN_CONTENT_TOKENS, token_budget - overhead)
+
+    job_sections, job_dropped = _split_sections(
+        _clean_lines(job_description.splitlines(), JOB_BOILERPLATE_PATTERN, fullmatch=False),
+        JOB_SECTIONS,
+        lead_name='overview',
+        lead_priority=3,
+    )
+    job_reserved = min(
+        _section_tokens(job_sections),
+        max(MIN_JOB_DESCRIPTION_TOKENS, int(content_budget * JOB_DESCRIPTION_RESERVED_SHARE)),
+    )
+
+    resume_lines = _clean_lines(document.lines, RESUME_BOILERPLATE_LINE, fullmatch=True)
+    has_headings = any(_heading_name(line, RESUME_SECTIONS) for line in resume_lines)
+    resume_sections, resume_dropped = _split_sections(
+        resume_lines,
+        RESUME_SECTIONS,
+        lead_name='header' if has_headings else 'resume',
+        lead_priority=0 if has_headings else 1,
+    )
+    resume_text, resume_trimmed = _fill_budget(resume_sections, content_budget - job_reserved)
+    job_budget = content_budget - _text_tokens(resume_text)
+    job_text, job_trimmed = _fill_budget(job_sections, job_budget)
+    if not job_text and job_sections:
+        # An empty JD would make the prompt fall back to role-only guidance, so keep the
+        # start of its highest-priority section even when no whole line fits.
+        top = min(job_sections, key=lambda section: section.priority)
+        job_text = _cut_to_budget(top, job_budget)
+    job_description_dropped = bool(job_description.strip()) and not job_text
+
+    prompt = build_dual_analysis_prompt(resume_content=resume_text, job_description=job_text, **prompt_args)
+    trimmed = [
+        *(f'resume.{name}' for name in [*resume_dropped, *resume_trimmed]),
+        *(f'job_description.{name}' for name in [*job_dropped, *job_trimmed]),
+    ]
+    return CompactedPrompt(
+        prompt,
+        estimate_tokens(original),
+        estimate_tokens(prompt),
+        token_budget,
+        tuple(trimmed),
+        job_description_dropped,
+    )
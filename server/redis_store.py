@@ -69,19 +69,21 @@ class LocalRedis:
                 _memory_store.move_to_end(key)
             return entry[0] if entry else None
 
-    def set(self, key: str, value: str, ex: int | None = None) -> bool:
+    def set(self, key: str, value: str, ex: int | None = None, nx: bool = False) -> bool | None:
         expires_at = time.time() + ex if ex else None
         with _memory_lock:
+            if nx:
+                self._purge_if_expired(key)
+                if key in _memory_store:
+                    return None
             _memory_store[key] = (value, expires_at)
             _memory_store.move_to_end(key)
             self._sweep()
         return True
 
-    def delete(self, key: str) -> int:
+    def delete(self, *keys: str) -> int:
         with _memory_lock:
-            existed = key in _memory_store
-            _memory_store.pop(key, None)
-        return int(existed)
+            return sum(_memory_store.pop(key, None) is not None for key in keys)
 
     def incr(self, key: str) -> int:
         with _memory_lock:
@@ -104,6 +106,24 @@ class LocalRedis:
             _memory_store[key] = (entry[0], time.time() + seconds)
         return True
 
+    def delete_if_equal(self, key: str, expected: str) -> bool:
+        with _memory_lock:
+            self._purge_if_expired(key)
+            entry = _memory_store.get(key)
+            if not entry or entry[0] != expected:
+                return False
+            del _memory_store[key]
+        return True
+
+    def expire_if_equal(self, key: str, expected: str, seconds: int) -> bool:
+        with _memory_lock:
+            self._purge_if_expired(key)
+            entry = _memory_store.get(key)
+            if not entry or entry[0] != expected:
+                return False
+            _memory_store[key] = (entry[0], time.time() + seconds)
+        return True
+
     def ping(self) -> bool:
         return True
 
@@ -193,8 +213,8 @@ def analysis_cache_key(cache_hash: str) -> str:
     return f'analysis:cache:{cache_hash}'
 
 
-def upload_blob_key(task_id: str) -> str:
-    return f'analysis:upload:{task_id}'
+def extracted_text_key(pdf_digest: str) -> str:
+    return f'analysis:text:{pdf_digest}'
 
 
 def resume_text_key(task_id: str) -> str:
@@ -205,6 +225,14 @@ def rate_limit_key(identifier: str, day_bucket: str) -> str:
     return f'analysis:ratelimit:{identifier}:{day_bucket}'
 
 
+def model_breaker_key(model_name: str) -> str:
+    return f'analysis:model-breaker:{model_name}'
+
+
+def analysis_flight_key(cache_hash: str) -> str:
+    return f'analysis:inflight:{cache_hash}'
+
+
 def set_task_status(task_id: str, payload: dict[str, Any], ttl_seconds: int | None = None) -> None:
     settings = get_settings()
     default_ttl = settings.result_ttl_seconds
@@ -231,20 +259,17 @@ def set_cached_analysis(cache_hash: str, payload: dict[str, Any]) -> None:
     )
 
 
-def set_upload_blob(task_id: str, encoded_payload: str) -> None:
-    get_sync_redis().set(
-        upload_blob_key(task_id),
-        encoded_payload,
-        ex=_bounded_ttl(get_settings().upload_blob_ttl_seconds),
-    )
-
-
-def get_upload_blob(task_id: str) -> str | None:
-    return get_sync_redis().get(upload_blob_key(task_id))
+def get_extracted_text(pdf_digest: str) -> dict[str, Any] | None:
+    raw = get_sync_redis().get(extracted_text_key(pdf_digest))
+    return json.loads(raw) if raw else None
 
 
-def delete_upload_blob(task_id: str) -> None:
-    get_sync_redis().delete(upload_blob_key(task_id))
+def set_extracted_text(pdf_digest: str, payload: dict[str, Any]) -> None:
+    get_sync_redis().set(
+        extracted_text_key(pdf_digest),
+        json.dumps(payload),
+        ex=_bounded_ttl(get_settings().cache_ttl_seconds),
+    )
 
 
 def set_resume_text(task_id: str, resume_text: str) -> None:
@@ -259,6 +284,80 @@ def get_resume_text(task_id: str) -> str | None:
     return get_sync_redis().get(resume_text_key(task_id))
 
 
+def get_model_breaker_state(model_name: str) -> dict[str, Any] | None:
+    """Shared breaker state for a model; always None when no Redis is configured."""
+    if using_local_memory_store():
+        return None
+    raw = get_sync_redis().get(model_breaker_key(model_name))
+    return json.loads(raw) if raw else None
+
+
+def set_model_breaker_state(model_name: str, payload: dict[str, Any], ttl_seconds: int) -> None:
+    if using_local_memory_store():
+        return
+    get_sync_redis().set(model_breaker_key(model_name), json.dumps(payload), ex=max(1, ttl_seconds))
+
+
+def clear_model_breaker_state(model_name: str) -> None:
+    if using_local_memory_store():
+        return
+    key = model_breaker_key(model_name)
+    get_sync_redis().delete(key, f'{key}:probe')
+
+
+def claim_model_breaker_probe(model_name: str, ttl_seconds: int) -> bool:
+    """Let exactly one worker probe a half-open model; always True without Redis."""
+    if using_local_memory_store():
+        return True
+    key = f'{model_breaker_key(model_name)}:probe'
+    return bool(get_sync_redis().set(key, '1', ex=max(1, ttl_seconds), nx=True))
+
+
+# Compare-and-act in one step, so a lease that expired and was re-claimed by another
+# worker between a GET and the DEL/PEXPIRE is never touched.
+_DELETE_IF_EQUAL_SCRIPT = (
+    "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) else return 0 end"
+)
+_EXPIRE_IF_EQUAL_SCRIPT = (
+    "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('pexpire', KEYS[1], ARGV[2]) else return 0 end"
+)
+
+
+def claim_analysis_flight(cache_hash: str, task_id: str, lease_seconds: int) -> str | None:
+    """Lead the analysis for a payload hash; returns None when claimed, else the leading task id."""
+    client = get_sync_redis()
+    key = analysis_flight_key(cache_hash)
+    while True:
+        # The key can expire or be released between SET NX and GET; retry until one of them wins.
+        if client.set(key, task_id, ex=max(1, lease_seconds), nx=True):
+            return None
+        leader = client.get(key)
+        if leader:
+            return leader
+
+
+def get_analysis_flight_leader(cache_hash: str) -> str | None:
+    return get_sync_redis().get(analysis_flight_key(cache_hash))
+
+
+def renew_analysis_flight(cache_hash: str, task_id: str, lease_seconds: int) -> bool:
+    client = get_sync_redis()
+    key = analysis_flight_key(cache_hash)
+    if isinstance(client, LocalRedis):
+        return client.expire_if_equal(key, task_id, max(1, lease_seconds))
+    return bool(client.eval(_EXPIRE_IF_EQUAL_SCRIPT, 1, key, task_id, max(1, lease_seconds) * 1000))
+
+
+def release_analysis_flight(cache_hash: str, task_id: str) -> None:
+    # Only the holder releases; a lease that expired and was re-claimed is left alone.
+    client = get_sync_redis()
+    key = analysis_flight_key(cache_hash)
+    if isinstance(client, LocalRedis):
+        client.delete_if_equal(key, task_id)
+    else:
+        client.eval(_DELETE_IF_EQUAL_SCRIPT, 1, key, task_id)
+
+
 async def get_task_status(task_id: str) -> dict[str, Any] | None:
     try:
         raw = await asyncio.to_thread(lambda: get_sync_redis().get(task_status_key(task_id)))
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import re
+from typing import Any
+
+WORD_TOKEN_PATTERN = re.compile(r'[A-Za-z0-9][A-Za-z0-9+.#/-]*')
+BULLET_PREFIXES = ('-', '*', '•')
+# all-MiniLM-L6-v2 truncates at 256 word pieces (two of them [CLS]/[SEP]). Resume text
+# (numbers, tool names, punctuation) runs closer to 3 characters per word piece than
+# the ~4 of plain prose, so chunks are sized on 3 to stay inside the model's window.
+EMBEDDING_MAX_SEQ_TOKENS = 256
+EMBEDDING_CHARS_PER_TOKEN = 3
+MAX_EMBEDDING_CHUNKS = 64
+
+
+
+def embedding_chunk_chars(max_seq_tokens: int = EMBEDDING_MAX_SEQ_TOKENS) -> int:
+    """Largest chunk, in characters, that the embedding model encodes without truncating."""
+    return max(1, (max_seq_tokens - 2) * EMBEDDING_CHARS_PER_TOKEN)
+
+
+EMBEDDING_CHUNK_CHARS = embedding_chunk_chars()
+SECTION_HEADING_PATTERNS = {
+    'summary': re.compile(r'(summary|profile|objective)', re.IGNORECASE),
+    'experience': re.compile(r'(experience|work experience|employment|professional experience)', re.IGNORECASE),
+    'education': re.compile(r'(education|academic background)', re.IGNORECASE),
+    'skills': re.compile(r'(skills|technical skills|core competencies)', re.IGNORECASE),
+    'projects': re.compile(r'(projects|project experience)', re.IGNORECASE),
+}
+
+
+class ResumeDocument:
+    """Parse-once view of extracted resume text shared by the scoring helpers.
+
+    Holds the stripped lines, the indices of bullet lines, the line spans of each
+    detected section heading, and the word tokens, so scoring and validation do not
+    re-split or re-tokenize the text. Documents restored from the text cache load
+    their tokens lazily; only the word count is persisted.
+    """
+
+    __slots__ = ('text', 'lines', 'bullet_indices', 'section_spans', 'word_count', '_tokens')
+
+    def __init__(
+        self,
+        text: str,
+        lines: tuple[str, ...],
+        bullet_indices: tuple[int, ...],
+        section_spans: dict[str, tuple[tuple[int, int], ...]],
+        word_count: int,
+        tokens: tuple[str, ...] | None = None,
+    ) -> None:
+        self.text = text
+        self.lines = lines
+        self.bullet_indices = bullet_indices
+        self.section_spans = section_spans
+        self.word_count = word_count
+        self._tokens = tokens
+
+    @classmethod
+    def from_text(cls, text: str) -> ResumeDocument:
+        lines = tuple(line.strip() for line in text.splitlines())
+        bullet_indices = tuple(index for index, line in enumerate(lines) if line.startswith(BULLET_PREFIXES))
+
+        headings: list[tuple[int, str]] = []
+        for index, line in enumerate(lines):
+            for name, pattern in SECTION_HEADING_PATTERNS.items():
+                if pattern.fullmatch(line):
+                    headings.append((index, name))
+        section_spans: dict[str, list[tuple[int, int]]] = {}
+        for position, (start, name) in enumerate(headings):
+            end = headings[position + 1][0] if position + 1 < len(headings) else len(lines)
+            section_spans.setdefault(name, []).append((start, end))
+
+        tokens = tuple(WORD_TOKEN_PATTERN.findall(text))
+        return cls(
+            text,
+            lines,
+            bullet_indices,
+            {name: tuple(spans) for name, spans in section_spans.items()},
+            len(tokens),
+            tokens,
+        )
+
+    @classmethod
+    def from_payload(cls, text: str, payload: dict[str, Any]) -> ResumeDocument:
+        return cls(
+            text,
+            tuple(payload['lines']),
+            tuple(payload['bullet_indices']),
+            {
+                name: tuple((int(start), int(end)) for start, end in spans)
+                for name, spans in dict(payload['section_spans']).items()
+            },
+            int(payload['word_count']),
+        )
+
+    def to_payload(self) -> dict[str, Any]:
+        return {
+            'lines': list(self.lines),
+            'bullet_indices': list(self.bullet_indices),
+            'section_spans': {name: [list(span) for span in spans] for name, spans in self.section_spans.items()},
+            'word_count': self.word_count,
+        }
+
+    @property
+    def tokens(self) -> tuple[str, ...]:
+        if self._tokens is None:
+            self._tokens = tuple(WORD_TOKEN_PATTERN.findall(self.text))
+        return self._tokens
+
+    @property
+    def bullet_lines(self) -> list[str]:
+        return [self.lines[index] for index in self.bullet_indices]
+
+    def has_section(self, name: str) -> bool:
+        return name in self.section_spans
+
+    def embedding_chunks(
+        self,
+        *,
+        chunk_chars: int = EMBEDDING_CHUNK_CHARS,
+        max_chunks: int = MAX_EMBEDDING_CHUNKS,
+    ) -> list[tuple[str, str]]:
+        """Split the whole resume into (section label, text) chunks for embedding.
+
+        Chunks follow the detected section spans; text before the first heading is
+        labeled 'header' ('resume' when no heading was found). No chunk is longer than
+        `chunk_chars`, so the model sees every character of it; text past
+        `max_chunks` chunks (about 20 pages at the defaults) is not embedded.
+        """
+        labels_by_start = {start: name for name, spans in self.section_spans.items() for start, _ in spans}
+        boundaries = sorted({0, *labels_by_start, len(self.lines)})
+        fallback_label = 'header' if labels_by_start else 'resume'
+        blocks: list[tuple[str, str]] = []
+        for begin, end in zip(boundaries, boundaries[1:]):
+            block_text = '\n'.join(line for line in self.lines[begin:end] if line)
+            if block_text:
+                blocks.append((labels_by_start.get(begin, fallback_label), block_text))
+        size = max(1, chunk_chars)
+        chunks = [
+            (label, text[offset:offset + size])
+            for label, text in blocks
+            for offset in range(0, len(text), size)
+        ]
+        return chunks[:max(1, max_chunks)]
+
+
+def as_resume_document(resume: ResumeDocument | str) -> ResumeDocument:
+    if isinstance(resume, ResumeDocument):
+        return resume
+    return ResumeDocument.from_text(resume)
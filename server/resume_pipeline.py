@@ -6,11 +6,18 @@ import json
 import re
 import shutil
 from collections import Counter
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any
 
 from config import get_settings
+from embedding_service import SemanticAlignment, encode_alignment
+from keyword_matcher import match_keywords
+from ocr_pool import ocr_pages
+from parse_sandbox import run_sandboxed_text_extraction
+from resume_document import SECTION_HEADING_PATTERNS, WORD_TOKEN_PATTERN, ResumeDocument, as_resume_document
 from redis_store import (
     get_cached_analysis,
     get_sync_redis,
@@ -19,10 +26,9 @@ from redis_store import (
     set_cached_analysis,
     set_task_status,
 )
+from sentence_model import get_sentence_model
 
 
-_sentence_model: Any | None = None
-
 STOPWORDS = {
     'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'into',
     'is', 'it', 'of', 'on', 'or', 'that', 'the', 'to', 'using', 'with', 'your',
@@ -43,20 +49,14 @@ ROLE_TITLE_STOPWORDS = {
 
 SPECIAL_SHORT_KEYWORDS = {'ai', 'bi', 'ml', 'nlp', 'qa', 'ui', 'ux', 'llm'}
 
+CID_GLYPH_PATTERN = re.compile(r'\(cid:\d+\)')
+MINIMUM_PAGE_TEXT_WORDS = 5
+MINIMUM_PAGE_TEXT_SCORE = 0.5
+GOOD_PAGE_TEXT_SCORE = 0.8
 
-def get_sentence_model() -> Any:
-    global _sentence_model
-    if _sentence_model is None:
-        try:
-            from sentence_transformers import SentenceTransformer
 
-            _sentence_model = SentenceTransformer(
-                get_settings().sentence_model_name,
-                local_files_only=True,
-            )
-        except Exception:
-            _sentence_model = False
-    return _sentence_model
+def compute_pdf_digest(file_bytes: bytes) -> str:
+    return hashlib.sha256(file_bytes).hexdigest()
 
 
 def compute_payload_hash(file_bytes: bytes, job_description: str, target_role: str, experience_level: str) -> str:
@@ -129,45 +129,195 @@ def update_task(
     return payload
 
 
-def extract_text_with_fallback(file_bytes: bytes, filename: str) -> tuple[str, str]:
-    extension = Path(filename).suffix.lower()
-    if extension != '.pdf':
-        raise ValueError('Only PDF resumes are currently supported in the async pipeline.')
+class PyMuPDFTextExtractor:
+    """Fast text-layer extraction through MuPDF's native text engine."""
+
+    name = 'pymupdf'
+
+    def __init__(self, file_bytes: bytes) -> None:
+        import fitz
+
+        self._document = fitz.open(stream=file_bytes, filetype='pdf')
+
+    @property
+    def page_count(self) -> int:
+        return self._document.page_count
+
+    def page_text(self, page_index: int) -> str:
+        return self._document[page_index].get_text('text', sort=True).strip()
 
-    import pdfplumber
+    def close(self) -> None:
+        self._document.close()
 
-    text_chunks: list[str] = []
-    with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
-        for page in pdf.pages:
-            extracted = (page.extract_text() or '').strip()
-            if extracted:
-                text_chunks.append(extracted)
 
-    text = '\n'.join(text_chunks).strip()
-    if text:
-        return normalize_text(text), 'pdfplumber'
+class PdfPlumberTextExtractor:
+    """Slower, layout-sensitive extraction used as a second opinion on weak pages."""
 
-    if not shutil.which('tesseract'):
-        raise ValueError('PDF text extraction failed and OCR is unavailable because the tesseract binary is not installed.')
+    name = 'pdfplumber'
 
-    import fitz
-    import pytesseract
-    from PIL import Image
+    def __init__(self, file_bytes: bytes) -> None:
+        import pdfplumber
 
-    ocr_chunks: list[str] = []
-    document = fitz.open(stream=file_bytes, filetype='pdf')
+        self._pdf = pdfplumber.open(io.BytesIO(file_bytes))
+
+    @property
+    def page_count(self) -> int:
+        return len(self._pdf.pages)
+
+    def page_text(self, page_index: int) -> str:
+        page = self._pdf.pages[page_index]
+        try:
+            return (page.extract_text() or '').strip()
+        finally:
+            page.close()
+
+    def close(self) -> None:
+        self._pdf.close()
+
+
+TEXT_EXTRACTOR_CHAIN: tuple[type, ...] = (PyMuPDFTextExtractor, PdfPlumberTextExtractor)
+TEXT_LAYER_PARSING_METHODS = {extractor.name for extractor in TEXT_EXTRACTOR_CHAIN}
+
+
+def score_page_text(text: str) -> float:
+    """Score extracted page text from 0 (unusable) to 1 (clean prose)."""
+    cid_glyphs = len(CID_GLYPH_PATTERN.findall(text))
+    stripped = CID_GLYPH_PATTERN.sub(' ', text).strip()
+    if not stripped:
+        return 0.0
+    words = stripped.split()
+    visible = sum(len(word) for word in words)
+    alphanumeric = sum(1 for char in stripped if char.isalnum())
+    single_char_ratio = sum(1 for word in words if len(word) == 1) / len(words)
+    glued_ratio = sum(1 for word in words if len(word) > 30) / len(words)
+
+    score = alphanumeric / visible
+    score *= 1 - min(1.0, 2 * cid_glyphs / (cid_glyphs + len(words)))
+    score *= 1 - min(1.0, 5 * stripped.count('\ufffd') / visible)
+    score *= 1 - min(0.8, max(0.0, single_char_ratio - 0.3))
+    score *= 1 - min(0.8, 4 * glued_ratio)
+    return round(score, 3)
+
+
+def _classify_page_text(text: str, score: float) -> str:
+    if not CID_GLYPH_PATTERN.sub(' ', text).strip():
+        return 'empty'
+    if score < MINIMUM_PAGE_TEXT_SCORE:
+        return 'garbled'
+    if count_meaningful_words(text) < MINIMUM_PAGE_TEXT_WORDS:
+        return 'sparse'
+    return 'text'
+
+
+def summarize_parsing_methods(page_methods: list[str]) -> str:
+    methods = [method for method in page_methods if method != 'unreadable']
+    if not methods:
+        return 'unreadable'
+    if 'ocr' in methods and len(set(methods)) > 1:
+        return 'hybrid'
+    return Counter(methods).most_common(1)[0][0]
+
+
+def extract_page_text_layers(
+    file_bytes: bytes,
+    *,
+    extractors: tuple[type, ...] = TEXT_EXTRACTOR_CHAIN,
+) -> list[tuple[str, str, float]]:
+    """Run the extractor chain page by page and keep the best-scoring text for each page.
+
+    Later extractors are only opened and consulted for pages where every earlier
+    extractor produced text below GOOD_PAGE_TEXT_SCORE. Pages where the primary
+    extractor found no text at all have no text layer (scanned pages headed for
+    OCR), so they skip the chain.
+    """
+    opened: list[Any] = []
     try:
-        for page in document:
-            pixmap = page.get_pixmap(matrix=fitz.Matrix(2, 2), alpha=False)
-            with Image.open(io.BytesIO(pixmap.tobytes('png'))) as image:
-                ocr_chunks.append(pytesseract.image_to_string(image))
+        primary = extractors[0](file_bytes)
+        opened.append(primary)
+        pages: list[tuple[str, str, float]] = []
+        for page_index in range(primary.page_count):
+            text = primary.page_text(page_index)
+            best = (text, primary.name, score_page_text(text))
+            if not text.strip():
+                pages.append(best)
+                continue
+            for position in range(1, len(extractors)):
+                if best[2] >= GOOD_PAGE_TEXT_SCORE:
+                    break
+                if len(opened) <= position:
+                    opened.append(extractors[position](file_bytes))
+                extractor = opened[position]
+                text = extractor.page_text(page_index)
+                score = score_page_text(text)
+                if score > best[2]:
+                    best = (text, extractor.name, score)
+            pages.append(best)
+        return pages
     finally:
-        document.close()
+        for extractor in opened:
+            extractor.close()
+
+
+def extract_text_with_fallback(
+    file_bytes: bytes,
+    filename: str,
+    *,
+    text_layer_extractor: Callable[[bytes], list[tuple[str, str, float]]] = extract_page_text_layers,
+) -> tuple[str, str, list[str]]:
+    """Extract resume text page by page, OCRing only pages without a usable text layer.
+
+    Returns the normalized text, the overall parsing method and the per-page methods.
+    """
+    extension = Path(filename).suffix.lower()
+    if extension != '.pdf':
+        raise ValueError('Only PDF resumes are currently supported in the async pipeline.')
 
-    ocr_text = '\n'.join(chunk.strip() for chunk in ocr_chunks if chunk.strip()).strip()
-    if not ocr_text:
+    text_layers = text_layer_extractor(file_bytes)
+    page_texts = [text for text, _, _ in text_layers]
+    page_methods = [method for _, method, _ in text_layers]
+    page_quality = [_classify_page_text(text, score) for text, _, score in text_layers]
+    ocr_page_indices = [index for index, quality in enumerate(page_quality) if quality != 'text']
+    if ocr_page_indices:
+        has_text_pages = any(quality in {'text', 'sparse'} for quality in page_quality)
+        if shutil.which('tesseract'):
+            ocr_texts = ocr_pages(file_bytes, ocr_page_indices)
+        elif has_text_pages:
+            ocr_texts = {}
+        else:
+            raise ValueError('PDF text extraction failed and OCR is unavailable because the tesseract binary is not installed.')
+
+        for page_index in ocr_page_indices:
+            ocr_text = ocr_texts.get(page_index, '').strip()
+            if ocr_text and count_meaningful_words(ocr_text) >= count_meaningful_words(page_texts[page_index]):
+                page_texts[page_index] = ocr_text
+                page_methods[page_index] = 'ocr'
+            elif page_quality[page_index] != 'sparse':
+                page_texts[page_index] = ''
+                page_methods[page_index] = 'unreadable'
+
+    text = '\n'.join(chunk for chunk in page_texts if chunk).strip()
+    if not text:
         raise ValueError('Unable to extract text from this resume, including OCR fallback.')
-    return normalize_text(ocr_text), 'ocr'
+    return normalize_text(text), summarize_parsing_methods(page_methods), page_methods
+
+
+def parse_resume_upload(file_bytes: bytes, filename: str) -> tuple[ResumeDocument, str, list[str]]:
+    """Extract, tokenize and validate resume text in one worker-thread hop.
+
+    Text layers are read inside the parse sandbox when it is enabled; OCR pages go to
+    the OCR pool. Returns the parsed document, parsing method and per-page methods.
+    """
+    text_layer_extractor = (
+        run_sandboxed_text_extraction if get_settings().parse_sandbox_enabled else extract_page_text_layers
+    )
+    resume_text, parsing_method, page_parsing_methods = extract_text_with_fallback(
+        file_bytes,
+        filename,
+        text_layer_extractor=text_layer_extractor,
+    )
+    document = ResumeDocument.from_text(resume_text)
+    validate_resume_text_quality(document)
+    return document, parsing_method, page_parsing_methods
 
 
 def normalize_text(text: str) -> str:
@@ -177,13 +327,15 @@ def normalize_text(text: str) -> str:
     return cleaned.strip()
 
 
-def count_meaningful_words(text: str) -> int:
-    return len(re.findall(r'[A-Za-z0-9][A-Za-z0-9+.#/-]*', text))
+def count_meaningful_words(text: ResumeDocument | str) -> int:
+    if isinstance(text, ResumeDocument):
+        return text.word_count
+    return len(WORD_TOKEN_PATTERN.findall(text))
 
 
-def validate_resume_text_quality(resume_text: str, *, minimum_words: int | None = None) -> int:
+def validate_resume_text_quality(resume: ResumeDocument | str, *, minimum_words: int | None = None) -> int:
     required_words = minimum_words or get_settings().minimum_resume_words
-    word_count = count_meaningful_words(resume_text)
+    word_count = count_meaningful_words(resume)
     if word_count < required_words:
         raise ValueError(
             f'Resume text extraction succeeded but only {word_count} readable words were found. '
@@ -282,20 +434,14 @@ def _contains_pattern(text: str, patterns: list[str]) -> bool:
     return any(re.search(pattern, text, re.IGNORECASE | re.MULTILINE) for pattern in patterns)
 
 
-def compute_resume_structure_score(resume_text: str, parsing_method: str) -> dict[str, Any]:
+def compute_resume_structure_score(resume: ResumeDocument | str, parsing_method: str) -> dict[str, Any]:
+    document = as_resume_document(resume)
+    resume_text = document.text
     lowered = resume_text.lower()
-    section_patterns = {
-        'contact': [r'@', r'linkedin\.com', r'github\.com', r'\+?\d[\d\s().-]{7,}'],
-        'summary': [r'^\s*(summary|profile|objective)\s*$'],
-        'experience': [r'^\s*(experience|work experience|employment|professional experience)\s*$'],
-        'education': [r'^\s*(education|academic background)\s*$'],
-        'skills': [r'^\s*(skills|technical skills|core competencies)\s*$'],
-        'projects': [r'^\s*(projects|project experience)\s*$'],
-    }
 
     section_hits = {
-        name: _contains_pattern(resume_text, patterns)
-        for name, patterns in section_patterns.items()
+        'contact': _contains_pattern(resume_text, [r'@', r'linkedin\.com', r'github\.com', r'\+?\d[\d\s().-]{7,}']),
+        **{name: document.has_section(name) for name in SECTION_HEADING_PATTERNS},
     }
     section_score = round((sum(section_hits.values()) / len(section_hits)) * 100)
 
@@ -306,9 +452,9 @@ def compute_resume_structure_score(resume_text: str, parsing_method: str) -> dic
     }
     contact_score = round((sum(contact_signals.values()) / len(contact_signals)) * 100)
 
-    bullet_lines = [line.strip() for line in resume_text.splitlines() if line.strip().startswith(('-', '*', '•'))]
-    bullet_score = 80 if len(bullet_lines) >= 4 else 60 if len(bullet_lines) >= 2 else 40
-    parse_score = 100 if parsing_method == 'pdfplumber' else 80
+    bullet_line_count = len(document.bullet_indices)
+    bullet_score = 80 if bullet_line_count >= 4 else 60 if bullet_line_count >= 2 else 40
+    parse_score = 100 if parsing_method in TEXT_LAYER_PARSING_METHODS else 90 if parsing_method == 'hybrid' else 80
 
     formatting_score = round((section_score * 0.45) + (contact_score * 0.25) + (bullet_score * 0.2) + (parse_score * 0.1))
     return {
@@ -317,7 +463,7 @@ def compute_resume_structure_score(resume_text: str, parsing_method: str) -> dic
         'contact_score': contact_score,
         'section_hits': section_hits,
         'contact_signals': contact_signals,
-        'bullet_line_count': len(bullet_lines),
+        'bullet_line_count': bullet_line_count,
     }
 
 
@@ -384,92 +530,186 @@ def build_ats_improvements(evaluation: dict[str, Any]) -> list[str]:
     return suggestions[:5]
 
 
-def compute_ats_evaluation(
-    resume_text: str,
+ATS_SCORING_WEIGHTS: dict[str, dict[str, float]] = {
+    'full-time': {
+        'keyword_score': 0.30,
+        'semantic_score': 0.20,
+        'formatting_score': 0.20,
+        'bullet_score': 0.20,
+        'contact_score': 0.10,
+    },
+    'internship': {
+        'keyword_score': 0.30,
+        'semantic_score': 0.18,
+        'formatting_score': 0.27,
+        'bullet_score': 0.15,
+        'contact_score': 0.10,
+    },
+}
+
+
+@dataclass(slots=True, frozen=True)
+class ResumeFeatures:
+    """Mode-independent ATS signals for one resume against one role/JD.
+
+    Extracting these is the expensive part (embeddings, keyword regexes, section
+    scans); every scoring mode is a weighted projection over the same features.
+    """
+
+    reference_text: str
+    similarity: float
+    semantic_score: int
+    keyword_score: int
+    bullet_score: int
+    matched_keywords: list[str]
+    missing_keywords: list[str]
+    weak_bullets: list[str]
+    structure: dict[str, Any]
+    best_aligned_section: str | None = None
+
+    def component_scores(self) -> dict[str, int]:
+        return {
+            'keyword_score': self.keyword_score,
+            'semantic_score': self.semantic_score,
+            'formatting_score': self.structure['formatting_score'],
+            'bullet_score': self.bullet_score,
+            'contact_score': self.structure['contact_score'],
+        }
+
+
+def _resume_shape_features(document: ResumeDocument, parsing_method: str) -> tuple[list[str], int, dict[str, Any]]:
+    """Return the JD-independent (weak bullets, bullet score, structure) signals."""
+    weak_bullets = detect_weak_bullets(document)
+    if document.bullet_indices:
+        strong_ratio = 1 - (len(weak_bullets) / len(document.bullet_indices))
+        bullet_score = max(35, min(100, round(strong_ratio * 100)))
+    else:
+        bullet_score = 45
+    return weak_bullets, bullet_score, compute_resume_structure_score(document, parsing_method)
+
+
+def _job_resume_features(
+    document: ResumeDocument,
     job_description: str,
     target_role: str,
-    *,
-    parsing_method: str = 'pdfplumber',
-    scoring_mode: str = 'full-time',
-) -> dict[str, Any]:
-    reference_text = build_reference_text(target_role, job_description)
-    model = get_sentence_model()
+    reference_text: str,
+    semantic_alignment: SemanticAlignment | None,
+    shape: tuple[list[str], int, dict[str, Any]],
+) -> ResumeFeatures:
     similarity = 0.0
     semantic_score = 0
-    if model:
-        from sentence_transformers import util
-
-        embeddings = model.encode([resume_text[:8000], reference_text[:4000]], convert_to_tensor=True)
-        similarity = float(util.cos_sim(embeddings[0], embeddings[1]).item())
+    if semantic_alignment is not None:
+        similarity = semantic_alignment.similarity
         semantic_score = max(0, min(100, round(((similarity + 1.0) / 2.0) * 100)))
 
     keywords = _extract_reference_keywords(target_role, job_description)
-    if keywords:
-        matched_keywords = [
-            keyword
-            for keyword in keywords
-            if re.search(rf'(?<!\w){re.escape(keyword)}(?!\w)', resume_text, re.IGNORECASE)
-        ]
-        keyword_score = round((len(matched_keywords) / len(keywords)) * 100)
-    else:
-        matched_keywords = []
-        keyword_score = 100
-
-    missing_keywords = [keyword for keyword in keywords if keyword not in matched_keywords]
-    weak_bullets = detect_weak_bullets(resume_text)
-    bullet_candidates = [
-        line.strip()
-        for line in resume_text.splitlines()
-        if line.strip().startswith(('-', '*', '•'))
-    ]
-    if bullet_candidates:
-        strong_ratio = 1 - (len(weak_bullets) / len(bullet_candidates))
-        bullet_score = max(35, min(100, round(strong_ratio * 100)))
-    else:
-        bullet_score = 45
+    matched_keywords, missing_keywords = match_keywords(document.text, keywords)
+    keyword_score = round((len(matched_keywords) / len(keywords)) * 100) if keywords else 100
 
-    if not model:
+    if semantic_alignment is None:
         semantic_score = keyword_score
         similarity = round(max(0, min(1, keyword_score / 100)), 4)
 
-    structure = compute_resume_structure_score(resume_text, parsing_method)
-    if scoring_mode == 'internship':
-        ats_score = round(
-            (keyword_score * 0.30)
-            + (semantic_score * 0.18)
-            + (structure['formatting_score'] * 0.27)
-            + (bullet_score * 0.15)
-            + (structure['contact_score'] * 0.10)
-        )
-    else:
-        ats_score = round(
-            (keyword_score * 0.30)
-            + (semantic_score * 0.20)
-            + (structure['formatting_score'] * 0.20)
-            + (bullet_score * 0.20)
-            + (structure['contact_score'] * 0.10)
+    weak_bullets, bullet_score, structure = shape
+    return ResumeFeatures(
+        reference_text=reference_text,
+        similarity=similarity,
+        semantic_score=semantic_score,
+        keyword_score=keyword_score,
+        bullet_score=bullet_score,
+        matched_keywords=matched_keywords,
+        missing_keywords=missing_keywords,
+        weak_bullets=weak_bullets,
+        structure=structure,
+        best_aligned_section=semantic_alignment.best_section if semantic_alignment else None,
+    )
+
+
+def extract_resume_features(
+    resume: ResumeDocument | str,
+    job_description: str,
+    target_role: str,
+    *,
+    parsing_method: str = 'pdfplumber',
+    semantic_alignment: SemanticAlignment | None = None,
+) -> ResumeFeatures:
+    """Extract scoring features once for every scoring mode.
+
+    Async callers pass `semantic_alignment` from the batched embedding service;
+    otherwise the sentence model is called directly when it is available.
+    """
+    document = as_resume_document(resume)
+    reference_text = build_reference_text(target_role, job_description)
+    if semantic_alignment is None:
+        model = get_sentence_model()
+        if model:
+            semantic_alignment = encode_alignment(model, document, reference_text)
+    return _job_resume_features(
+        document,
+        job_description,
+        target_role,
+        reference_text,
+        semantic_alignment,
+        _resume_shape_features(document, parsing_method),
+    )
+
+
+def extract_resume_features_for_jobs(
+    resume: ResumeDocument | str,
+    jobs: Sequence[tuple[str, str]],
+    *,
+    parsing_method: str = 'pdfplumber',
+    semantic_alignments: Sequence[SemanticAlignment | None] | None = None,
+) -> list[ResumeFeatures]:
+    """Extract features for one resume against many (target role, job description) pairs.
+
+    Structure and bullet signals do not depend on the job, so they are computed
+    once; only keyword matching runs per job. Jobs without an alignment fall back
+    to the keyword proxy instead of calling the model one job at a time.
+    """
+    document = as_resume_document(resume)
+    shape = _resume_shape_features(document, parsing_method)
+    alignments = list(semantic_alignments) if semantic_alignments is not None else [None] * len(jobs)
+    return [
+        _job_resume_features(
+            document,
+            job_description,
+            target_role,
+            build_reference_text(target_role, job_description),
+            alignment,
+            shape,
         )
+        for (target_role, job_description), alignment in zip(jobs, alignments)
+    ]
+
+
+def score_resume_features(features: ResumeFeatures, *, scoring_mode: str = 'full-time') -> dict[str, Any]:
+    weights = ATS_SCORING_WEIGHTS.get(scoring_mode, ATS_SCORING_WEIGHTS['full-time'])
+    components = features.component_scores()
+    ats_score = round(sum(components[name] * weight for name, weight in weights.items()))
+    structure = features.structure
 
     evaluation = {
-        'semantic_similarity': round(similarity, 4),
-        'semantic_score': semantic_score,
-        'keyword_score': keyword_score,
-        'bullet_score': bullet_score,
+        'semantic_similarity': round(features.similarity, 4),
+        'semantic_score': features.semantic_score,
+        'keyword_score': features.keyword_score,
+        'bullet_score': features.bullet_score,
         'formatting_score': structure['formatting_score'],
         'section_score': structure['section_score'],
         'contact_score': structure['contact_score'],
         'ats_score': ats_score,
-        'matched_keywords': matched_keywords[:12],
-        'missing_keywords': missing_keywords[:12],
-        'weak_bullets': weak_bullets[:5],
-        'section_hits': structure['section_hits'],
-        'contact_signals': structure['contact_signals'],
-        'reference_text_excerpt': reference_text[:400],
+        'matched_keywords': features.matched_keywords[:12],
+        'missing_keywords': features.missing_keywords[:12],
+        'weak_bullets': features.weak_bullets[:5],
+        'section_hits': dict(structure['section_hits']),
+        'contact_signals': dict(structure['contact_signals']),
+        'reference_text_excerpt': features.reference_text[:400],
+        'best_aligned_section': features.best_aligned_section,
         'score_breakdown': [
-            {'label': 'Keyword Match', 'score': keyword_score},
-            {'label': 'Role Alignment', 'score': semantic_score},
+            {'label': 'Keyword Match', 'score': features.keyword_score},
+            {'label': 'Role Alignment', 'score': features.semantic_score},
             {'label': 'Resume Structure', 'score': structure['formatting_score']},
-            {'label': 'Bullet Impact', 'score': bullet_score},
+            {'label': 'Bullet Impact', 'score': features.bullet_score},
         ],
     }
     evaluation['feedback'] = build_ats_feedback(evaluation)
@@ -477,14 +717,21 @@ def compute_ats_evaluation(
     return evaluation
 
 
-def detect_weak_bullets(resume_text: str) -> list[str]:
-    bullets = [
-        line.strip()
-        for line in resume_text.splitlines()
-        if line.strip().startswith(('-', '*', '•'))
-    ]
+def compute_ats_evaluation(
+    resume: ResumeDocument | str,
+    job_description: str,
+    target_role: str,
+    *,
+    parsing_method: str = 'pdfplumber',
+    scoring_mode: str = 'full-time',
+) -> dict[str, Any]:
+    features = extract_resume_features(resume, job_description, target_role, parsing_method=parsing_method)
+    return score_resume_features(features, scoring_mode=scoring_mode)
+
+
+def detect_weak_bullets(resume: ResumeDocument | str) -> list[str]:
     weak = []
-    for bullet in bullets:
+    for bullet in as_resume_document(resume).bullet_lines:
         has_metric = bool(re.search(r'\b\d+[%+]?\b', bullet))
         has_action = bool(re.search(r'\b(built|developed|implemented|designed|led|improved|reduced|increased|created|optimized|launched|automated|scaled)\b', bullet, re.IGNORECASE))
         if len(bullet.split()) < 7 or not has_metric or not has_action:
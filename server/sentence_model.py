@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import logging
+import time
+from threading import Lock
+from typing import Any
+
+from config import get_settings
+
+
+_log = logging.getLogger('elevate.model')
+_model: Any | None = None
+_state = 'cold'
+_error: str | None = None
+_load_ms: float | None = None
+_warmup_ms: float | None = None
+_lock = Lock()
+
+WARMUP_TEXTS = [
+    'Backend engineer building Python FastAPI services with SQL, Docker and AWS.',
+    'Target role: Software Engineer. Evaluate the resume for role alignment and technical depth.',
+]
+
+
+def _load_locked() -> Any:
+    global _model, _state, _error, _load_ms
+    if _model is not None:
+        return _model
+    _state = 'loading'
+    started_at = time.perf_counter()
+    try:
+        from sentence_transformers import SentenceTransformer
+
+        _model = SentenceTransformer(
+            get_settings().sentence_model_name,
+            local_files_only=True,
+        )
+        _state = 'loaded'
+    except Exception as exc:
+        _model = False
+        _state = 'disabled'
+        _error = f'{type(exc).__name__}: {exc}'
+    _load_ms = round((time.perf_counter() - started_at) * 1000, 2)
+    return _model
+
+
+def get_sentence_model() -> Any:
+    """Return the sentence model, loading it on first use; False when unavailable."""
+    if _model is not None:
+        return _model
+    with _lock:
+        return _load_locked()
+
+
+def warm_sentence_model() -> str:
+    """Load the model and run one synthetic encode so the first analysis pays no cold start."""
+    global _model, _state, _error, _warmup_ms
+    with _lock:
+        model = _load_locked()
+        if not model or _state == 'ready':
+            return _state
+        started_at = time.perf_counter()
+        try:
+            model.encode(WARMUP_TEXTS)
+        except Exception as exc:
+            # A model that cannot encode is dropped, so scoring falls back to the keyword proxy.
+            _model = False
+            _state = 'failed'
+            _error = f'{type(exc).__name__}: {exc}'
+            _warmup_ms = round((time.perf_counter() - started_at) * 1000, 2)
+            _log.warning('[MODEL] Sentence model warm-up encode failed: %s', _error)
+            return _state
+        _warmup_ms = round((time.perf_counter() - started_at) * 1000, 2)
+        _state = 'ready'
+    _log.info('[MODEL] Sentence model ready (load %.0fms, warm-up %.0fms).', _load_ms or 0, _warmup_ms or 0)
+    return _state
+
+
+def sentence_model_is_loaded() -> bool:
+    """True once get_sentence_model() returns without blocking on a load."""
+    return _model is not None
+
+
+def sentence_model_is_ready() -> bool:
+    """True once requests will not pay a model cold start; a disabled or failed model never blocks."""
+    return _state in {'ready', 'disabled', 'failed'}
+
+
+def get_sentence_model_status() -> dict[str, Any]:
+    return {
+        'state': _state,
+        'model_name': get_settings().sentence_model_name,
+        'load_ms': _load_ms,
+        'warmup_ms': _warmup_ms,
+        'error': _error,
+    }
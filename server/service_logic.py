@@ -9,9 +9,18 @@ from fastapi import HTTPException
 from api_clients import fetch_fulltime_jobs_from_jsearch, fetch_internships_from_jsearch
 from career_mapper import adapt_jsearch_to_career_path
 from config import get_settings
-from resume_pipeline import compute_ats_evaluation
+from embedding_service import compute_semantic_alignment, compute_semantic_alignments
+from models import AnalysisSection, AnalysisSkill, BatchJobDescription
+from prompt_compaction import build_compacted_dual_analysis_prompt
+from resume_pipeline import (
+    ResumeFeatures,
+    build_reference_text,
+    extract_resume_features,
+    extract_resume_features_for_jobs,
+    score_resume_features,
+)
 from resume_pipeline import count_meaningful_words
-from utils import build_dual_analysis_prompt
+from resume_document import ResumeDocument
 
 SOFT_SKILL_QUERY_BLOCKLIST = {
     'adaptability',
@@ -63,15 +72,12 @@ async def run_jobs_search(query: str, job_type: str, *, fallback_queries: list[s
     return []
 
 
-def _normalize_skills(raw_items: Any) -> list[dict[str, str]]:
+def _normalize_skills(skills: list[AnalysisSkill]) -> list[dict[str, str]]:
     normalized: list[dict[str, str]] = []
     seen: set[str] = set()
 
-    for item in raw_items or []:
-        if isinstance(item, dict):
-            name = str(item.get('name', '')).strip()
-        else:
-            name = str(item).strip()
+    for skill in skills:
+        name = skill.name.strip()
         if not name:
             continue
         key = name.lower()
@@ -83,13 +89,8 @@ def _normalize_skills(raw_items: Any) -> list[dict[str, str]]:
     return normalized[:14]
 
 
-def _normalize_string_list(raw_items: Any, *, limit: int) -> list[str]:
-    values: list[str] = []
-    for item in raw_items or []:
-        text = str(item).strip()
-        if text:
-            values.append(text)
-    return values[:limit]
+def _normalize_string_list(items: list[str], *, limit: int) -> list[str]:
+    return [text for text in (item.strip() for item in items) if text][:limit]
 
 
 def _merge_unique_strings(primary: list[str], secondary: list[str], *, limit: int) -> list[str]:
@@ -120,13 +121,12 @@ def _market_context() -> dict[str, str]:
     }
 
 
-def _normalize_section(section: Any, evaluation: dict[str, Any]) -> dict[str, Any]:
-    data = section if isinstance(section, dict) else {}
-    llm_improvements = _normalize_string_list(data.get('generalResumeImprovements'), limit=6)
-    llm_upskilling = _normalize_string_list(data.get('generalUpskillingSuggestions'), limit=6)
+def _normalize_section(section: AnalysisSection, evaluation: dict[str, Any]) -> dict[str, Any]:
+    llm_improvements = _normalize_string_list(section.generalResumeImprovements, limit=6)
+    llm_upskilling = _normalize_string_list(section.generalUpskillingSuggestions, limit=6)
     return {
-        'name': str(data.get('name', 'Valued Professional')).strip() or 'Valued Professional',
-        'summary': str(data.get('summary', 'No summary generated.')).strip() or 'No summary generated.',
+        'name': section.name.strip() or 'Valued Professional',
+        'summary': section.summary.strip() or 'No summary generated.',
         'atsScore': {
             'score': evaluation['ats_score'],
             'feedback': evaluation['feedback'],
@@ -134,10 +134,11 @@ def _normalize_section(section: Any, evaluation: dict[str, Any]) -> dict[str, An
             'matchedKeywords': evaluation['matched_keywords'],
             'missingKeywords': evaluation['missing_keywords'],
             'topIssues': evaluation['improvements'],
+            'bestAlignedSection': evaluation.get('best_aligned_section'),
         },
-        'extractedSkills': _normalize_skills(data.get('extractedSkills')),
-        'experienceSummary': _normalize_string_list(data.get('experienceSummary'), limit=8),
-        'educationSummary': _normalize_string_list(data.get('educationSummary'), limit=6),
+        'extractedSkills': _normalize_skills(section.extractedSkills),
+        'experienceSummary': _normalize_string_list(section.experienceSummary, limit=8),
+        'educationSummary': _normalize_string_list(section.educationSummary, limit=6),
         'careerPaths': [],
         'generalResumeImprovements': _merge_unique_strings(evaluation['improvements'], llm_improvements, limit=7),
         'generalUpskillingSuggestions': _merge_unique_strings(llm_upskilling, evaluation['improvements'], limit=7),
@@ -276,45 +277,46 @@ async def build_resume_review_core(
     experience_level: str,
     job_description: str,
     parsing_method: str,
+    page_parsing_methods: list[str] | None = None,
+    resume_document: ResumeDocument | None = None,
+    resume_digest: str | None = None,
 ) -> dict[str, Any]:
     from gemini_client import get_dual_analysis
 
     settings = get_settings()
+    document = resume_document if resume_document is not None else ResumeDocument.from_text(resume_text)
     market_context = _market_context()
     analysis_started_at = time.perf_counter()
     generated_at_utc = datetime.now(timezone.utc).isoformat()
 
-    prompt = build_dual_analysis_prompt(
-        resume_content=resume_text,
+    compacted_prompt = build_compacted_dual_analysis_prompt(
+        document=document,
         target_role=target_role,
         experience_level=experience_level,
         job_description=job_description,
         market_context=market_context,
+        token_budget=settings.gemini_prompt_token_budget,
     )
     llm_started_at = time.perf_counter()
-    raw_result = await get_dual_analysis(prompt)
+    llm_result, llm_call = await get_dual_analysis(compacted_prompt.prompt)
     llm_elapsed_ms = round((time.perf_counter() - llm_started_at) * 1000, 2)
 
-    if not raw_result or 'full_time_analysis' not in raw_result or 'internship_analysis' not in raw_result:
-        raise HTTPException(status_code=500, detail='AI analysis failed. Check service logs.')
-
-    full_time_evaluation = compute_ats_evaluation(
-        resume_text,
-        job_description,
-        target_role,
-        parsing_method=parsing_method,
-        scoring_mode='full-time',
+    semantic_alignment = await compute_semantic_alignment(
+        document,
+        build_reference_text(target_role, job_description),
     )
-    internship_evaluation = compute_ats_evaluation(
-        resume_text,
+    resume_features = extract_resume_features(
+        document,
         job_description,
         target_role,
         parsing_method=parsing_method,
-        scoring_mode='internship',
+        semantic_alignment=semantic_alignment,
     )
+    full_time_evaluation = score_resume_features(resume_features, scoring_mode='full-time')
+    internship_evaluation = score_resume_features(resume_features, scoring_mode='internship')
 
-    full_time_analysis = _normalize_section(raw_result.get('full_time_analysis'), full_time_evaluation)
-    internship_analysis = _normalize_section(raw_result.get('internship_analysis'), internship_evaluation)
+    full_time_analysis = _normalize_section(llm_result.full_time_analysis, full_time_evaluation)
+    internship_analysis = _normalize_section(llm_result.internship_analysis, internship_evaluation)
 
     full_time_query = build_job_search_query(
         target_role,
@@ -336,6 +338,8 @@ async def build_resume_review_core(
         'target_role': target_role,
         'experience_level': experience_level,
         'parsing_method': parsing_method,
+        'page_parsing_methods': list(page_parsing_methods or []),
+        'resume_digest': resume_digest,
         'resume_text_raw': resume_text,
         'job_description_raw': job_description,
         'resume_excerpt': resume_text[:1200],
@@ -349,6 +353,12 @@ async def build_resume_review_core(
         'analysis_metadata': {
             'backend_version': settings.app_version,
             'generated_at_utc': generated_at_utc,
+            'llm_model': llm_call['model'],
+            'llm_attempts': llm_call['attempts'],
+            'llm_hedged': llm_call['hedged'],
+            'llm_response_repairs': llm_call['repairs'],
+            'model_routing': llm_call['routing'],
+            'prompt_tokens': compacted_prompt.as_metadata(),
             'timings_ms': {
                 'llm_analysis': llm_elapsed_ms,
                 'market_enrichment': 0,
@@ -356,7 +366,8 @@ async def build_resume_review_core(
             },
         },
         'quality_signals': {
-            'resume_word_count': count_meaningful_words(resume_text),
+            'resume_word_count': count_meaningful_words(document),
+            'ocr_page_count': sum(1 for method in page_parsing_methods or [] if method == 'ocr'),
             'job_description_present': bool(job_description.strip()),
             'job_feed_mode': 'pending',
             'market_region': settings.market_region_name,
@@ -368,6 +379,69 @@ async def build_resume_review_core(
     }
 
 
+def _rank_batch_scores(
+    jobs: list[BatchJobDescription],
+    targets: list[tuple[str, str]],
+    features: list[ResumeFeatures],
+    scoring_mode: str,
+) -> list[dict[str, Any]]:
+    scored: list[dict[str, Any]] = []
+    for index, (job, (target_role, _), job_features) in enumerate(zip(jobs, targets, features)):
+        evaluation = score_resume_features(job_features, scoring_mode=scoring_mode)
+        scored.append({
+            'id': job.id or str(index),
+            'target_role': target_role,
+            'ats_score': evaluation['ats_score'],
+            'semantic_score': evaluation['semantic_score'],
+            'keyword_score': evaluation['keyword_score'],
+            'semantic_similarity': evaluation['semantic_similarity'],
+            'best_aligned_section': evaluation['best_aligned_section'],
+            'matched_keywords': evaluation['matched_keywords'],
+            'missing_keywords': evaluation['missing_keywords'],
+        })
+    scored.sort(key=lambda item: (-item['ats_score'], -item['semantic_similarity']))
+    for rank, item in enumerate(scored, start=1):
+        item['rank'] = rank
+    return scored
+
+
+async def score_resume_against_job_descriptions(
+    document: ResumeDocument,
+    jobs: list[BatchJobDescription],
+    *,
+    target_role: str,
+    scoring_mode: str,
+    parsing_method: str = 'pdfplumber',
+) -> dict[str, Any]:
+    """Rank one resume against many job descriptions without any LLM calls.
+
+    The resume chunks and every job description are embedded in one broker request
+    and scored as a single chunk-by-job similarity matrix; keyword matching then
+    runs per job off the event loop.
+    """
+    started_at = time.perf_counter()
+    targets = [((job.target_role.strip() or target_role), job.job_description.strip()) for job in jobs]
+    alignments = await compute_semantic_alignments(
+        document,
+        [build_reference_text(role, job_description) for role, job_description in targets],
+    )
+    features = await asyncio.to_thread(
+        extract_resume_features_for_jobs,
+        document,
+        targets,
+        parsing_method=parsing_method,
+        semantic_alignments=alignments,
+    )
+    results = _rank_batch_scores(jobs, targets, features, scoring_mode)
+    return {
+        'scoring_mode': scoring_mode,
+        'semantic_mode': 'embedding' if alignments is not None else 'keyword-proxy',
+        'job_count': len(results),
+        'elapsed_ms': round((time.perf_counter() - started_at) * 1000, 2),
+        'results': results,
+    }
+
+
 async def enrich_resume_review_market(result: dict[str, Any]) -> dict[str, Any]:
     settings = get_settings()
     target_role = str(result.get('target_role', 'Software Engineer'))
@@ -0,0 +1,74 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+import analysis_flight
+from redis_store import get_analysis_flight_leader, get_task_status, release_analysis_flight
+from resume_pipeline import initialize_task_state, update_task
+
+
+class AnalysisFlightTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.cache_hash = f"flight-{self.id()}"
+
+    def tearDown(self) -> None:
+        leader = get_analysis_flight_leader(self.cache_hash)
+        if leader:
+            release_analysis_flight(self.cache_hash, leader)
+
+    def test_second_claim_joins_the_leader_and_only_the_leader_releases(self) -> None:
+        self.assertIsNone(analysis_flight.claim_flight(self.cache_hash, "task-a"))
+        self.assertEqual(analysis_flight.claim_flight(self.cache_hash, "task-b"), "task-a")
+
+        analysis_flight.release_flight(self.cache_hash, "task-b")
+        self.assertEqual(get_analysis_flight_leader(self.cache_hash), "task-a")
+
+        analysis_flight.release_flight(self.cache_hash, "task-a")
+        self.assertIsNone(analysis_flight.claim_flight(self.cache_hash, "task-b"))
+
+    def test_claims_are_not_shared_when_single_flight_is_disabled(self) -> None:
+        with patch.object(analysis_flight.get_settings(), "analysis_single_flight_enabled", False):
+            self.assertIsNone(analysis_flight.claim_flight(self.cache_hash, "task-a"))
+            self.assertIsNone(analysis_flight.claim_flight(self.cache_hash, "task-b"))
+
+    def test_follower_waits_for_market_enrichment_before_settling(self) -> None:
+        initialize_task_state("leader-task")
+        initialize_task_state("follower-task")
+        analysis_flight.claim_flight(self.cache_hash, "leader-task")
+
+        async def leader() -> None:
+            await asyncio.sleep(0.02)
+            update_task("leader-task", status="completed", progress=100, current_step="Dashboard ready", result={"job_market_pending": True})
+            await asyncio.sleep(0.02)
+            update_task("leader-task", status="completed", progress=100, current_step="Dashboard ready", result={"job_market_pending": False})
+            analysis_flight.release_flight(self.cache_hash, "leader-task")
+
+        async def scenario() -> bool:
+            attached, _ = await asyncio.gather(
+                analysis_flight.follow_flight("follower-task", "leader-task", self.cache_hash),
+                leader(),
+            )
+            return attached
+
+        with patch.object(analysis_flight, "FLIGHT_POLL_SECONDS", 0.005):
+            self.assertTrue(asyncio.run(scenario()))
+
+        follower = asyncio.run(get_task_status("follower-task"))
+        self.assertEqual(follower["status"], "completed")
+        self.assertTrue(follower["cached"])
+        self.assertEqual(follower["result"], {"job_market_pending": False})
+
+    def test_follower_reports_an_orphaned_flight_when_the_leader_releases_without_settling(self) -> None:
+        initialize_task_state("crashed-task")
+        initialize_task_state("follower-task")
+        analysis_flight.claim_flight(self.cache_hash, "crashed-task")
+        update_task("crashed-task", status="processing", progress=52, current_step="Running Gemini analysis")
+        release_analysis_flight(self.cache_hash, "crashed-task")
+
+        self.assertFalse(asyncio.run(analysis_flight.follow_flight("follower-task", "crashed-task", self.cache_hash)))
+        follower = asyncio.run(get_task_status("follower-task"))
+        self.assertEqual(follower["current_step"], "Running Gemini analysis")
+
+
+if __name__ == "__main__":
+    unittest.main()
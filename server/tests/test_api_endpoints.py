@@ -1,12 +1,16 @@
 import asyncio
 import copy
 import unittest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from fastapi.testclient import TestClient
 
+import main as main_module
 from main import app
-from redis_store import StorageUnavailableError
+from models import MAX_BATCH_JOB_DESCRIPTION_CHARS, MAX_BATCH_RESUME_TEXT_CHARS
+from redis_store import StorageUnavailableError, get_task_status, release_analysis_flight
+from resume_document import ResumeDocument
+from resume_pipeline import compute_payload_hash, compute_pdf_digest
 
 
 def _analysis_result(target_role: str) -> dict:
@@ -176,8 +180,12 @@ class ApiEndpointTests(unittest.TestCase):
             patch("main.settings.auto_market_enrichment_enabled", True),
             patch("main.using_local_memory_store", return_value=True),
             patch("main.set_resume_text"),
-            patch("main.extract_text_with_fallback", return_value=("Python FastAPI SQL resume text", "pdfplumber")),
-            patch("main.validate_resume_text_quality", return_value=120),
+            patch("main.get_extracted_text", return_value=None),
+            patch("main.set_extracted_text") as set_extracted_text_mock,
+            patch(
+                "main.parse_resume_upload",
+                return_value=(ResumeDocument.from_text("Python FastAPI SQL resume text"), "pdfplumber", ["pdfplumber"]),
+            ),
             patch("main.persist_cached_result"),
             patch("main.update_task", side_effect=fake_update_task),
             patch("main.build_resume_review_core", new=core_analysis_mock),
@@ -209,9 +217,69 @@ class ApiEndpointTests(unittest.TestCase):
         self.assertEqual(update_calls[-1]["current_step"], "Dashboard ready")
         self.assertEqual(update_calls[-1]["result"]["target_role"], "Backend Engineer")
         self.assertFalse(update_calls[-1]["result"]["job_market_pending"])
+        extracted_entry = set_extracted_text_mock.call_args.args[1]
+        self.assertEqual(extracted_entry["word_count"], 5)
+        self.assertEqual(extracted_entry["document"]["word_count"], 5)
+        self.assertEqual(
+            core_analysis_mock.await_args.kwargs["resume_digest"],
+            compute_pdf_digest(b"%PDF-1.4 test pdf"),
+        )
         response.close()
 
-    def test_analyze_endpoint_offloads_upload_payload_when_redis_store_is_available(self) -> None:
+    def test_analysis_task_reuses_extracted_text_for_the_same_pdf(self) -> None:
+        update_calls: list[dict] = []
+        core_analysis_mock = AsyncMock(return_value=_pending_analysis_result("Data Analyst"))
+
+        def fake_update_task(task_id: str, **kwargs) -> dict:
+            update_calls.append({"task_id": task_id, **kwargs})
+            return _task_payload(task_id, **kwargs)
+
+        cached_text = {
+            "resume_text": "Previously parsed resume text",
+            "parsing_method": "hybrid",
+            "page_parsing_methods": ["pymupdf", "ocr"],
+            "word_count": 140,
+            "document": {
+                "lines": ["Previously parsed resume text"],
+                "bullet_indices": [],
+                "section_spans": {},
+                "word_count": 140,
+            },
+        }
+
+        upload = MagicMock()
+
+        with (
+            patch("main.settings.auto_market_enrichment_enabled", False),
+            patch("main.get_extracted_text", return_value=cached_text) as get_extracted_text_mock,
+            patch("main.parse_resume_upload", side_effect=AssertionError("should not parse")),
+            patch("main.set_resume_text"),
+            patch("main.persist_cached_result"),
+            patch("main.update_task", side_effect=fake_update_task),
+            patch("main.build_resume_review_core", new=core_analysis_mock),
+        ):
+            asyncio.run(
+                main_module._run_analysis_task(
+                    task_id="task-123",
+                    upload=upload,
+                    filename="resume.pdf",
+                    target_role="Data Analyst",
+                    experience_level="Entry Level",
+                    job_description="",
+                    cache_hash="payload-hash",
+                    pdf_digest="pdf-digest",
+                )
+            )
+
+        get_extracted_text_mock.assert_called_once_with("pdf-digest")
+        self.assertEqual(core_analysis_mock.await_args.kwargs["resume_text"], "Previously parsed resume text")
+        self.assertEqual(core_analysis_mock.await_args.kwargs["page_parsing_methods"], ["pymupdf", "ocr"])
+        self.assertEqual(core_analysis_mock.await_args.kwargs["resume_document"].word_count, 140)
+        self.assertEqual(update_calls[-1]["status"], "completed")
+        upload.read_bytes.assert_not_called()
+        upload.close.assert_called_once()
+
+    def test_analyze_endpoint_hands_the_spooled_upload_to_the_analysis_task(self) -> None:
         scheduled_tasks = []
         analysis_task_mock = AsyncMock(return_value=None)
 
@@ -222,8 +290,6 @@ class ApiEndpointTests(unittest.TestCase):
             patch("main.enforce_daily_rate_limit", return_value=(True, 5)),
             patch("main.initialize_task_state"),
             patch("main.maybe_return_cached", return_value=None),
-            patch("main.using_local_memory_store", return_value=False),
-            patch("main.set_upload_blob") as set_upload_blob_mock,
             patch("main.update_task", side_effect=lambda task_id, **kwargs: _task_payload(task_id, **kwargs)),
             patch("main._run_analysis_task", new=analysis_task_mock),
             patch("main._schedule_background_task", side_effect=capture_task),
@@ -240,9 +306,94 @@ class ApiEndpointTests(unittest.TestCase):
             self.assertEqual(len(scheduled_tasks), 1)
             asyncio.run(scheduled_tasks[0])
 
+        # The mocked task never releases the single-flight lease the endpoint claimed.
+        release_analysis_flight(analysis_task_mock.call_args.kwargs["cache_hash"], analysis_task_mock.call_args.kwargs["task_id"])
+        analysis_task_mock.call_args.kwargs["upload"].close()
         self.assertEqual(response.status_code, 200)
-        self.assertIsNone(analysis_task_mock.call_args.kwargs["contents"])
-        set_upload_blob_mock.assert_called_once()
+        self.assertIsNotNone(analysis_task_mock.call_args.kwargs["upload"])
+        self.assertEqual(
+            analysis_task_mock.call_args.kwargs["cache_hash"],
+            compute_payload_hash(b"%PDF-1.4 test pdf", "Looking for Python and FastAPI skills.", "Backend Engineer", "Entry Level"),
+        )
+        self.assertEqual(analysis_task_mock.call_args.kwargs["pdf_digest"], compute_pdf_digest(b"%PDF-1.4 test pdf"))
+        response.close()
+
+    def test_identical_in_flight_uploads_share_one_analysis(self) -> None:
+        scheduled_tasks = []
+
+        async def slow_core_analysis(**kwargs) -> dict:
+            await asyncio.sleep(0.05)
+            return _analysis_result(kwargs["target_role"])
+
+        core_analysis_mock = AsyncMock(side_effect=slow_core_analysis)
+        upload = {
+            "files": {"file": ("resume.pdf", b"%PDF-1.4 single flight pdf", "application/pdf")},
+            "data": {
+                "target_role": "Platform Engineer",
+                "experience_level": "Entry Level",
+                "job_description": "Kubernetes and Terraform.",
+            },
+        }
+
+        with (
+            patch("main.enforce_daily_rate_limit", return_value=(True, 5)),
+            patch("main.maybe_return_cached", return_value=None),
+            patch("main.settings.auto_market_enrichment_enabled", False),
+            patch("main.using_local_memory_store", return_value=True),
+            patch("main.get_extracted_text", return_value=None),
+            patch("main.set_extracted_text"),
+            patch(
+                "main.parse_resume_upload",
+                return_value=(ResumeDocument.from_text("Python FastAPI SQL resume text"), "pdfplumber", ["pdfplumber"]),
+            ),
+            patch("main.persist_cached_result"),
+            patch("main.build_resume_review_core", new=core_analysis_mock),
+            patch("main._schedule_background_task", side_effect=scheduled_tasks.append),
+            patch("analysis_flight.FLIGHT_POLL_SECONDS", 0.01),
+        ):
+            leader = self.client.post("/api/analyze", **upload).json()
+            follower = self.client.post("/api/analyze", **upload).json()
+
+            async def run_both() -> tuple[dict, dict]:
+                await asyncio.gather(*scheduled_tasks)
+                return await get_task_status(leader["task_id"]), await get_task_status(follower["task_id"])
+
+            leader_status, follower_status = asyncio.run(run_both())
+
+        self.assertEqual(follower["current_step"], "Joining an identical analysis already in progress")
+        core_analysis_mock.assert_awaited_once()
+        self.assertEqual(leader_status["status"], "completed")
+        self.assertEqual(follower_status["status"], "completed")
+        self.assertTrue(follower_status["cached"])
+        self.assertEqual(follower_status["result"], leader_status["result"])
+
+    def test_analyze_endpoint_rejects_oversized_uploads_while_streaming(self) -> None:
+        with (
+            patch("main.enforce_daily_rate_limit", return_value=(True, 5)),
+            patch("main.settings.max_upload_size_bytes", 1024),
+            patch("main.initialize_task_state") as initialize_task_state_mock,
+        ):
+            response = self.client.post(
+                "/api/analyze",
+                files={"file": ("resume.pdf", b"%PDF-1.4 " + b"x" * 4096, "application/pdf")},
+                data={"target_role": "Backend Engineer"},
+            )
+
+        self.assertEqual(response.status_code, 413)
+        initialize_task_state_mock.assert_not_called()
+        response.close()
+
+    def test_analyze_endpoint_rejects_files_without_pdf_signature(self) -> None:
+        with patch("main.enforce_daily_rate_limit", return_value=(True, 5)):
+            response = self.client.post(
+                "/api/analyze",
+                files={"file": ("resume.pdf", b"PK\x03\x04 not really a pdf", "application/pdf")},
+            )
+            missing_file_response = self.client.post("/api/analyze", data={"target_role": "Backend Engineer"})
+
+        self.assertEqual(response.status_code, 415)
+        self.assertEqual(response.json()["error"]["message"], "The uploaded file is not a valid PDF document.")
+        self.assertEqual(missing_file_response.status_code, 422)
         response.close()
 
     def test_retarget_endpoint_reuses_existing_resume_text(self) -> None:
@@ -354,6 +505,105 @@ class ApiEndpointTests(unittest.TestCase):
         self.assertEqual(update_calls[-1]["result"]["target_role"], "Data Analyst")
         response.close()
 
+    def test_batch_score_ranks_job_descriptions_with_keyword_proxy(self) -> None:
+        resume_text = "\n".join(
+            ["Jane Doe", "Experience"]
+            + [f"- Built Python FastAPI services with SQL and Docker for team {index}" for index in range(8)]
+            + ["Skills", "Python, FastAPI, SQL, Docker, AWS"]
+        )
+        alignment_mock = AsyncMock(return_value=None)
+
+        with patch("service_logic.compute_semantic_alignments", new=alignment_mock):
+            response = self.client.post(
+                "/api/score/batch",
+                json={
+                    "resume_text": resume_text,
+                    "target_role": "Backend Engineer",
+                    "job_descriptions": [
+                        {"id": "design", "job_description": "Figma, Sketch, typography and illustration."},
+                        {"id": "backend", "job_description": "Python, FastAPI, SQL and Docker services on AWS."},
+                    ],
+                },
+            )
+
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertEqual(payload["semantic_mode"], "keyword-proxy")
+        self.assertEqual(payload["job_count"], 2)
+        self.assertEqual([item["id"] for item in payload["results"]], ["backend", "design"])
+        self.assertEqual([item["rank"] for item in payload["results"]], [1, 2])
+        self.assertIn("fastapi", payload["results"][0]["matched_keywords"])
+        self.assertEqual(len(alignment_mock.await_args.args[1]), 2)
+
+    def test_batch_score_reuses_resume_text_from_an_existing_analysis(self) -> None:
+        resume_text = " ".join(["Python FastAPI SQL Docker engineer"] * 15)
+        existing_payload = {"result": {"resume_text_raw": resume_text, "parsing_method": "ocr"}}
+        score_mock = AsyncMock(return_value={"job_count": 1, "results": []})
+
+        with (
+            patch("main.get_task_status", new=AsyncMock(return_value=existing_payload)),
+            patch("main.score_resume_against_job_descriptions", new=score_mock),
+        ):
+            response = self.client.post(
+                "/api/score/batch",
+                json={"task_id": "original-task", "job_descriptions": [{"job_description": "Python role"}]},
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(score_mock.await_args.args[0].text, resume_text)
+        self.assertEqual(score_mock.await_args.kwargs["parsing_method"], "ocr")
+        self.assertEqual(score_mock.await_args.kwargs["scoring_mode"], "full-time")
+
+    def test_batch_score_is_rate_limited_and_leaves_the_analysis_limit_alone(self) -> None:
+        score_mock = AsyncMock(return_value={"job_count": 1, "results": []})
+        body = {"resume_text": " ".join(["Python FastAPI SQL Docker engineer"] * 15), "job_descriptions": [{"job_description": "Python role"}]}
+
+        with (
+            patch("main.enforce_daily_rate_limit", return_value=(True, 4)),
+            patch("main._get_analysis_slots", side_effect=AssertionError("batch scoring must not take analysis slots")),
+            patch("main.score_resume_against_job_descriptions", new=score_mock),
+        ):
+            allowed = self.client.post("/api/score/batch", json=body)
+        with patch("main.enforce_daily_rate_limit", return_value=(False, 0)):
+            limited = self.client.post("/api/score/batch", json=body)
+
+        self.assertEqual(allowed.status_code, 200)
+        self.assertEqual(limited.status_code, 429)
+        score_mock.assert_awaited_once()
+
+    def test_batch_score_rejects_oversized_text_before_scoring(self) -> None:
+        score_mock = AsyncMock(return_value={"job_count": 1, "results": []})
+        resume_text = " ".join(["Python FastAPI SQL Docker engineer"] * 15)
+
+        with patch("main.score_resume_against_job_descriptions", new=score_mock):
+            long_job = self.client.post(
+                "/api/score/batch",
+                json={
+                    "resume_text": resume_text,
+                    "job_descriptions": [{"job_description": "x" * (MAX_BATCH_JOB_DESCRIPTION_CHARS + 1)}],
+                },
+            )
+            long_resume = self.client.post(
+                "/api/score/batch",
+                json={
+                    "resume_text": "x" * (MAX_BATCH_RESUME_TEXT_CHARS + 1),
+                    "job_descriptions": [{"job_description": "Python role"}],
+                },
+            )
+
+        self.assertEqual(long_job.status_code, 422)
+        self.assertEqual(long_resume.status_code, 422)
+        score_mock.assert_not_awaited()
+
+    def test_batch_score_requires_a_resume_source(self) -> None:
+        response = self.client.post(
+            "/api/score/batch",
+            json={"job_descriptions": [{"job_description": "Python role"}]},
+        )
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(response.json()["error"]["message"], "Provide either task_id or resume_text.")
+
     def test_storage_unavailable_returns_503(self) -> None:
         with (
             patch("main.enforce_daily_rate_limit", return_value=(True, 5)),
@@ -424,6 +674,7 @@ class ApiEndpointTests(unittest.TestCase):
         self.assertEqual(payload["market_context"]["region_name"], "India")
         self.assertEqual(payload["redis"], "memory-local")
         self.assertEqual(payload["queue"], "direct")
+        self.assertIsInstance(payload["gemini_models"], dict)
         response.close()
 
     def test_render_health_endpoint_is_lightweight(self) -> None:
@@ -436,6 +687,27 @@ class ApiEndpointTests(unittest.TestCase):
         self.assertEqual(payload["market_context"]["region_name"], "India")
         response.close()
 
+    def test_render_health_endpoint_waits_for_model_when_readiness_is_required(self) -> None:
+        with (
+            patch("main.settings.health_requires_model_ready", True),
+            patch("main.settings.sentence_model_preload", True),
+            patch("main.sentence_model_is_ready", return_value=False),
+        ):
+            warming_response = self.client.get("/health")
+            warming_head_response = self.client.head("/health")
+        with (
+            patch("main.settings.health_requires_model_ready", True),
+            patch("main.settings.sentence_model_preload", True),
+            patch("main.sentence_model_is_ready", return_value=True),
+        ):
+            ready_response = self.client.get("/health")
+
+        self.assertEqual(warming_response.status_code, 503)
+        self.assertEqual(warming_response.json()["status"], "warming")
+        self.assertIn("sentence_model", warming_response.json())
+        self.assertEqual(warming_head_response.status_code, 503)
+        self.assertEqual(ready_response.status_code, 200)
+
     def test_root_and_health_support_head_requests(self) -> None:
         root_response = self.client.head("/")
         health_response = self.client.head("/health")
@@ -0,0 +1,36 @@
+import unittest
+
+from benchmarks.cases import build_benchmark_cases
+from benchmarks.fixtures import WORDS_PER_PAGE, build_synthetic_resume
+from benchmarks.runner import compare_to_baseline, merge_fastest
+
+
+class BenchmarkSuiteTests(unittest.TestCase):
+    def test_every_case_runs_once_and_names_are_unique(self) -> None:
+        cases = build_benchmark_cases()
+
+        for case in cases:
+            case.func()
+
+        names = [case.name for case in cases]
+        self.assertEqual(len(names), len(set(names)))
+        self.assertIn("compute_ats_evaluation[10p,long_jd]", names)
+        self.assertGreaterEqual(len(build_synthetic_resume(3).split()), 3 * WORDS_PER_PAGE)
+
+    def test_only_gated_cases_beyond_the_threshold_regress(self) -> None:
+        baseline = {"results": {"fast": {"min_us": 10.0}, "slow": {"min_us": 10.0}, "ungated": {"min_us": 10.0}}}
+        results = {
+            "fast": {"min_us": 12.0},
+            "slow": {"min_us": 14.0},
+            "ungated": {"min_us": 30.0},
+            "new": {"min_us": 5.0},
+        }
+
+        rows = compare_to_baseline(results, baseline, threshold=0.25, gated=["fast", "slow"])
+
+        self.assertEqual({row["name"]: row["regressed"] for row in rows}, {"fast": False, "slow": True, "ungated": False})
+        self.assertEqual(merge_fastest({"min_us": 14.0}, {"min_us": 11.0}), {"min_us": 11.0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import asyncio
+import unittest
+
+from concurrency_limiter import AdaptiveConcurrencyLimiter
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _limiter(clock: _Clock, **overrides) -> AdaptiveConcurrencyLimiter:
+    options = {
+        "initial_limit": 2,
+        "min_limit": 1,
+        "max_limit": 4,
+        "decrease_factor": 0.5,
+        "latency_tolerance": 2.0,
+        "clock": clock,
+    }
+    options.update(overrides)
+    return AdaptiveConcurrencyLimiter(**options)
+
+
+class AdaptiveConcurrencyLimiterTests(unittest.TestCase):
+    def test_queues_beyond_the_limit_and_grows_additively_while_saturated(self) -> None:
+        limiter = _limiter(_Clock())
+
+        async def scenario() -> list[tuple[int, int, int]]:
+            gate = asyncio.Event()
+            observed = []
+
+            async def work() -> None:
+                async with limiter:
+                    await gate.wait()
+
+            tasks = [asyncio.create_task(work()) for _ in range(3)]
+            await asyncio.sleep(0)
+            observed.append((limiter.limit, limiter.in_flight, limiter.queued))
+            gate.set()
+            await asyncio.gather(*tasks)
+            observed.append((limiter.limit, limiter.in_flight, limiter.queued))
+            return observed
+
+        before, after = asyncio.run(scenario())
+
+        self.assertEqual(before, (2, 2, 1))
+        # Two saturated successes add 1/2 + 1/2.5 to the limit.
+        self.assertEqual(after, (2, 0, 0))
+        self.assertAlmostEqual(limiter._limit, 2.9)
+        self.assertEqual(limiter.increases, 2)
+
+    def test_throttling_halves_the_limit_once_per_cooldown_and_respects_the_floor(self) -> None:
+        clock = _Clock()
+        limiter = _limiter(clock, initial_limit=4)
+
+        limiter.record_throttled()
+        limiter.record_throttled()
+        self.assertEqual(limiter.limit, 2)
+
+        clock.now += 10
+        limiter.record_throttled()
+        clock.now += 10
+        limiter.record_throttled()
+
+        self.assertEqual(limiter.limit, 1)
+        self.assertEqual(limiter.snapshot()["decreases"], {"throttled": 3, "latency": 0})
+
+    def test_latency_rising_above_its_baseline_cuts_the_limit(self) -> None:
+        limiter = _limiter(_Clock(), initial_limit=4)
+
+        for _ in range(10):
+            limiter.record_latency(1_000)
+        self.assertEqual(limiter.limit, 4)
+        for _ in range(5):
+            limiter.record_latency(6_000)
+
+        self.assertEqual(limiter.limit, 2)
+        self.assertEqual(limiter.decreases["latency"], 1)
+
+    def test_a_lower_limit_holds_back_new_work_without_cancelling_running_work(self) -> None:
+        limiter = _limiter(_Clock(), initial_limit=2)
+
+        async def scenario() -> tuple[int, int, int]:
+            await limiter.acquire()
+            await limiter.acquire()
+            limiter.record_throttled()
+            waiter = asyncio.create_task(limiter.acquire())
+            await asyncio.sleep(0)
+            limiter.release(ok=False)
+            await asyncio.sleep(0)
+            state = (limiter.limit, limiter.in_flight, limiter.queued)
+            limiter.release(ok=False)
+            await waiter
+            return state
+
+        self.assertEqual(asyncio.run(scenario()), (1, 1, 1))
+
+    def test_fixed_mode_never_changes_the_limit(self) -> None:
+        limiter = _limiter(_Clock(), adaptive=False)
+
+        limiter.record_throttled()
+        for index in range(10):
+            limiter.record_latency(10_000 if index > 5 else 100)
+
+        self.assertEqual(limiter.limit, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
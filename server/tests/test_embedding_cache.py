@@ -0,0 +1,133 @@
+import asyncio
+import importlib.util
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import embedding_service
+from embedding_cache import EmbeddingCache, embedding_cache_key
+from resume_document import ResumeDocument
+
+
+class EmbeddingCacheTests(unittest.TestCase):
+    def test_lru_evicts_oldest_entries_and_counts_hits_and_misses(self) -> None:
+        cache = EmbeddingCache(model_name="mini", max_entries=2)
+
+        cache.put("software engineer", [1.0])
+        cache.put("data analyst", [2.0])
+        self.assertEqual(cache.get("software engineer"), [1.0])
+        cache.put("product manager", [3.0])
+
+        self.assertIsNone(cache.get("data analyst"))
+        self.assertEqual(cache.get("product manager"), [3.0])
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (2, 1, 2))
+
+    def test_keys_depend_on_the_model_name(self) -> None:
+        self.assertNotEqual(embedding_cache_key("mini", "text"), embedding_cache_key("mpnet", "text"))
+
+    @unittest.skipUnless(importlib.util.find_spec("numpy"), "numpy is required for the disk store")
+    def test_disk_store_survives_a_new_cache_instance(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            EmbeddingCache(model_name="mini", max_entries=4, directory=Path(directory)).put("reference", [0.5, 0.25])
+            restored = EmbeddingCache(model_name="mini", max_entries=4, directory=Path(directory))
+
+            vector = restored.get("reference")
+
+            self.assertEqual([float(value) for value in vector], [0.5, 0.25])
+            self.assertEqual(restored.stats()["disk_hits"], 1)
+
+    def test_semantic_alignment_reuses_cached_resume_chunks_and_reference_text(self) -> None:
+        cache = EmbeddingCache(model_name="mini", max_entries=8)
+        chunk_cache = EmbeddingCache(model_name="mini", max_entries=8)
+        document = ResumeDocument.from_text("Jane Doe\nSkills\nPython, SQL")
+        embed_mock = AsyncMock(side_effect=lambda texts: [[float(len(text))] for text in texts])
+        pooled_calls = []
+
+        def fake_pool(chunks, vectors, reference_vectors):
+            pooled_calls.append((list(chunks), list(vectors), list(reference_vectors)))
+            return ["alignment"] * len(reference_vectors)
+
+        with (
+            patch("embedding_service.get_embedding_cache", return_value=cache),
+            patch("embedding_service.get_chunk_embedding_cache", return_value=chunk_cache),
+            patch("embedding_service.embed_texts", new=embed_mock),
+            patch("embedding_service.pool_chunk_similarity_matrix", side_effect=fake_pool),
+        ):
+            first = asyncio.run(embedding_service.compute_semantic_alignment(document, "Target role: QA"))
+            second = asyncio.run(embedding_service.compute_semantic_alignment(document, "Target role: QA"))
+            batch = asyncio.run(
+                embedding_service.compute_semantic_alignments(document, ["Target role: QA", "Target role: SRE"])
+            )
+
+        self.assertEqual((first, second), ("alignment", "alignment"))
+        self.assertEqual(batch, ["alignment", "alignment"])
+        self.assertEqual(
+            [call.args[0] for call in embed_mock.await_args_list],
+            [["Jane Doe", "Skills\nPython, SQL", "Target role: QA"], ["Target role: SRE"]],
+        )
+        self.assertEqual(pooled_calls[1], (pooled_calls[0][0], [[8.0], [18.0]], [[15.0]]))
+        self.assertEqual(pooled_calls[2][2], [[15.0], [16.0]])
+
+    def test_resume_chunks_do_not_evict_reference_embeddings(self) -> None:
+        cache = EmbeddingCache(model_name="mini", max_entries=2)
+        chunk_cache = EmbeddingCache(model_name="mini", max_entries=2)
+        cache.put("Target role: QA", [1.0])
+        embed_mock = AsyncMock(side_effect=lambda texts: [[float(len(text))] for text in texts])
+        resume = "\n".join(["Jane Doe", "Experience", "- Built APIs", "Skills", "Python", "Projects", "- Search"])
+
+        with (
+            patch("embedding_service.get_embedding_cache", return_value=cache),
+            patch("embedding_service.get_chunk_embedding_cache", return_value=chunk_cache),
+            patch("embedding_service.embed_texts", new=embed_mock),
+            patch("embedding_service.pool_chunk_similarity_matrix", return_value=["alignment"]),
+        ):
+            asyncio.run(embedding_service.compute_semantic_alignment(ResumeDocument.from_text(resume), "Target role: QA"))
+
+        self.assertEqual(cache.get_in_memory("Target role: QA"), [1.0])
+        self.assertNotIn("Target role: QA", embed_mock.await_args.args[0])
+        self.assertLessEqual(chunk_cache.stats()["entries"], 2)
+
+    @unittest.skipUnless(importlib.util.find_spec("numpy"), "numpy is required for the disk store")
+    def test_disk_store_evicts_the_oldest_files_beyond_its_limit(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            cache = EmbeddingCache(model_name="mini", max_entries=4, directory=Path(directory), max_disk_entries=2)
+            cache.put("first", [1.0])
+            cache.put("second", [2.0])
+            cache.load_from_disk("first")
+            cache.put("third", [3.0])
+
+            stored = {path.stem for path in Path(directory).glob("*.npy")}
+            self.assertEqual(stored, {embedding_cache_key("mini", "first"), embedding_cache_key("mini", "third")})
+            self.assertEqual(cache.stats()["disk_evictions"], 1)
+
+            restored = EmbeddingCache(model_name="mini", max_entries=4, directory=Path(directory), max_disk_entries=2)
+            self.assertIsNone(restored.get("second"))
+            self.assertEqual(restored.stats()["disk_entries"], 2)
+
+    def test_async_lookups_touch_the_disk_store_off_the_event_loop(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            cache = EmbeddingCache(model_name="mini", max_entries=4, directory=Path(directory))
+            disk_threads = []
+
+            def record(name):
+                def wrapper(text, *args):
+                    disk_threads.append((name, threading.current_thread() is threading.main_thread()))
+                    return None
+
+                return wrapper
+
+            with (
+                patch.object(cache, "load_from_disk", side_effect=record("load")),
+                patch.object(cache, "persist", side_effect=record("persist")),
+                patch("embedding_service.embed_texts", new=AsyncMock(return_value=[[1.0]])),
+            ):
+                vectors = asyncio.run(embedding_service.embed_texts_cached(["reference"], [cache]))
+
+        self.assertEqual(vectors, [[1.0]])
+        self.assertEqual(disk_threads, [("load", False), ("persist", False)])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import asyncio
+import importlib.util
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import embedding_service
+from embedding_service import EmbeddingBroker
+from resume_document import ResumeDocument
+
+
+class EmbeddingBrokerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.encoded_batches: list[list[str]] = []
+
+    def tearDown(self) -> None:
+        self.executor.shutdown(wait=True)
+
+    def _encode(self, texts: list[str]) -> list[list[float]]:
+        self.encoded_batches.append(texts)
+        return [[float(len(text))] for text in texts]
+
+    def test_concurrent_requests_share_one_batched_encode(self) -> None:
+        async def scenario() -> list[list[list[float]]]:
+            broker = EmbeddingBroker(self._encode, max_batch_texts=32, max_wait_seconds=0.02, executor=self.executor)
+            return await asyncio.gather(
+                broker.embed(["a", "bb"]),
+                broker.embed(["ccc"]),
+                broker.embed(["dddd", "eeeee"]),
+            )
+
+        results = asyncio.run(scenario())
+
+        self.assertEqual(self.encoded_batches, [["a", "bb", "ccc", "dddd", "eeeee"]])
+        self.assertEqual(results, [[[1.0], [2.0]], [[3.0]], [[4.0], [5.0]]])
+
+    def test_batch_flushes_early_once_the_text_limit_is_reached(self) -> None:
+        async def scenario() -> None:
+            broker = EmbeddingBroker(self._encode, max_batch_texts=2, max_wait_seconds=10, executor=self.executor)
+            await asyncio.wait_for(asyncio.gather(broker.embed(["a"]), broker.embed(["b"])), timeout=1)
+
+        with patch.object(embedding_service, "_batch_size_histogram", embedding_service.Counter()):
+            asyncio.run(scenario())
+            histogram = embedding_service.get_embedding_stats()["batch_size_histogram"]
+
+        self.assertEqual(self.encoded_batches, [["a", "b"]])
+        self.assertEqual(histogram["<=2"], 1)
+
+    def test_encode_failures_propagate_to_every_waiter(self) -> None:
+        def failing_encode(_: list[str]) -> list[list[float]]:
+            raise RuntimeError("encoder unavailable")
+
+        async def scenario() -> list[object]:
+            broker = EmbeddingBroker(failing_encode, max_batch_texts=8, max_wait_seconds=0.01, executor=self.executor)
+            return await asyncio.gather(broker.embed(["a"]), broker.embed(["b"]), return_exceptions=True)
+
+        results = asyncio.run(scenario())
+
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+
+    def test_semantic_alignment_is_none_without_a_model(self) -> None:
+        document = ResumeDocument.from_text("Jane Doe\nSkills\nPython")
+        with (
+            patch("embedding_service.sentence_model_is_loaded", return_value=True),
+            patch("embedding_service.get_sentence_model", return_value=False),
+        ):
+            alignment = asyncio.run(embedding_service.compute_semantic_alignment(document, "reference"))
+
+        self.assertIsNone(alignment)
+
+
+class ChunkPoolingTests(unittest.TestCase):
+    @unittest.skipUnless(importlib.util.find_spec("numpy"), "numpy is required for pooling")
+    def test_pooling_blends_max_and_weighted_mean_and_names_the_best_section(self) -> None:
+        chunks = [("header", "ab"), ("experience", "abcdef"), ("skills", "ab")]
+        vectors = [[0.0, 1.0], [1.0, 0.0], [1.0, 1.0]]
+
+        alignment = embedding_service.pool_chunk_similarities(chunks, vectors, [1.0, 0.0])
+
+        weighted_mean = (0.0 * 2 + 1.0 * 6 + (2 ** -0.5) * 2) / 10
+        self.assertAlmostEqual(alignment.similarity, 0.6 * 1.0 + 0.4 * weighted_mean, places=5)
+        self.assertEqual(alignment.best_section, "experience")
+        self.assertEqual(alignment.section_similarities["header"], 0.0)
+
+    @unittest.skipUnless(importlib.util.find_spec("numpy"), "numpy is required for pooling")
+    def test_matrix_pooling_matches_per_reference_pooling(self) -> None:
+        chunks = [("header", "ab"), ("experience", "abcdef"), ("skills", "ab")]
+        vectors = [[0.0, 1.0], [1.0, 0.0], [1.0, 1.0]]
+        references = [[1.0, 0.0], [0.0, 2.0]]
+
+        batched = embedding_service.pool_chunk_similarity_matrix(chunks, vectors, references)
+        single = [embedding_service.pool_chunk_similarities(chunks, vectors, reference) for reference in references]
+
+        self.assertEqual([item.best_section for item in batched], ["experience", "header"])
+        for batched_alignment, single_alignment in zip(batched, single):
+            self.assertAlmostEqual(batched_alignment.similarity, single_alignment.similarity, places=5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,21 +1,87 @@
+import asyncio
+import json
 import unittest
-from unittest.mock import patch
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
 
 import gemini_client
+from concurrency_limiter import get_analysis_limiter
+import model_breaker
+import model_routing
+
+
+def _raise_missing_model(*args, **kwargs):  # noqa: ARG001
+    raise RuntimeError(
+        "404 NOT_FOUND. {'error': {'code': 404, 'message': "
+        "'models/gemini-1.5-flash is not found for API version v1beta, "
+        "or is not supported for generateContent.', 'status': 'NOT_FOUND'}}"
+    )
+
+
+async def _raise_missing_model_async(*args, **kwargs):
+    _raise_missing_model(*args, **kwargs)
 
 
 class _MissingModelClient:
-    class models:  # noqa: N801
-        @staticmethod
-        def generate_content(*args, **kwargs):  # noqa: ARG004
-            raise RuntimeError(
-                "404 NOT_FOUND. {'error': {'code': 404, 'message': "
-                "'models/gemini-1.5-flash is not found for API version v1beta, "
-                "or is not supported for generateContent.', 'status': 'NOT_FOUND'}}"
-            )
+    models = SimpleNamespace(generate_content=_raise_missing_model)
+    aio = SimpleNamespace(models=SimpleNamespace(generate_content=_raise_missing_model_async))
+
+
+def _analysis_section(name: str) -> dict:
+    return {
+        "name": name,
+        "summary": "Backend engineer.",
+        "atsScore": {"score": 80, "feedback": "Good fit."},
+        "extractedSkills": [{"name": "Python"}],
+        "experienceSummary": ["Built APIs."],
+        "educationSummary": ["B.Tech"],
+        "generalResumeImprovements": ["Quantify impact."],
+        "generalUpskillingSuggestions": ["Learn Kubernetes."],
+    }
+
+
+def _analysis_json(name: str = "Test Candidate") -> str:
+    return json.dumps({"full_time_analysis": _analysis_section(name), "internship_analysis": _analysis_section(name)})
+
+
+class _RateLimitedError(Exception):
+    def __init__(self, *, headers: dict | None = None, details: dict | None = None) -> None:
+        super().__init__("429 RESOURCE_EXHAUSTED. Quota exceeded, try again later.")
+        self.response = SimpleNamespace(headers=headers or {})
+        self.details = details
+
+
+class _ScriptedAsyncClient:
+    """Async-only client that replays a list of exceptions/responses per call."""
+
+    def __init__(self, *outcomes) -> None:
+        self.outcomes = list(outcomes)
+        self.calls: list[str] = []
+        self.configs: list = []
+        self.aio = SimpleNamespace(models=SimpleNamespace(generate_content=self._generate_content))
+
+    async def _generate_content(self, *, model, contents, config):  # noqa: ARG002
+        self.calls.append(model)
+        self.configs.append(config)
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        if callable(outcome):
+            return await outcome()
+        return SimpleNamespace(text=outcome)
 
 
 class GeminiClientTests(unittest.TestCase):
+    def setUp(self) -> None:
+        model_breaker.reset_model_breakers()
+        model_routing.reset_model_latency_stats()
+        gemini_client.reset_parse_stats()
+
+    def tearDown(self) -> None:
+        model_breaker.reset_model_breakers()
+        model_routing.reset_model_latency_stats()
+        gemini_client.reset_parse_stats()
+
     def test_candidate_models_normalize_legacy_aliases(self) -> None:
         with (
             patch.object(gemini_client.settings, 'gemini_model', 'gemini-2.0-flash'),
@@ -39,6 +105,214 @@ class GeminiClientTests(unittest.TestCase):
             with self.assertRaisesRegex(RuntimeError, 'Current Gemini model configuration is invalid or deprecated'):
                 gemini_client._generate_json('return json')
 
+    def test_dual_analysis_raises_clear_error_when_models_are_invalid(self) -> None:
+        with (
+            patch.object(gemini_client, 'client', _MissingModelClient()),
+            patch.object(gemini_client.settings, 'gemini_model', 'gemini-2.0-flash'),
+            patch.object(gemini_client.settings, 'gemini_fallback_models', ['gemini-1.5-flash']),
+        ):
+            with self.assertRaisesRegex(RuntimeError, 'Current Gemini model configuration is invalid or deprecated'):
+                asyncio.run(gemini_client.get_dual_analysis('return json'))
+
+    def test_dual_analysis_honours_retry_after_with_async_sleep(self) -> None:
+        stub = _ScriptedAsyncClient(_RateLimitedError(headers={'retry-after': '7'}), _analysis_json())
+        sleep_mock = AsyncMock()
+        with (
+            patch.object(gemini_client, 'client', stub),
+            patch.object(gemini_client.settings, 'gemini_fallback_models', []),
+            patch.object(gemini_client.settings, 'gemini_max_retries', 3),
+            patch('gemini_client.asyncio.sleep', new=sleep_mock),
+        ):
+            result, call = asyncio.run(gemini_client.get_dual_analysis('return json', deadline_seconds=30))
+
+        self.assertEqual(result.full_time_analysis.name, 'Test Candidate')
+        self.assertEqual(call['attempts'], 2)
+        sleep_mock.assert_awaited_once_with(7.0)
+        self.assertEqual(len(stub.calls), 2)
+
+    def test_rate_limited_calls_cut_the_analysis_concurrency_limit(self) -> None:
+        stub = _ScriptedAsyncClient(_RateLimitedError(headers={'retry-after': '1'}), _analysis_json())
+
+        async def scenario() -> tuple[int, int]:
+            limiter = get_analysis_limiter()
+            starting_limit = limiter.limit
+            await gemini_client.get_dual_analysis('return json', deadline_seconds=30)
+            return starting_limit, limiter.limit
+
+        with (
+            patch.object(gemini_client, 'client', stub),
+            patch.object(gemini_client.settings, 'gemini_fallback_models', []),
+            patch.object(gemini_client.settings, 'max_concurrent_analyses', 4),
+            patch('gemini_client.asyncio.sleep', new=AsyncMock()),
+        ):
+            self.assertEqual(asyncio.run(scenario()), (4, 2))
+
+    def test_retry_delay_reads_retry_info_and_jitters_the_default_backoff(self) -> None:
+        retry_info = _RateLimitedError(
+            details={'error': {'details': [{'@type': 'type.googleapis.com/google.rpc.RetryInfo', 'retryDelay': '12s'}]}}
+        )
+        self.assertEqual(gemini_client._retry_delay_seconds(retry_info, 0), 12.0)
+
+        with (
+            patch.object(gemini_client.settings, 'gemini_retry_backoff_seconds', 2.0),
+            patch.object(gemini_client.settings, 'gemini_retry_max_backoff_seconds', 5.0),
+        ):
+            delays = [gemini_client._retry_delay_seconds(_RateLimitedError(), attempt) for attempt in (0, 4)]
+        self.assertTrue(1.0 <= delays[0] <= 2.0)
+        self.assertTrue(2.5 <= delays[1] <= 5.0)
+
+    def test_retry_that_would_overrun_the_deadline_moves_to_the_fallback_model(self) -> None:
+        stub = _ScriptedAsyncClient(_RateLimitedError(headers={'retry-after': '60'}), _analysis_json('fallback'))
+        with (
+            patch.object(gemini_client, 'client', stub),
+            patch.object(gemini_client.settings, 'gemini_model', 'gemini-2.5-flash'),
+            patch.object(gemini_client.settings, 'gemini_fallback_models', ['gemini-2.5-flash-lite']),
+        ):
+            result, call = asyncio.run(gemini_client.get_dual_analysis('return json', deadline_seconds=5))
+
+        self.assertEqual(result.full_time_analysis.name, 'fallback')
+        self.assertEqual(call['model'], 'gemini-2.5-flash-lite')
+        self.assertEqual(stub.calls, ['gemini-2.5-flash', 'gemini-2.5-flash-lite'])
+
+    def test_open_circuit_skips_the_primary_model_without_a_request(self) -> None:
+        stub = _ScriptedAsyncClient(_analysis_json('fallback'))
+        with (
+            patch.object(gemini_client, 'client', stub),
+            patch.object(gemini_client.settings, 'gemini_model', 'gemini-2.5-flash'),
+            patch.object(gemini_client.settings, 'gemini_fallback_models', ['gemini-2.5-flash-lite']),
+            patch.object(gemini_client.settings, 'gemini_breaker_min_requests', 2),
+        ):
+            primary = model_breaker.get_model_breaker('gemini-2.5-flash')
+            primary.record_failure()
+            primary.record_failure()
+            result, call = asyncio.run(gemini_client.get_dual_analysis('return json', deadline_seconds=5))
+
+        self.assertEqual(result.full_time_analysis.name, 'fallback')
+        self.assertEqual(call['skipped_models'], ['gemini-2.5-flash'])
+        self.assertEqual(stub.calls, ['gemini-2.5-flash-lite'])
+        self.assertEqual(model_breaker.get_model_breaker_stats()['gemini-2.5-flash']['state'], 'open')
+
+    def test_latency_policy_routes_short_prompts_to_the_faster_model(self) -> None:
+        stub = _ScriptedAsyncClient(_analysis_json())
+        with (
+            patch.object(gemini_client, 'client', stub),
+            patch.object(gemini_client.settings, 'gemini_model', 'gemini-2.5-flash'),
+            patch.object(gemini_client.settings, 'gemini_fallback_models', ['gemini-2.5-flash-lite']),
+            patch.object(gemini_client.settings, 'gemini_routing_policy', 'latency'),
+        ):
+            for _ in range(5):
+                model_routing.record_model_call('gemini-2.5-flash', latency_ms=9000, ok=True, prompt_chars=500)
+                model_routing.record_model_call('gemini-2.5-flash-lite', latency_ms=2500, ok=True, prompt_chars=500)
+            _, call = asyncio.run(gemini_client.get_dual_analysis('return json', deadline_seconds=5))
+
+        self.assertEqual(stub.calls, ['gemini-2.5-flash-lite'])
+        self.assertEqual(call['routing']['policy'], 'latency')
+        self.assertEqual(call['routing']['model_order'], ['gemini-2.5-flash-lite', 'gemini-2.5-flash'])
+        self.assertEqual(call['routing']['estimates']['gemini-2.5-flash-lite']['p50_ms'], 2500)
+
+    def test_hedge_fires_after_the_latency_percentile_and_cancels_the_loser(self) -> None:
+        cancelled = []
+
+        async def slow_primary():
+            try:
+                await asyncio.sleep(30)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        stub = _ScriptedAsyncClient(slow_primary, _analysis_json('hedge'))
+        with (
+            patch.object(gemini_client, 'client', stub),
+            patch.object(gemini_client.settings, 'gemini_model', 'gemini-2.5-flash'),
+            patch.object(gemini_client.settings, 'gemini_fallback_models', ['gemini-2.5-flash-lite']),
+            patch.object(gemini_client.settings, 'gemini_hedge_enabled', True),
+            patch.object(gemini_client.settings, 'gemini_hedge_target', 'fallback'),
+        ):
+            for _ in range(5):
+                model_routing.record_model_call('gemini-2.5-flash', latency_ms=20, ok=True, prompt_chars=11)
+
+            async def scenario():
+                outcome = await gemini_client.get_dual_analysis('return json', deadline_seconds=5)
+                await asyncio.sleep(0)
+                return outcome
+
+            result, call = asyncio.run(scenario())
+
+        self.assertEqual(result.full_time_analysis.name, 'hedge')
+        self.assertEqual((call['model'], call['hedged']), ('gemini-2.5-flash-lite', True))
+        self.assertEqual(stub.calls, ['gemini-2.5-flash', 'gemini-2.5-flash-lite'])
+        self.assertEqual(cancelled, [True])
+        stats = model_routing.get_hedge_stats()
+        self.assertEqual((stats['fired'], stats['hedge_won']), (1, 1))
+        self.assertEqual(model_breaker.get_model_breaker_stats()['gemini-2.5-flash']['requests_in_window'], 0)
+
+    def test_schema_response_with_small_shape_defects_is_repaired_without_a_retry(self) -> None:
+        section = _analysis_section("Repaired Candidate")
+        section["extractedSkills"] = "Python, FastAPI"
+        section["experienceSummary"] = "Built APIs."
+        section["atsScore"] = 72
+        del section["educationSummary"]
+        text = "```json\n" + json.dumps({"full_time_analysis": section, "internship_analysis": _analysis_section("x")}) + "\n```"
+        stub = _ScriptedAsyncClient(text)
+        with patch.object(gemini_client, 'client', stub):
+            result, call = asyncio.run(gemini_client.get_dual_analysis('return json', deadline_seconds=5))
+
+        self.assertIs(stub.configs[0].response_schema, gemini_client.DualAnalysisResponse)
+        self.assertEqual(len(stub.calls), 1)
+        repaired = result.full_time_analysis
+        self.assertEqual([skill.name.strip() for skill in repaired.extractedSkills], ['Python', 'FastAPI'])
+        self.assertEqual((repaired.experienceSummary, repaired.educationSummary, repaired.atsScore.score), (['Built APIs.'], [], 72))
+        self.assertIn('full_time_analysis.educationSummary: missing', call['repairs'])
+        stats = gemini_client.get_parse_stats()
+        self.assertEqual((stats['responses'], stats['repaired'], stats['failed']), (1, 1, 0))
+
+    def test_response_missing_a_section_counts_as_a_parse_failure_and_moves_on(self) -> None:
+        stub = _ScriptedAsyncClient('{"full_time_analysis": {}}', _analysis_json('fallback'))
+        with (
+            patch.object(gemini_client, 'client', stub),
+            patch.object(gemini_client.settings, 'gemini_model', 'gemini-2.5-flash'),
+            patch.object(gemini_client.settings, 'gemini_fallback_models', ['gemini-2.5-flash-lite']),
+        ):
+            result, call = asyncio.run(gemini_client.get_dual_analysis('return json', deadline_seconds=5))
+
+        self.assertEqual((result.full_time_analysis.name, call['model']), ('fallback', 'gemini-2.5-flash-lite'))
+        stats = gemini_client.get_parse_stats()
+        self.assertEqual((stats['responses'], stats['clean'], stats['failed'], stats['failure_rate']), (2, 1, 1, 0.5))
+
+    def test_deadline_cancels_the_in_flight_request(self) -> None:
+        cancelled = []
+
+        async def hang():
+            try:
+                await asyncio.sleep(30)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        stub = _ScriptedAsyncClient(hang)
+        with patch.object(gemini_client, 'client', stub):
+            with self.assertRaisesRegex(RuntimeError, 'exceeded the 0.05s deadline'):
+                asyncio.run(gemini_client.get_dual_analysis('return json', deadline_seconds=0.05))
+
+        self.assertEqual(cancelled, [True])
+        self.assertEqual(model_breaker.get_model_breaker_stats()['gemini-2.5-flash']['requests_in_window'], 1)
+
+    def test_cancellation_before_the_deadline_is_not_recorded_against_the_model(self) -> None:
+        async def hang():
+            await asyncio.sleep(30)
+
+        async def cancel_early():
+            task = asyncio.create_task(gemini_client.get_dual_analysis('return json', deadline_seconds=30))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        with patch.object(gemini_client, 'client', _ScriptedAsyncClient(hang)):
+            asyncio.run(cancel_early())
+
+        self.assertEqual(model_breaker.get_model_breaker_stats()['gemini-2.5-flash']['requests_in_window'], 0)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,57 @@
+import re
+import unittest
+
+from keyword_matcher import compile_keyword_matcher, match_keywords
+
+
+def _reference_partition(text: str, keywords: list[str]) -> tuple[list[str], list[str]]:
+    matched = [
+        keyword
+        for keyword in keywords
+        if re.search(rf"(?<!\w){re.escape(keyword)}(?!\w)", text, re.IGNORECASE)
+    ]
+    return matched, [keyword for keyword in keywords if keyword not in matched]
+
+
+class KeywordMatcherTests(unittest.TestCase):
+    def test_single_scan_matches_per_keyword_word_boundary_search(self) -> None:
+        text = (
+            "Machine Learning Engineer shipping ML models with Python3, C++ and .NET; "
+            "built data-pipelines on AWS. Learning engineer mindset, node.js, ci/cd."
+        )
+        keywords = [
+            "machine learning engineer",
+            "machine learning",
+            "machine",
+            "learning engineer",
+            "ml",
+            "python",
+            "c++",
+            ".net",
+            "data",
+            "pipelines",
+            "aws",
+            "node.js",
+            "ci/cd",
+            "kubernetes",
+            "engineer",
+        ]
+
+        self.assertEqual(match_keywords(text, keywords), _reference_partition(text, keywords))
+
+    def test_prefix_keyword_requires_its_own_boundary(self) -> None:
+        matched, missing = match_keywords("Experienced with javascript and SQL", ["javascript", "java", "sql"])
+
+        self.assertEqual(matched, ["javascript", "sql"])
+        self.assertEqual(missing, ["java"])
+
+    def test_repeated_keyword_sets_reuse_the_compiled_matcher(self) -> None:
+        first = compile_keyword_matcher(("python", "fastapi"))
+        second = compile_keyword_matcher(("python", "fastapi"))
+
+        self.assertIs(first, second)
+        self.assertEqual(match_keywords("anything", []), ([], []))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+from unittest.mock import patch
+
+from model_breaker import ModelCircuitBreaker
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _breaker(clock: _Clock) -> ModelCircuitBreaker:
+    return ModelCircuitBreaker(
+        "gemini-2.5-flash",
+        window_seconds=60,
+        min_requests=4,
+        failure_rate_threshold=0.5,
+        open_seconds=30,
+        probe_timeout_seconds=90,
+        clock=clock,
+    )
+
+
+class ModelCircuitBreakerTests(unittest.TestCase):
+    def test_opens_on_error_rate_and_closes_after_a_successful_probe(self) -> None:
+        clock = _Clock()
+        breaker = _breaker(clock)
+
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "closed")
+        breaker.record_failure()
+
+        self.assertEqual(breaker.state, "open")
+        self.assertFalse(breaker.allow_request())
+
+        clock.now += 31
+        self.assertEqual(breaker.state, "half_open")
+        self.assertTrue(breaker.allow_request())
+        self.assertFalse(breaker.allow_request())
+
+        breaker.record_success()
+        self.assertEqual(breaker.state, "closed")
+        self.assertTrue(breaker.allow_request())
+        self.assertEqual(breaker.snapshot()["times_opened"], 1)
+
+    def test_failed_probe_reopens_and_old_failures_leave_the_window(self) -> None:
+        clock = _Clock()
+        breaker = _breaker(clock)
+        for _ in range(3):
+            breaker.record_failure()
+        clock.now += 61
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "closed")
+
+        for _ in range(3):
+            breaker.record_failure()
+        clock.now += 31
+        self.assertTrue(breaker.allow_request())
+        breaker.record_failure()
+
+        self.assertEqual(breaker.state, "open")
+        self.assertEqual(breaker.snapshot()["times_opened"], 2)
+
+    def test_shared_open_state_is_adopted_and_only_one_worker_probes(self) -> None:
+        clock = _Clock()
+        breaker = _breaker(clock)
+        shared = {"state": "open", "opened_at": clock.now, "open_until": clock.now + 30}
+
+        with (
+            patch("model_breaker.using_local_memory_store", return_value=False),
+            patch("model_breaker.get_model_breaker_state", return_value=shared),
+            patch("model_breaker.claim_model_breaker_probe", return_value=False) as claim_probe,
+        ):
+            self.assertFalse(breaker.allow_request())
+            clock.now += 31
+            self.assertFalse(breaker.allow_request())
+
+        claim_probe.assert_called_once()
+        self.assertEqual(breaker.state, "half_open")
+
+        with (
+            patch("model_breaker.using_local_memory_store", return_value=False),
+            patch("model_breaker.get_model_breaker_state", return_value=None),
+        ):
+            self.assertTrue(breaker.allow_request())
+        self.assertEqual(breaker.state, "closed")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+from unittest.mock import patch
+
+import model_routing
+from model_routing import record_model_call, route_models
+
+MODELS = ["gemini-2.5-flash", "gemini-2.5-flash-lite"]
+
+
+class ModelRoutingTests(unittest.TestCase):
+    def setUp(self) -> None:
+        model_routing.reset_model_latency_stats()
+
+    def tearDown(self) -> None:
+        model_routing.reset_model_latency_stats()
+
+    def _record(self, model: str, latency_ms: float, *, prompt_chars: int, ok: bool = True, count: int = 5) -> None:
+        for _ in range(count):
+            record_model_call(model, latency_ms=latency_ms, ok=ok, prompt_chars=prompt_chars)
+
+    def test_static_policy_keeps_the_configured_order(self) -> None:
+        self._record("gemini-2.5-flash", 20000, prompt_chars=500)
+        self._record("gemini-2.5-flash-lite", 1000, prompt_chars=500)
+
+        decision = route_models(MODELS, prompt_chars=500, policy="static")
+
+        self.assertEqual(decision.models, MODELS)
+        self.assertEqual(decision.as_metadata()["policy"], "static")
+
+    def test_long_prompts_keep_quality_order_until_the_primary_misses_the_slo(self) -> None:
+        self._record("gemini-2.5-flash", 12000, prompt_chars=20000)
+        self._record("gemini-2.5-flash-lite", 4000, prompt_chars=20000)
+
+        within_slo = route_models(MODELS, prompt_chars=20000, policy="latency", slo_ms=15000)
+        over_slo = route_models(MODELS, prompt_chars=20000, policy="latency", slo_ms=10000)
+
+        self.assertEqual(within_slo.models, MODELS)
+        self.assertEqual(within_slo.prompt_bucket, "long")
+        self.assertEqual(over_slo.models, ["gemini-2.5-flash-lite", "gemini-2.5-flash"])
+
+    def test_failing_models_are_demoted_and_unmeasured_models_are_explored(self) -> None:
+        self._record("gemini-2.5-flash", 1000, prompt_chars=500, ok=False)
+        self._record("gemini-2.5-flash-lite", 3000, prompt_chars=500)
+
+        decision = route_models(MODELS, prompt_chars=500, policy="latency", slo_ms=30000)
+        self.assertEqual(decision.models, ["gemini-2.5-flash-lite", "gemini-2.5-flash"])
+
+        with patch("model_routing.random.random", return_value=0.0):
+            explored = route_models([*MODELS, "gemini-3-flash"], prompt_chars=500, policy="latency", slo_ms=30000)
+        self.assertEqual(explored.models[0], "gemini-3-flash")
+        self.assertIn("exploring", explored.reason)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,193 @@
+import threading
+import time
+import unittest
+from concurrent.futures import Future, ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import fitz
+
+import ocr_pool
+
+
+def _pdf(page_count: int, label: str = "page") -> bytes:
+    document = fitz.open()
+    for page_index in range(page_count):
+        document.new_page().insert_text((72, 72), f"{label} {page_index + 1} text")
+    data = document.tobytes()
+    document.close()
+    return data
+
+
+def _page_text(page_pdf: bytes) -> tuple[int, str]:
+    with fitz.open(stream=page_pdf, filetype="pdf") as document:
+        return document.page_count, document[0].get_text().strip()
+
+
+def _fake_ocr_page(page_pdf: bytes, _: float) -> str:
+    page_count, text = _page_text(page_pdf)
+    assert page_count == 1
+    time.sleep(0.05 * (3 - int(text.split()[1])))
+    return text
+
+
+def _slow_ocr_page(page_pdf: bytes, _: float) -> str:
+    _, text = _page_text(page_pdf)
+    if text == "page 2 text":
+        time.sleep(1.5)
+    return text
+
+
+def _stuck_or_steady_ocr_page(page_pdf: bytes, _: float) -> str:
+    _, text = _page_text(page_pdf)
+    time.sleep(2.0 if text.startswith("stuck") else 0.3)
+    return text
+
+
+class OcrPoolTests(unittest.TestCase):
+    def setUp(self) -> None:
+        ocr_pool.shutdown_ocr_pool()
+        self.executors: list[ThreadPoolExecutor] = []
+
+    def tearDown(self) -> None:
+        ocr_pool.shutdown_ocr_pool()
+        for executor in self.executors:
+            executor.shutdown(wait=True)
+
+    def _thread_pool(self, workers: int):
+        def new_executor() -> ThreadPoolExecutor:
+            executor = ThreadPoolExecutor(max_workers=workers)
+            self.executors.append(executor)
+            return executor
+
+        return (
+            patch("ocr_pool._new_executor", side_effect=new_executor),
+            patch("ocr_pool._pool_size", return_value=workers),
+        )
+
+    def test_ocr_pages_reassembles_results_in_page_order(self) -> None:
+        new_executor, pool_size = self._thread_pool(3)
+        with new_executor, pool_size, patch("ocr_pool.ocr_page", side_effect=_fake_ocr_page):
+            texts = ocr_pool.ocr_pages(_pdf(4), [0, 1, 2])
+            stats = ocr_pool.get_ocr_pool_stats()
+
+        self.assertEqual(list(texts), [0, 1, 2])
+        self.assertEqual(texts[2], "page 3 text")
+        self.assertEqual(stats["in_flight_pages"], 0)
+        self.assertTrue(stats["started"])
+        self.assertFalse(self.executors[0]._shutdown)
+
+    def test_ocr_pages_blank_out_pages_past_their_deadline_and_retire_the_pool(self) -> None:
+        new_executor, pool_size = self._thread_pool(3)
+        with (
+            new_executor,
+            pool_size,
+            patch("ocr_pool.ocr_page", side_effect=_slow_ocr_page),
+            patch.object(ocr_pool.get_settings(), "ocr_page_timeout_seconds", 0.1),
+        ):
+            texts = ocr_pool.ocr_pages(_pdf(3), [0, 1, 2])
+            stuck_pool_started = ocr_pool.get_ocr_pool_stats()["started"]
+
+        self.assertEqual(texts, {0: "page 1 text", 1: "", 2: "page 3 text"})
+        # The timed-out page was already running, so cancelling it could not free its worker.
+        self.assertFalse(stuck_pool_started)
+        self.assertTrue(self.executors[0]._shutdown)
+
+    def test_a_stuck_page_does_not_blank_another_requests_pages(self) -> None:
+        new_executor, pool_size = self._thread_pool(2)
+        results: dict[str, dict[int, str]] = {}
+
+        def run(name: str, file_bytes: bytes, delay: float) -> None:
+            time.sleep(delay)
+            results[name] = ocr_pool.ocr_pages(file_bytes, [0, 1, 2] if name == "steady" else [0])
+
+        with (
+            new_executor,
+            pool_size,
+            patch("ocr_pool.ocr_page", side_effect=_stuck_or_steady_ocr_page),
+            patch.object(ocr_pool.get_settings(), "ocr_page_timeout_seconds", 0.5),
+        ):
+            # The stuck request's pool is retired at ~1.5s, while the steady request's pages still queue on it.
+            threads = [
+                threading.Thread(target=run, args=("stuck", _pdf(1, "stuck"), 0.0)),
+                threading.Thread(target=run, args=("steady", _pdf(3), 1.2)),
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(results["stuck"], {0: ""})
+        self.assertEqual(results["steady"], {0: "page 1 text", 1: "page 2 text", 2: "page 3 text"})
+        self.assertEqual(len(self.executors), 1)
+        self.assertTrue(self.executors[0]._shutdown)
+
+    def test_split_pages_sends_each_worker_a_single_page_document(self) -> None:
+        pages = ocr_pool.split_pages(_pdf(5), [1, 3])
+
+        self.assertEqual(list(pages), [1, 3])
+        self.assertEqual(_page_text(pages[3]), (1, "page 4 text"))
+
+    def test_ocr_pages_splits_the_upload_inside_the_pool(self) -> None:
+        split_threads: list[threading.Thread] = []
+
+        def failing_split(_: bytes, __: list[int]) -> dict[int, bytes]:
+            split_threads.append(threading.current_thread())
+            raise RuntimeError("FileDataError: cannot open broken document")
+
+        new_executor, pool_size = self._thread_pool(1)
+        with new_executor, pool_size, patch("ocr_pool.split_pages", side_effect=failing_split):
+            texts = ocr_pool.ocr_pages(b"not a pdf", [0, 1])
+
+        self.assertEqual(texts, {0: "", 1: ""})
+        self.assertEqual(len(split_threads), 1)
+        self.assertIsNot(split_threads[0], threading.current_thread())
+
+    def test_retired_pool_kills_its_workers_once_only_stuck_jobs_remain(self) -> None:
+        stuck_worker, idle_worker = MagicMock(), MagicMock()
+        stuck_worker.is_alive.return_value = True
+        idle_worker.is_alive.return_value = False
+        executor = MagicMock()
+        executor._processes = {1: stuck_worker, 2: idle_worker}
+        stuck, other = Future(), Future()
+        executor.submit.side_effect = [stuck, other]
+        pool = ocr_pool._PoolGeneration(executor)
+        pool.submit(_fake_ocr_page, b"", 1.0)
+        pool.submit(_fake_ocr_page, b"", 1.0)
+
+        pool.retire([stuck])
+        executor.shutdown.assert_not_called()
+        other.set_result("page text")
+
+        executor.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+        stuck_worker.kill.assert_called_once_with()
+        idle_worker.kill.assert_not_called()
+
+
+class OcrRenderTests(unittest.TestCase):
+    def test_render_dpi_adapts_to_page_size(self) -> None:
+        letter_dpi = ocr_pool.ocr_render_dpi(fitz.paper_rect("letter"))
+        a3_dpi = ocr_pool.ocr_render_dpi(fitz.paper_rect("a3"))
+        a6_dpi = ocr_pool.ocr_render_dpi(fitz.paper_rect("a6"))
+
+        self.assertGreaterEqual(letter_dpi, 150)
+        self.assertLess(a3_dpi, letter_dpi)
+        self.assertEqual(a6_dpi, ocr_pool.OCR_MAX_DPI)
+
+    def test_render_page_for_ocr_builds_grayscale_image_from_samples(self) -> None:
+        document = fitz.open()
+        page = document.new_page(width=612, height=792)
+        page.insert_text((72, 72), "Scanned resume line", fontsize=14)
+
+        image, pixmap, dpi = ocr_pool.render_page_for_ocr(page)
+        with image:
+            self.assertEqual(image.mode, "L")
+            self.assertEqual(image.size, (pixmap.width, pixmap.height))
+            self.assertEqual(pixmap.n, 1)
+            self.assertLessEqual(pixmap.width * pixmap.height, ocr_pool.OCR_MAX_PIXELS_PER_PAGE)
+            self.assertEqual(image.getpixel((0, 0)), 255)
+        self.assertEqual(pixmap.width, round(612 * dpi / 72))
+        document.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
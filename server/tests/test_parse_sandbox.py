@@ -0,0 +1,135 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import fitz
+
+import ocr_pool
+from parse_sandbox import ParseSandbox, ParseTimeoutError, _SandboxWorker, apply_memory_limit
+
+
+def _build_pdf(text: str) -> bytes:
+    document = fitz.open()
+    page = document.new_page()
+    page.insert_textbox(fitz.Rect(50, 50, 550, 800), text, fontsize=11)
+    payload = document.tobytes()
+    document.close()
+    return payload
+
+
+def _build_long_pdf(page_count: int) -> bytes:
+    document = fitz.open()
+    for index in range(page_count):
+        document.new_page().insert_text((72, 72), f"Resume page {index} " * 20, fontsize=8)
+    payload = document.tobytes()
+    document.close()
+    return payload
+
+
+class ParseSandboxTests(unittest.TestCase):
+    def test_sandbox_extracts_text_layers_and_recycles_workers(self) -> None:
+        sandbox = ParseSandbox(workers=1, timeout_seconds=30, memory_limit_bytes=0, max_jobs_per_worker=1)
+        try:
+            pages = sandbox.extract_page_text_layers(
+                _build_pdf("Backend engineer building Python FastAPI services with SQL and Docker.")
+            )
+            stats = sandbox.stats()
+        finally:
+            sandbox.shutdown()
+
+        self.assertEqual(len(pages), 1)
+        self.assertIn("FastAPI", pages[0][0])
+        self.assertEqual(pages[0][1], "pymupdf")
+        self.assertEqual(stats["recycled_workers"], 1)
+        self.assertEqual(stats["idle_workers"], 0)
+
+    def test_sandbox_kills_workers_that_miss_the_deadline(self) -> None:
+        sandbox = ParseSandbox(workers=1, timeout_seconds=0.01, memory_limit_bytes=0, max_jobs_per_worker=5)
+        try:
+            with self.assertRaises(ParseTimeoutError):
+                sandbox.extract_page_text_layers(_build_long_pdf(200))
+            stats = sandbox.stats()
+        finally:
+            sandbox.shutdown()
+
+        self.assertEqual(stats["timeouts"], 1)
+        self.assertEqual(stats["busy_workers"], 0)
+        self.assertEqual(stats["idle_workers"], 0)
+
+    def test_job_deadline_starts_after_the_worker_has_started(self) -> None:
+        wait_until_started = _SandboxWorker.wait_until_started
+
+        def slow_start(worker: _SandboxWorker, timeout_seconds: float) -> None:
+            time.sleep(0.5)
+            wait_until_started(worker, timeout_seconds)
+
+        sandbox = ParseSandbox(workers=1, timeout_seconds=0.3, memory_limit_bytes=0, max_jobs_per_worker=5)
+        try:
+            with patch.object(_SandboxWorker, "wait_until_started", slow_start):
+                pages = sandbox.extract_page_text_layers(_build_pdf("Backend engineer resume"))
+            stats = sandbox.stats()
+        finally:
+            sandbox.shutdown()
+
+        self.assertIn("Backend engineer", pages[0][0])
+        self.assertEqual(stats["timeouts"], 0)
+        self.assertEqual(stats["idle_workers"], 1)
+
+    def test_jobs_beyond_the_worker_count_queue_instead_of_timing_out(self) -> None:
+        wait_until_started = _SandboxWorker.wait_until_started
+
+        def slow_start(worker: _SandboxWorker, timeout_seconds: float) -> None:
+            if not worker.started:
+                time.sleep(0.5)
+            wait_until_started(worker, timeout_seconds)
+
+        sandbox = ParseSandbox(workers=1, timeout_seconds=0.3, memory_limit_bytes=0, max_jobs_per_worker=5)
+        pdf = _build_pdf("Backend engineer resume")
+        results: list[object] = []
+
+        def parse() -> None:
+            try:
+                results.append(sandbox.extract_page_text_layers(pdf)[0][1])
+            except Exception as exc:
+                results.append(exc)
+
+        try:
+            with patch.object(_SandboxWorker, "wait_until_started", slow_start):
+                threads = [threading.Thread(target=parse) for _ in range(2)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+            stats = sandbox.stats()
+        finally:
+            sandbox.shutdown()
+
+        # The second job waits longer than one job's deadline for the only worker; only the parse itself is timed.
+        self.assertEqual(results, ["pymupdf", "pymupdf"])
+        self.assertEqual(stats["timeouts"], 0)
+        self.assertEqual(stats["waiting_jobs"], 0)
+
+    def test_ocr_pool_workers_get_the_same_memory_cap(self) -> None:
+        executor = ocr_pool._new_executor()
+        try:
+            self.assertIs(executor._initializer, apply_memory_limit)
+            self.assertEqual(
+                executor._initargs,
+                (ocr_pool.get_settings().parse_worker_memory_limit_mb * 1024 * 1024,),
+            )
+        finally:
+            executor.shutdown(wait=False)
+
+    def test_sandbox_reports_unreadable_pdfs_as_value_errors(self) -> None:
+        sandbox = ParseSandbox(workers=1, timeout_seconds=30, memory_limit_bytes=0, max_jobs_per_worker=5)
+        try:
+            with self.assertRaisesRegex(ValueError, "Unable to read this PDF"):
+                sandbox.extract_page_text_layers(b"not a pdf")
+            self.assertEqual(sandbox.stats()["idle_workers"], 1)
+        finally:
+            sandbox.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
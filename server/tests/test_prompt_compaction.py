@@ -0,0 +1,180 @@
+import unittest
+
+from prompt_compaction import build_compacted_dual_analysis_prompt, estimate_tokens
+from resume_document import ResumeDocument
+
+
+RESUME = "\n".join(
+    [
+        "Jane Doe",
+        "jane@example.com | +91 99999 99999",
+        "Page 1 of 2",
+        "Experience",
+        *[f"• Built service {index} handling 10k requests per second with Python and Redis" for index in range(40)],
+        "Skills",
+        "Python, FastAPI, Redis, PostgreSQL, Docker",
+        "Hobbies & Interests",
+        *[f"- Enjoys hobby number {index} on weekends with friends and family" for index in range(40)],
+        "Jane Doe",
+        "jane@example.com | +91 99999 99999",
+        "Page 2 of 2",
+    ]
+)
+JOB_DESCRIPTION = "\n".join(
+    [
+        "About Us",
+        *[f"We are a company that values mission statement number {index} very highly." for index in range(30)],
+        "Requirements",
+        "- 3+ years of Python backend development",
+        "- Experience with Redis and PostgreSQL",
+        "Benefits",
+        "- Health insurance",
+        "We are an equal opportunity employer and consider all applicants without regard to race or religion.",
+        "Reasonable accommodations are available on request.",
+    ]
+)
+
+
+def _compact(resume: str = RESUME, job_description: str = JOB_DESCRIPTION, token_budget: int = 2200):
+    return build_compacted_dual_analysis_prompt(
+        document=ResumeDocument.from_text(resume),
+        target_role="Backend Engineer",
+        experience_level="Mid",
+        job_description=job_description,
+        market_context=None,
+        token_budget=token_budget,
+    )
+
+
+class PromptCompactionTests(unittest.TestCase):
+    def test_boilerplate_and_repeated_lines_are_removed(self) -> None:
+        compacted = _compact(token_budget=20_000)
+
+        self.assertNotIn("equal opportunity", compacted.prompt.lower())
+        self.assertNotIn("accommodations", compacted.prompt)
+        self.assertNotIn("Page 1 of 2", compacted.prompt)
+        self.assertEqual(compacted.prompt.count("jane@example.com"), 1)
+        self.assertIn("- Built service 0 handling", compacted.prompt)
+        self.assertNotIn("•", compacted.prompt)
+        self.assertEqual(compacted.trimmed_sections, ())
+        self.assertLess(compacted.tokens_after, compacted.tokens_before)
+
+    def test_low_priority_sections_are_trimmed_before_experience_and_requirements(self) -> None:
+        compacted = _compact(token_budget=2200)
+
+        self.assertIn("Built service 39", compacted.prompt)
+        self.assertIn("Python, FastAPI, Redis", compacted.prompt)
+        self.assertIn("3+ years of Python backend development", compacted.prompt)
+        self.assertNotIn("hobby number 39", compacted.prompt)
+        self.assertNotIn("mission statement number 29", compacted.prompt)
+        self.assertIn("resume.personal", compacted.trimmed_sections)
+        self.assertIn("job_description.company", compacted.trimmed_sections)
+        self.assertLessEqual(compacted.tokens_after, 2200)
+        self.assertEqual(compacted.tokens_after, estimate_tokens(compacted.prompt))
+
+    def test_resume_without_headings_is_cut_at_a_line_boundary_within_budget(self) -> None:
+        resume = "\n".join(f"Line {index} of an unstructured resume about backend work" for index in range(500))
+
+        compacted = _compact(resume=resume, job_description="", token_budget=2000)
+
+        self.assertIn("Line 0 of an unstructured resume", compacted.prompt)
+        self.assertNotIn("Line 499", compacted.prompt)
+        self.assertEqual(compacted.trimmed_sections, ("resume.resume",))
+        self.assertLessEqual(compacted.tokens_after, 2000)
+        self.assertEqual(
+            compacted.as_metadata(),
+            {
+                "before": compacted.tokens_before,
+                "after": compacted.tokens_after,
+                "budget": 2000,
+                "trimmed_sections": ["resume.resume"],
+                "job_description_dropped": False,
+            },
+        )
+
+    def test_repeated_titles_and_dates_under_different_entries_are_kept(self) -> None:
+        resume = "\n".join(
+            [
+                "Jane Doe",
+                "jane@example.com",
+                "Experience",
+                "Software Engineer",
+                "Acme Corp",
+                "Bangalore, India",
+                "06/2023",
+                "- Built the billing service",
+                "- Built the billing service",
+                "Software Engineer",
+                "Globex",
+                "Bangalore, India",
+                "2019 / 2021",
+                "- Led the search migration",
+                "Languages",
+                "Python, Go, TypeScript",
+                "1 of 2",
+                "Jane Doe",
+                "jane@example.com",
+                "Projects",
+                "- Built the billing service",
+            ]
+        )
+
+        compacted = _compact(resume=resume, job_description="", token_budget=20_000)
+
+        self.assertEqual(compacted.prompt.count("Software Engineer"), 2)
+        self.assertEqual(compacted.prompt.count("Bangalore, India"), 2)
+        self.assertEqual(compacted.prompt.count("Built the billing service"), 2)
+        self.assertEqual(compacted.prompt.count("jane@example.com"), 1)
+        self.assertIn("06/2023", compacted.prompt)
+        self.assertIn("2019 / 2021", compacted.prompt)
+        self.assertNotIn("1 of 2", compacted.prompt)
+
+    def test_languages_share_the_skills_priority(self) -> None:
+        resume = "\n".join(
+            [
+                "Jane Doe",
+                "Experience",
+                *[f"- Shipped feature {index} for the payments platform team" for index in range(30)],
+                "Interests",
+                *[f"- Interest {index} outside of work on weekends" for index in range(30)],
+                "Languages",
+                "Python, Go, TypeScript",
+            ]
+        )
+
+        compacted = _compact(resume=resume, job_description="", token_budget=1300)
+
+        self.assertIn("Python, Go, TypeScript", compacted.prompt)
+        self.assertIn("resume.personal", compacted.trimmed_sections)
+
+    def test_job_description_uses_budget_a_short_resume_leaves_unused(self) -> None:
+        job_description = "\n".join(f"- Requirement {index}: experience with distributed systems" for index in range(60))
+
+        compacted = _compact(resume="Jane Doe\nPython developer", job_description=job_description, token_budget=2000)
+
+        self.assertIn("Requirement 59", compacted.prompt)
+        self.assertEqual(compacted.trimmed_sections, ())
+        self.assertLessEqual(compacted.tokens_after, 2000)
+
+    def test_single_paragraph_job_description_is_cut_rather_than_dropped(self) -> None:
+        resume = "\n".join(f"Line {index} of an unstructured resume about backend work" for index in range(500))
+        job_description = "We need a backend engineer with Python, Redis and PostgreSQL experience. " * 60
+
+        compacted = _compact(resume=resume, job_description=job_description, token_budget=2000)
+
+        self.assertIn("We need a backend engineer with Python", compacted.prompt)
+        self.assertNotIn("No explicit job description was provided", compacted.prompt)
+        self.assertIn("job_description.overview", compacted.trimmed_sections)
+        self.assertFalse(compacted.job_description_dropped)
+
+    def test_boilerplate_only_job_description_is_flagged_as_dropped(self) -> None:
+        job_description = "Equal Opportunity Statement\nWe are an equal opportunity employer."
+
+        compacted = _compact(job_description=job_description, token_budget=20_000)
+
+        self.assertTrue(compacted.job_description_dropped)
+        self.assertTrue(compacted.as_metadata()["job_description_dropped"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,7 +3,16 @@ import json
 import unittest
 from unittest.mock import patch
 
-from redis_store import StorageUnavailableError, get_task_status
+from redis_store import (
+    LocalRedis,
+    StorageUnavailableError,
+    claim_analysis_flight,
+    get_extracted_text,
+    get_task_status,
+    release_analysis_flight,
+    renew_analysis_flight,
+    set_extracted_text,
+)
 
 
 class _SyncRedisStub:
@@ -21,6 +30,23 @@ class _BrokenSyncRedisStub:
         raise RuntimeError('boom')
 
 
+class _ScriptRedisStub:
+    def __init__(self, claims: list[bool | None], leaders: list[str | None]) -> None:
+        self.claims = claims
+        self.leaders = leaders
+        self.evals: list[tuple] = []
+
+    def set(self, *_, **__) -> bool | None:
+        return self.claims.pop(0)
+
+    def get(self, _: str) -> str | None:
+        return self.leaders.pop(0)
+
+    def eval(self, script: str, numkeys: int, *args) -> int:
+        self.evals.append((script, numkeys, *args))
+        return 1
+
+
 class RedisStoreTests(unittest.TestCase):
     def test_get_task_status_reads_from_sync_store(self) -> None:
         stub = _SyncRedisStub(json.dumps({"task_id": "task-123", "status": "queued"}))
@@ -35,3 +61,52 @@ class RedisStoreTests(unittest.TestCase):
         with patch("redis_store.get_sync_redis", return_value=_BrokenSyncRedisStub()):
             with self.assertRaises(StorageUnavailableError):
                 asyncio.run(get_task_status("task-123"))
+
+    def test_extracted_text_round_trips_under_pdf_digest_key(self) -> None:
+        store = LocalRedis()
+        payload = {"resume_text": "Parsed text", "parsing_method": "pymupdf", "word_count": 2}
+
+        with patch("redis_store.get_sync_redis", return_value=store):
+            set_extracted_text("abc123", payload)
+            restored = get_extracted_text("abc123")
+
+        self.assertEqual(restored, payload)
+        self.assertIsNotNone(store.get("analysis:text:abc123"))
+
+    def test_flight_lease_is_renewed_and_released_only_by_its_holder(self) -> None:
+        store = LocalRedis()
+
+        with patch("redis_store.get_sync_redis", return_value=store):
+            self.assertIsNone(claim_analysis_flight("hash-1", "task-b", 60))
+            self.assertFalse(renew_analysis_flight("hash-1", "task-a", 60))
+            release_analysis_flight("hash-1", "task-a")
+            self.assertEqual(store.get("analysis:inflight:hash-1"), "task-b")
+            self.assertTrue(renew_analysis_flight("hash-1", "task-b", 60))
+            release_analysis_flight("hash-1", "task-b")
+
+        self.assertIsNone(store.get("analysis:inflight:hash-1"))
+
+    def test_flight_lease_compare_and_act_runs_as_one_script_on_redis(self) -> None:
+        stub = _ScriptRedisStub([], [])
+
+        with patch("redis_store.get_sync_redis", return_value=stub):
+            renew_analysis_flight("hash-1", "task-a", 30)
+            release_analysis_flight("hash-1", "task-a")
+
+        (renew_script, *renew_args), (release_script, *release_args) = stub.evals
+        self.assertIn("pexpire", renew_script)
+        self.assertEqual(renew_args, [1, "analysis:inflight:hash-1", "task-a", 30_000])
+        self.assertIn("del", release_script)
+        self.assertEqual(release_args, [1, "analysis:inflight:hash-1", "task-a"])
+
+    def test_flight_claim_keeps_retrying_while_the_lease_churns(self) -> None:
+        stub = _ScriptRedisStub([None, None, None, None, True], [None, None, None, None])
+
+        with patch("redis_store.get_sync_redis", return_value=stub):
+            self.assertIsNone(claim_analysis_flight("hash-1", "task-a", 30))
+
+        self.assertEqual(stub.claims, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
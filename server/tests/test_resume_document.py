@@ -0,0 +1,90 @@
+import unittest
+
+from resume_document import (
+    EMBEDDING_CHUNK_CHARS,
+    EMBEDDING_MAX_SEQ_TOKENS,
+    MAX_EMBEDDING_CHUNKS,
+    ResumeDocument,
+    embedding_chunk_chars,
+)
+from resume_pipeline import compute_resume_structure_score, count_meaningful_words, detect_weak_bullets
+
+
+RESUME_TEXT = """Jane Doe
+jane@example.com | github.com/jane
+Summary
+Backend engineer focused on Python services.
+Work Experience
+- Built FastAPI services that reduced p95 latency by 40% for 2M users
+- Helped with documentation
+Skills
+Python, SQL, Docker
+"""
+
+
+class ResumeDocumentTests(unittest.TestCase):
+    def test_document_indexes_lines_bullets_sections_and_tokens_once(self) -> None:
+        document = ResumeDocument.from_text(RESUME_TEXT)
+
+        self.assertEqual(document.bullet_indices, (5, 6))
+        self.assertEqual(document.section_spans["summary"], ((2, 4),))
+        self.assertEqual(document.section_spans["experience"], ((4, 7),))
+        self.assertEqual(document.section_spans["skills"], ((7, 9),))
+        self.assertNotIn("education", document.section_spans)
+        self.assertEqual(document.word_count, count_meaningful_words(RESUME_TEXT))
+        self.assertEqual(len(document.tokens), document.word_count)
+
+    def test_helpers_accept_documents_and_text_interchangeably(self) -> None:
+        document = ResumeDocument.from_text(RESUME_TEXT)
+
+        self.assertEqual(compute_resume_structure_score(document, "pymupdf"), compute_resume_structure_score(RESUME_TEXT, "pymupdf"))
+        self.assertEqual(detect_weak_bullets(document), ["- Helped with documentation"])
+        self.assertEqual(count_meaningful_words(document), document.word_count)
+
+    def test_payload_round_trip_restores_the_document_without_tokens(self) -> None:
+        document = ResumeDocument.from_text(RESUME_TEXT)
+
+        restored = ResumeDocument.from_payload(RESUME_TEXT, document.to_payload())
+
+        self.assertEqual(restored.lines, document.lines)
+        self.assertEqual(restored.bullet_indices, document.bullet_indices)
+        self.assertEqual(restored.section_spans, document.section_spans)
+        self.assertEqual(restored.word_count, document.word_count)
+        self.assertEqual(restored.tokens, document.tokens)
+
+    def test_embedding_chunks_follow_sections_and_cover_long_resumes_within_the_cap(self) -> None:
+        document = ResumeDocument.from_text(RESUME_TEXT)
+        long_document = ResumeDocument.from_text("Experience\n" + "- Built services with Python and SQL\n" * 2000)
+
+        chunks = document.embedding_chunks()
+        long_chunks = long_document.embedding_chunks(max_chunks=8)
+
+        self.assertEqual([label for label, _ in chunks], ["header", "summary", "experience", "skills"])
+        self.assertTrue(chunks[2][1].startswith("Work Experience"))
+        self.assertEqual(len(long_chunks), 8)
+        self.assertEqual({label for label, _ in long_chunks}, {"experience"})
+        self.assertTrue(all(len(text) <= EMBEDDING_CHUNK_CHARS for _, text in long_chunks))
+
+    def test_ten_page_resume_is_chunked_within_the_model_window_without_dropping_text(self) -> None:
+        sections = ["Summary", "Experience", "Projects", "Education", "Skills"]
+        pages = [
+            "\n".join(
+                [sections[page % len(sections)]]
+                + [f"- Page {page} item {item}: delivered Python/FastAPI services on AWS, cut p99 latency by 35%" for item in range(30)]
+            )
+            for page in range(10)
+        ]
+        document = ResumeDocument.from_text("Jane Doe\n" + "\n".join(pages))
+
+        chunks = document.embedding_chunks()
+
+        # 254 word pieces fit next to [CLS]/[SEP]; at no fewer than 3 characters per piece.
+        self.assertLessEqual(EMBEDDING_CHUNK_CHARS, (EMBEDDING_MAX_SEQ_TOKENS - 2) * 3)
+        self.assertTrue(all(len(text) <= EMBEDDING_CHUNK_CHARS for _, text in chunks))
+        self.assertLessEqual(len(chunks), MAX_EMBEDDING_CHUNKS)
+        self.assertIn("Page 9 item 29", chunks[-1][1])
+        self.assertLess(embedding_chunk_chars(128), EMBEDDING_CHUNK_CHARS)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,28 @@
 import unittest
+from unittest.mock import patch
 
-from resume_pipeline import _extract_reference_keywords
+import fitz
+
+from resume_pipeline import (
+    _extract_reference_keywords,
+    compute_ats_evaluation,
+    extract_page_text_layers,
+    extract_resume_features,
+    extract_text_with_fallback,
+    score_page_text,
+    score_resume_features,
+)
+
+
+def _build_pdf(page_texts: list[str]) -> bytes:
+    document = fitz.open()
+    for text in page_texts:
+        page = document.new_page()
+        if text:
+            page.insert_textbox(fitz.Rect(50, 50, 550, 800), text, fontsize=11)
+    payload = document.tobytes()
+    document.close()
+    return payload
 
 
 class ResumePipelineKeywordTests(unittest.TestCase):
@@ -29,5 +51,156 @@ class ResumePipelineKeywordTests(unittest.TestCase):
         self.assertNotIn("engineer", keywords)
 
 
+class ResumePipelineScoringTests(unittest.TestCase):
+    RESUME_TEXT = (
+        "Jane Doe\njane@example.com\n+91 98765 43210\ngithub.com/jane\n"
+        "Experience\n- Built Python FastAPI services that reduced latency by 40% for 2M users\n"
+        "- Helped with docs\nSkills\nPython, SQL, Docker\n"
+    )
+
+    def test_scoring_modes_project_one_feature_extraction(self) -> None:
+        with patch("resume_pipeline.get_sentence_model", return_value=False) as model_mock:
+            features = extract_resume_features(self.RESUME_TEXT, "Python FastAPI Kubernetes", "Backend Engineer")
+            full_time = score_resume_features(features, scoring_mode="full-time")
+            internship = score_resume_features(features, scoring_mode="internship")
+
+        self.assertEqual(model_mock.call_count, 1)
+        self.assertEqual(full_time["keyword_score"], internship["keyword_score"])
+        self.assertIn("kubernetes", full_time["missing_keywords"])
+        self.assertNotEqual(full_time["ats_score"], internship["ats_score"])
+
+    def test_compute_ats_evaluation_matches_feature_projection(self) -> None:
+        with patch("resume_pipeline.get_sentence_model", return_value=False):
+            features = extract_resume_features(self.RESUME_TEXT, "", "Data Analyst", parsing_method="ocr")
+            for scoring_mode in ("full-time", "internship"):
+                self.assertEqual(
+                    compute_ats_evaluation(
+                        self.RESUME_TEXT, "", "Data Analyst", parsing_method="ocr", scoring_mode=scoring_mode
+                    ),
+                    score_resume_features(features, scoring_mode=scoring_mode),
+                )
+
+
+class _FakeExtractor:
+    name = "fake"
+    page_texts: list[str] = []
+    opened = 0
+
+    def __init__(self, _: bytes) -> None:
+        type(self).opened += 1
+
+    @property
+    def page_count(self) -> int:
+        return len(self.page_texts)
+
+    def page_text(self, page_index: int) -> str:
+        return self.page_texts[page_index]
+
+    def close(self) -> None:
+        pass
+
+
+class _GlyphSoupExtractor(_FakeExtractor):
+    name = "fast"
+    page_texts = [
+        "Jane Doe, backend engineer building Python services and SQL data pipelines.",
+        "(cid:12)(cid:44)(cid:3)(cid:18) (cid:7)(cid:9)",
+    ]
+
+
+class _LayoutExtractor(_FakeExtractor):
+    name = "layout"
+    page_texts = [
+        "unused",
+        "Experience at Acme building FastAPI services with Docker and Postgres.",
+    ]
+
+
+class _UnusedExtractor(_FakeExtractor):
+    name = "unused"
+    page_texts = ["Jane Doe", "Experience"]
+
+
+class ResumePipelineExtractionTests(unittest.TestCase):
+    def test_extraction_only_ocrs_pages_without_a_text_layer(self) -> None:
+        pdf_bytes = _build_pdf([
+            "Jane Doe\nBackend engineer building Python FastAPI services with SQL and Docker.",
+            "",
+            "Projects\nBuilt a resume parser that extracts skills from uploaded PDF files.",
+        ])
+        ocr_calls: list[list[int]] = []
+
+        def fake_ocr_pages(_: bytes, page_indices: list[int]) -> dict[int, str]:
+            ocr_calls.append(page_indices)
+            return {index: "Experience\nScanned internship at Acme working on data pipelines" for index in page_indices}
+
+        with (
+            patch("resume_pipeline.shutil.which", return_value="/usr/bin/tesseract"),
+            patch("resume_pipeline.ocr_pages", side_effect=fake_ocr_pages),
+        ):
+            text, parsing_method, page_methods = extract_text_with_fallback(pdf_bytes, "resume.pdf")
+
+        self.assertEqual(ocr_calls, [[1]])
+        self.assertEqual(page_methods, ["pymupdf", "ocr", "pymupdf"])
+        self.assertEqual(parsing_method, "hybrid")
+        self.assertLess(text.index("Jane Doe"), text.index("Scanned internship"))
+        self.assertLess(text.index("Scanned internship"), text.index("Projects"))
+
+    def test_extraction_keeps_text_pages_when_ocr_is_unavailable(self) -> None:
+        pdf_bytes = _build_pdf([
+            "Jane Doe\nBackend engineer building Python FastAPI services with SQL and Docker.",
+            "",
+        ])
+
+        with patch("resume_pipeline.shutil.which", return_value=None):
+            text, parsing_method, page_methods = extract_text_with_fallback(pdf_bytes, "resume.pdf")
+
+        self.assertIn("FastAPI", text)
+        self.assertEqual(page_methods, ["pymupdf", "unreadable"])
+        self.assertEqual(parsing_method, "pymupdf")
+
+
+class ResumePipelineExtractorChainTests(unittest.TestCase):
+    def test_page_text_score_penalizes_glyph_soup_and_spaced_letters(self) -> None:
+        clean = score_page_text("Built Python APIs with FastAPI, reducing latency by 40% for 2M users.")
+
+        self.assertGreater(clean, 0.9)
+        self.assertEqual(score_page_text("(cid:12)(cid:44)(cid:3) abc"), 0.0)
+        self.assertLess(score_page_text("J o h n D o e S o f t w a r e"), 0.5)
+
+    def test_chain_only_consults_later_extractors_for_weak_pages(self) -> None:
+        _LayoutExtractor.opened = 0
+
+        pages = extract_page_text_layers(b"%PDF", extractors=(_GlyphSoupExtractor, _LayoutExtractor))
+
+        self.assertEqual([method for _, method, _ in pages], ["fast", "layout"])
+        self.assertIn("FastAPI", pages[1][0])
+        self.assertEqual(_LayoutExtractor.opened, 1)
+
+    def test_chain_skips_second_opinion_when_primary_text_is_clean(self) -> None:
+        _UnusedExtractor.opened = 0
+
+        class _CleanExtractor(_FakeExtractor):
+            name = "fast"
+            page_texts = ["Jane Doe, backend engineer building Python services and SQL data pipelines."]
+
+        pages = extract_page_text_layers(b"%PDF", extractors=(_CleanExtractor, _UnusedExtractor))
+
+        self.assertEqual(pages[0][1], "fast")
+        self.assertEqual(_UnusedExtractor.opened, 0)
+
+    def test_chain_never_opens_later_extractors_for_an_all_image_document(self) -> None:
+        _UnusedExtractor.opened = 0
+
+        class _ImageOnlyExtractor(_FakeExtractor):
+            name = "fast"
+            page_texts = ["", " \n\t", ""]
+
+        pages = extract_page_text_layers(b"%PDF", extractors=(_ImageOnlyExtractor, _UnusedExtractor))
+
+        self.assertEqual([(method, score) for _, method, score in pages], [("fast", 0.0)] * 3)
+        self.assertEqual(_UnusedExtractor.opened, 0)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,80 @@
+import sys
+import types
+import unittest
+from unittest.mock import patch
+
+import sentence_model
+
+
+class _FakeSentenceTransformer:
+    instances = 0
+
+    def __init__(self, model_name: str, local_files_only: bool) -> None:
+        type(self).instances += 1
+        self.model_name = model_name
+        self.encoded: list[list[str]] = []
+
+    def encode(self, texts: list[str], convert_to_tensor: bool = False) -> list[list[float]]:
+        self.encoded.append(texts)
+        return [[0.0] for _ in texts]
+
+
+def _reset_model_state() -> None:
+    sentence_model._model = None
+    sentence_model._state = "cold"
+    sentence_model._error = None
+    sentence_model._load_ms = None
+    sentence_model._warmup_ms = None
+
+
+class SentenceModelTests(unittest.TestCase):
+    def setUp(self) -> None:
+        _reset_model_state()
+        _FakeSentenceTransformer.instances = 0
+
+    def tearDown(self) -> None:
+        _reset_model_state()
+
+    def test_warm_up_loads_once_and_runs_a_synthetic_encode(self) -> None:
+        fake_module = types.SimpleNamespace(SentenceTransformer=_FakeSentenceTransformer)
+
+        with patch.dict(sys.modules, {"sentence_transformers": fake_module}):
+            self.assertFalse(sentence_model.sentence_model_is_ready())
+            state = sentence_model.warm_sentence_model()
+            model = sentence_model.get_sentence_model()
+
+        self.assertEqual(state, "ready")
+        self.assertTrue(sentence_model.sentence_model_is_ready())
+        self.assertEqual(_FakeSentenceTransformer.instances, 1)
+        self.assertEqual(model.encoded, [sentence_model.WARMUP_TEXTS])
+        self.assertIsNotNone(sentence_model.get_sentence_model_status()["warmup_ms"])
+
+    def test_missing_model_is_reported_as_disabled_and_does_not_block_readiness(self) -> None:
+        with patch.dict(sys.modules, {"sentence_transformers": None}):
+            state = sentence_model.warm_sentence_model()
+
+        self.assertEqual(state, "disabled")
+        self.assertFalse(sentence_model.get_sentence_model())
+        self.assertTrue(sentence_model.sentence_model_is_ready())
+        self.assertIn("sentence_transformers", sentence_model.get_sentence_model_status()["error"])
+
+    def test_failed_warm_up_encode_is_reported_as_failed_and_drops_the_model(self) -> None:
+        class _BrokenSentenceTransformer(_FakeSentenceTransformer):
+            def encode(self, texts: list[str], convert_to_tensor: bool = False) -> list[list[float]]:
+                raise RuntimeError("bad weights")
+
+        fake_module = types.SimpleNamespace(SentenceTransformer=_BrokenSentenceTransformer)
+
+        with patch.dict(sys.modules, {"sentence_transformers": fake_module}):
+            state = sentence_model.warm_sentence_model()
+            model = sentence_model.get_sentence_model()
+
+        status = sentence_model.get_sentence_model_status()
+        self.assertEqual(state, "failed")
+        self.assertEqual(status["state"], "failed")
+        self.assertFalse(model)
+        self.assertEqual(status["error"], "RuntimeError: bad weights")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import asyncio
+import threading
+import unittest
+from tempfile import SpooledTemporaryFile
+from unittest.mock import patch
+
+from fastapi import HTTPException
+
+from upload_stream import MAX_FORM_FIELD_BYTES, MAX_FORM_FIELDS, read_resume_upload
+
+
+BOUNDARY = "test-boundary"
+
+
+class _StreamingRequest:
+    def __init__(self, body: bytes, chunk_size: int = 4096, *, chunked: bool = False) -> None:
+        self.headers = {"content-type": f"multipart/form-data; boundary={BOUNDARY}"}
+        if not chunked:
+            self.headers["content-length"] = str(len(body))
+        self._body = body
+        self._chunk_size = chunk_size
+        self.bytes_streamed = 0
+
+    async def stream(self):
+        for offset in range(0, len(self._body), self._chunk_size):
+            chunk = self._body[offset:offset + self._chunk_size]
+            self.bytes_streamed += len(chunk)
+            yield chunk
+
+
+def _multipart(fields: list[tuple[str, str]], pdf: bytes) -> bytes:
+    parts = [
+        f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        for name, value in fields
+    ]
+    parts.append(
+        f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="file"; filename="resume.pdf"\r\n'
+        "Content-Type: application/pdf\r\n\r\n".encode()
+        + pdf
+        + b"\r\n"
+    )
+    return b"".join(parts) + f"--{BOUNDARY}--\r\n".encode()
+
+
+def _read(body: bytes, *, spool_threshold: int):
+    return asyncio.run(
+        read_resume_upload(_StreamingRequest(body), max_bytes=1024 * 1024, spool_threshold=spool_threshold)
+    )
+
+
+class UploadStreamTests(unittest.TestCase):
+    def test_repeated_form_fields_keep_the_last_value(self) -> None:
+        body = _multipart([("target_role", "Data Analyst"), ("target_role", "Backend Engineer")], b"%PDF-1.4 small")
+
+        upload = _read(body, spool_threshold=1024 * 1024)
+
+        self.assertEqual(upload.fields["target_role"], "Backend Engineer")
+        self.assertEqual(upload.read_bytes(), b"%PDF-1.4 small")
+        upload.close()
+
+    def test_file_writes_move_to_a_worker_thread_once_the_spool_rolls_over(self) -> None:
+        pdf = b"%PDF-1.4 " + bytes(range(256)) * 200
+        write_threads = []
+        original_write = SpooledTemporaryFile.write
+
+        def recording_write(self, data):
+            write_threads.append((getattr(self, "_rolled", False), threading.current_thread() is threading.main_thread()))
+            return original_write(self, data)
+
+        with patch.object(SpooledTemporaryFile, "write", recording_write):
+            upload = _read(_multipart([("target_role", "Backend Engineer")], pdf), spool_threshold=8 * 1024)
+
+        self.assertEqual(upload.read_bytes(), pdf)
+        upload.close()
+        self.assertTrue(write_threads[0][1])
+        # Every write from the one that rolls the spool over onwards runs off the event loop thread.
+        rollover = next(index for index, (rolled, _) in enumerate(write_threads) if rolled) - 1
+        self.assertTrue(all(not on_loop for _, on_loop in write_threads[rollover:]))
+
+    def test_chunked_body_is_rejected_once_form_fields_exceed_their_limits(self) -> None:
+        many_fields = _multipart([(f"field_{index}", "x") for index in range(10_000)], b"%PDF-1.4 small")
+        large_fields = _multipart(
+            [(f"field_{index}", "x" * (MAX_FORM_FIELD_BYTES - 1)) for index in range(8)],
+            b"%PDF-1.4 small",
+        )
+
+        for body, detail in ((many_fields, "too many form fields"), (large_fields, "form fields are too large")):
+            request = _StreamingRequest(body, chunked=True)
+            with self.assertRaises(HTTPException) as raised:
+                asyncio.run(read_resume_upload(request, max_bytes=1024 * 1024, spool_threshold=1024 * 1024))
+
+            self.assertEqual(raised.exception.status_code, 413)
+            self.assertIn(detail, raised.exception.detail)
+            self.assertLess(request.bytes_streamed, len(body))
+
+    def test_chunked_body_within_the_field_limits_is_accepted(self) -> None:
+        body = _multipart([(f"field_{index}", "x") for index in range(MAX_FORM_FIELDS)], b"%PDF-1.4 small")
+
+        upload = asyncio.run(
+            read_resume_upload(_StreamingRequest(body, chunked=True), max_bytes=1024 * 1024, spool_threshold=1024 * 1024)
+        )
+
+        self.assertEqual(len(upload.fields), MAX_FORM_FIELDS)
+        upload.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+from pathlib import Path
+from tempfile import SpooledTemporaryFile
+from typing import Any
+
+from fastapi import HTTPException, Request
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+PDF_MAGIC = b'%PDF'
+# The PDF spec allows the header to appear anywhere in the first 1024 bytes.
+PDF_MAGIC_WINDOW_BYTES = 1024
+MAX_FORM_FIELD_BYTES = 256 * 1024
+MAX_FORM_OVERHEAD_BYTES = 2 * MAX_FORM_FIELD_BYTES
+MAX_FORM_FIELDS = 32
+
+
+def upload_size_limit_message(max_bytes: int) -> str:
+    return f'Resume exceeds the {max_bytes / (1024 * 1024):g}MB upload limit.'
+
+
+class ResumeUpload:
+    """A streamed resume upload: form fields plus the PDF spooled to memory or disk.
+
+    The PDF digest is computed while streaming, so neither the content cache nor the
+    payload cache needs another pass over the bytes.
+    """
+
+    __slots__ = ('filename', 'fields', 'size', '_file', '_digest')
+
+    def __init__(self, filename: str, fields: dict[str, str], size: int, file: Any, digest: Any) -> None:
+        self.filename = filename
+        self.fields = fields
+        self.size = size
+        self._file = file
+        self._digest = digest
+
+    @property
+    def pdf_digest(self) -> str:
+        return self._digest.hexdigest()
+
+    def payload_hash(self, job_description: str, target_role: str, experience_level: str) -> str:
+        """Same value as resume_pipeline.compute_payload_hash over the full PDF bytes."""
+        digest = self._digest.copy()
+        digest.update(job_description.encode('utf-8'))
+        digest.update(target_role.encode('utf-8'))
+        digest.update(experience_level.encode('utf-8'))
+        return digest.hexdigest()
+
+    def read_bytes(self) -> bytes:
+        self._file.seek(0)
+        return self._file.read()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _UploadStreamParser:
+    def __init__(self, *, max_bytes: int, spool_threshold: int) -> None:
+        self.max_bytes = max_bytes
+        self.spool_threshold = spool_threshold
+        self.fields: dict[str, str] = {}
+        self.filename: str | None = None
+        self.file: SpooledTemporaryFile[bytes] | None = None
+        self.digest = hashlib.sha256()
+        self.size = 0
+        self._magic_checked = False
+        self._head = b''
+        self._header_name = b''
+        self._header_value = b''
+        self._disposition = b''
+        self._part_kind = 'ignored'
+        self._part_name = ''
+        self._part_data = bytearray()
+        self._field_count = 0
+        self._field_bytes = 0
+        self._pending_file_chunks: list[bytes] = []
+
+    def callbacks(self) -> dict[str, Any]:
+        return {
+            'on_part_begin': self.on_part_begin,
+            'on_part_data': self.on_part_data,
+            'on_part_end': self.on_part_end,
+            'on_header_field': self.on_header_field,
+            'on_header_value': self.on_header_value,
+            'on_header_end': self.on_header_end,
+            'on_headers_finished': self.on_headers_finished,
+        }
+
+    def on_part_begin(self) -> None:
+        self._disposition = b''
+        self._part_kind = 'ignored'
+        self._part_name = ''
+        self._part_data = bytearray()
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def on_header_end(self) -> None:
+        if self._header_name.lower() == b'content-disposition':
+            self._disposition = self._header_value
+        self._header_name = b''
+        self._header_value = b''
+
+    def on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._disposition)
+        self._part_name = options.get(b'name', b'').decode('utf-8', 'replace')
+        if b'filename' not in options:
+            # Checked while streaming: a chunked body has no Content-Length to reject up front.
+            self._field_count += 1
+            if self._field_count > MAX_FORM_FIELDS:
+                raise HTTPException(status_code=413, detail='Upload has too many form fields.')
+            self._part_kind = 'field'
+            return
+        if self._part_name != 'file' or self.file is not None:
+            return
+        self.filename = options[b'filename'].decode('utf-8', 'replace')
+        if not self.filename or Path(self.filename).suffix.lower() != '.pdf':
+            raise HTTPException(status_code=415, detail='Only PDF resumes are currently supported.')
+        self.file = SpooledTemporaryFile(max_size=self.spool_threshold)
+        self._part_kind = 'file'
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        chunk = data[start:end]
+        if self._part_kind == 'field':
+            if len(self._part_data) + len(chunk) > MAX_FORM_FIELD_BYTES:
+                raise HTTPException(status_code=413, detail=f'Form field "{self._part_name}" is too large.')
+            self._field_bytes += len(chunk)
+            if self._field_bytes > MAX_FORM_OVERHEAD_BYTES:
+                raise HTTPException(status_code=413, detail='Upload form fields are too large.')
+            self._part_data.extend(chunk)
+        elif self._part_kind == 'file':
+            self.size += len(chunk)
+            if self.size > self.max_bytes:
+                raise HTTPException(status_code=413, detail=upload_size_limit_message(self.max_bytes))
+            if not self._magic_checked:
+                self._head += chunk[:PDF_MAGIC_WINDOW_BYTES]
+                if len(self._head) >= PDF_MAGIC_WINDOW_BYTES:
+                    self._check_magic()
+            self.digest.update(chunk)
+            self._pending_file_chunks.append(chunk)
+
+    def on_part_end(self) -> None:
+        if self._part_kind == 'field':
+            # Last value wins for repeated fields, as with Starlette's form parser.
+            self.fields[self._part_name] = bytes(self._part_data).decode('utf-8', 'replace')
+        elif self._part_kind == 'file' and not self._magic_checked:
+            self._check_magic()
+
+    def _check_magic(self) -> None:
+        self._magic_checked = True
+        if PDF_MAGIC not in self._head[:PDF_MAGIC_WINDOW_BYTES]:
+            raise HTTPException(status_code=415, detail='The uploaded file is not a valid PDF document.')
+        self._head = b''
+
+    async def flush_file_chunks(self) -> None:
+        """Write the file data buffered by the last parser.write.
+
+        Writes that stay within the in-memory spool run inline; once the spool has
+        rolled over (or this write would roll it over) they go to a worker thread,
+        as Starlette's UploadFile does, so disk writes never block the event loop.
+        """
+        if not self._pending_file_chunks or self.file is None:
+            return
+        data = b''.join(self._pending_file_chunks)
+        self._pending_file_chunks.clear()
+        if getattr(self.file, '_rolled', True) or self.file.tell() + len(data) > self.spool_threshold:
+            await asyncio.to_thread(self.file.write, data)
+        else:
+            self.file.write(data)
+
+    def discard(self) -> None:
+        self._pending_file_chunks.clear()
+        if self.file is not None:
+            self.file.close()
+
+
+async def read_resume_upload(request: Request, *, max_bytes: int, spool_threshold: int) -> ResumeUpload:
+    """Stream a multipart resume upload, rejecting it as soon as it breaks a limit."""
+    content_type, params = parse_options_header(request.headers.get('content-type', ''))
+    boundary = params.get(b'boundary')
+    if content_type != b'multipart/form-data' or not boundary:
+        raise HTTPException(status_code=422, detail='A resume PDF file is required.')
+
+    content_length = request.headers.get('content-length', '')
+    if content_length.isdigit() and int(content_length) > max_bytes + MAX_FORM_OVERHEAD_BYTES:
+        raise HTTPException(status_code=413, detail=upload_size_limit_message(max_bytes))
+
+    stream_parser = _UploadStreamParser(max_bytes=max_bytes, spool_threshold=spool_threshold)
+    try:
+        parser = MultipartParser(boundary, stream_parser.callbacks())
+        async for chunk in request.stream():
+            parser.write(chunk)
+            await stream_parser.flush_file_chunks()
+        parser.finalize()
+        await stream_parser.flush_file_chunks()
+    except MultipartParseError as exc:
+        stream_parser.discard()
+        raise HTTPException(status_code=400, detail='Malformed multipart upload.') from exc
+    except BaseException:
+        stream_parser.discard()
+        raise
+
+    if stream_parser.file is None or stream_parser.filename is None:
+        raise HTTPException(status_code=422, detail='A resume PDF file is required.')
+    return ResumeUpload(
+        stream_parser.filename,
+        stream_parser.fields,
+        stream_parser.size,
+        stream_parser.file,
+        stream_parser.digest,
+    )
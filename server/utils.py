@@ -22,7 +22,7 @@ Candidate level: {experience_level}
 Primary hiring market: {market_region_name} ({market_country_code})
 Market context: timezone {market_timezone}, currency {market_currency}
 Job description:
-{effective_job_description[:6000]}
+{effective_job_description}
 
 The JSON structure must be exactly:
 {{
@@ -63,6 +63,6 @@ Instructions:
 
 Resume Content:
 ---
-{resume_content[:14000]}
+{resume_content}
 ---
 """.strip()
@@ -5,6 +5,7 @@ export interface AtsScore {
   matchedKeywords?: string[];
   missingKeywords?: string[];
   topIssues?: string[];
+  bestAlignedSection?: string | null;
 }
 
 export interface Skill {
@@ -59,6 +60,8 @@ export interface AnalysisResult {
   job_description_excerpt: string;
   resume_excerpt: string;
   parsing_method: string;
+  page_parsing_methods?: string[];
+  resume_digest?: string | null;
   full_time_query: string;
   internship_query: string;
   job_market_status: string;
@@ -76,6 +79,25 @@ export interface AnalysisResult {
   analysis_metadata?: {
     backend_version?: string;
     generated_at_utc?: string;
+    llm_model?: string;
+    llm_attempts?: number;
+    llm_hedged?: boolean;
+    llm_response_repairs?: string[];
+    prompt_tokens?: {
+      before?: number;
+      after?: number;
+      budget?: number;
+      trimmed_sections?: string[];
+    };
+    model_routing?: {
+      policy?: string;
+      model_order?: string[];
+      reason?: string;
+      prompt_chars?: number;
+      prompt_bucket?: string;
+      slo_ms?: number;
+      estimates?: Record<string, { p50_ms?: number | null; p95_ms?: number | null; success_rate?: number | null; samples?: number }>;
+    };
     timings_ms?: {
       llm_analysis?: number;
       market_enrichment?: number;
@@ -84,6 +106,7 @@ export interface AnalysisResult {
   };
   quality_signals?: {
     resume_word_count?: number;
+    ocr_page_count?: number;
     job_description_present?: boolean;
     job_feed_mode?: string;
     market_region?: string;